@@ -0,0 +1,150 @@
+import json
+import os
+from typing import Optional, Tuple
+
+import pygame
+
+from jnjserver.paths import user_dir
+
+ASSETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+TEXTURES_PATH = os.path.join(ASSETS_PATH, "textures")
+CACHE_PATH = user_dir("cache", "jnjclient")
+ATLAS_PATH = os.path.join(CACHE_PATH, "atlas.png")
+INDEX_PATH = os.path.join(CACHE_PATH, "atlas.json")
+ATLAS_WIDTH = 256
+CELL = 16
+VERSION = 1
+
+
+def source_files(textures_path: str = TEXTURES_PATH) -> dict:
+    """Найти исходные текстуры.
+
+    Args:
+        textures_path (str, optional): Путь к папке текстур. По умолчанию TEXTURES_PATH.
+
+    Returns:
+        dict: Размер и время изменения файлов по пути относительно папки текстур.
+    """
+    sources = {}
+    for directory, _, files in os.walk(textures_path):
+        for file in files:
+            if not file.endswith(".png"):
+                continue
+            path = os.path.join(directory, file)
+            stat = os.stat(path)
+            sources[os.path.relpath(path, textures_path).replace(os.sep, "/")] = [stat.st_size, stat.st_mtime_ns]
+    return dict(sorted(sources.items()))
+
+
+def pack_atlas(textures_path: str = TEXTURES_PATH) -> Tuple[pygame.Surface, dict]:
+    """Собрать атлас текстур в памяти.
+
+    Текстуры укладываются полками по убыванию высоты. Углы текстур выравниваются по CELL пикселям,
+    поэтому при масштабировании всего атласа в целое число раз границы текстур остаются целыми.
+    Название текстуры - путь относительно папки текстур без расширения.
+
+    Args:
+        textures_path (str, optional): Путь к папке текстур. По умолчанию TEXTURES_PATH.
+
+    Returns:
+        Tuple[Surface, dict]: Изображение и индекс атласа.
+    """
+    sources = source_files(textures_path)
+    images = {path[:-len(".png")]: pygame.image.load(os.path.join(textures_path, path)) for path in sources}
+
+    textures = {}
+    x = y = shelf_height = 0
+    for name, image in sorted(images.items(), key=lambda item: (-item[1].get_height(), item[0])):
+        width, height = image.get_size()
+        cell_width = -(-width // CELL) * CELL
+        if x + cell_width > ATLAS_WIDTH:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        textures[name] = [x, y, width, height]
+        x += cell_width
+        shelf_height = max(shelf_height, -(-height // CELL) * CELL)
+
+    atlas = pygame.Surface((ATLAS_WIDTH, max(y + shelf_height, CELL)), pygame.SRCALPHA)
+    for name, (x, y, _, _) in textures.items():
+        atlas.blit(images[name], (x, y))
+
+    index = {"version": VERSION, "sources": sources, "textures": dict(sorted(textures.items()))}
+    return atlas, index
+
+
+def build_atlas(textures_path: str = TEXTURES_PATH, atlas_path: str = ATLAS_PATH,
+                index_path: str = INDEX_PATH) -> dict:
+    """Собрать атлас текстур и сохранить его (см. pack_atlas).
+
+    Args:
+        textures_path (str, optional): Путь к папке текстур. По умолчанию TEXTURES_PATH.
+        atlas_path (str, optional): Путь к изображению атласа. По умолчанию ATLAS_PATH.
+        index_path (str, optional): Путь к индексу атласа. По умолчанию INDEX_PATH.
+
+    Raises:
+        OSError, pygame.error: Атлас не удалось записать.
+
+    Returns:
+        dict: Индекс атласа.
+    """
+    atlas, index = pack_atlas(textures_path)
+    os.makedirs(os.path.dirname(os.path.abspath(atlas_path)), exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    temporary_atlas_path = atlas_path[:-len(".png")] + ".tmp.png"
+    pygame.image.save(atlas, temporary_atlas_path)
+    os.replace(temporary_atlas_path, atlas_path)
+    with open(index_path + ".tmp", "w") as file:
+        json.dump(index, file, indent=1)
+    os.replace(index_path + ".tmp", index_path)
+    return index
+
+
+def read_index(index_path: str = INDEX_PATH) -> Optional[dict]:
+    """Прочитать индекс атласа.
+
+    Args:
+        index_path (str, optional): Путь к индексу атласа. По умолчанию INDEX_PATH.
+
+    Returns:
+        Optional[dict]: Индекс или None, если файл не читается или он другой версии.
+    """
+    try:
+        with open(index_path) as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != VERSION:
+        return None
+    return index
+
+
+def load_atlas(textures_path: str = TEXTURES_PATH, atlas_path: str = ATLAS_PATH,
+               index_path: str = INDEX_PATH) -> Tuple[pygame.Surface, dict]:
+    """Загрузить атлас, пересобрав его, если исходные текстуры изменились.
+
+    Экран pygame для загрузки не нужен, поэтому её можно вести в отдельном потоке.
+    Если пересобранный атлас не удалось записать (например, папка кэша только для чтения),
+    используется атлас, собранный в памяти.
+
+    Args:
+        textures_path (str, optional): Путь к папке текстур. По умолчанию TEXTURES_PATH.
+        atlas_path (str, optional): Путь к изображению атласа. По умолчанию ATLAS_PATH.
+        index_path (str, optional): Путь к индексу атласа. По умолчанию INDEX_PATH.
+
+    Returns:
+        Tuple[Surface, dict]: Изображение атласа и прямоугольники (x, y, ширина, высота) по названию текстуры.
+    """
+    index = read_index(index_path)
+    if index is None or not os.path.exists(atlas_path) or index["sources"] != source_files(textures_path):
+        try:
+            index = build_atlas(textures_path, atlas_path, index_path)
+        except (OSError, pygame.error):
+            atlas, index = pack_atlas(textures_path)
+            return atlas, index["textures"]
+    return pygame.image.load(atlas_path), index["textures"]
+
+
+if __name__ == "__main__":
+    built = build_atlas()
+    print(f"Атлас {ATLAS_PATH}: {len(built['textures'])} текстур")
@@ -0,0 +1,199 @@
+import argparse
+import os
+import random
+import time
+from typing import List
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from jnjclient.graphics import Camera, Drawer, SCREEN_HEIGHT, SCREEN_WIDTH
+from jnjclient.server_updates_handler import ServerUpdatesHandler, TILES_CHANGED
+
+PHASES = ["grid_ms", "entities_ms", "hud_ms", "flip_ms"]
+TILES = ["dirt", "grass", "bricks", "crate", "upgrade"]
+SCENARIOS = [
+    {"name": "base", "width": 183, "entities": 2, "zoom": 32, "churn": 0},
+    {"name": "wide", "width": 4096, "entities": 2, "zoom": 32, "churn": 0},
+    {"name": "crowd", "width": 183, "entities": 200, "zoom": 32, "churn": 0},
+    {"name": "zoom_out", "width": 1024, "entities": 20, "zoom": 8, "churn": 0},
+    {"name": "zoom_in", "width": 1024, "entities": 20, "zoom": 64, "churn": 0},
+    {"name": "churn", "width": 1024, "entities": 20, "zoom": 32, "churn": 8},
+]
+
+
+def synthetic_entity(entity_id: int, x: float, y: float) -> dict:
+    """Создать словарь сущности игрока, как его присылает сервер.
+
+    Args:
+        entity_id (int): ID сущности.
+        x (float): Координата x.
+        y (float): Координата y.
+
+    Returns:
+        dict: Словарь сущности.
+    """
+    return {
+        "id": entity_id,
+        "type": "player",
+        "position": {"x": x, "y": y},
+        "velocity": {"x": 0.2, "y": 0},
+        "is_on_ground": True,
+        "health": 6,
+        "boosts": {"jump_boost": 0, "speed_boost": 0, "double_jump": 0, "breaking_through": 0},
+        "checkpoints": [{"x": x, "y": y}],
+        "current_checkpoint": {"x": x, "y": y}
+    }
+
+
+def synthetic_state(width: int, entities: int, rng: random.Random, height: int = 60) -> ServerUpdatesHandler:
+    """Создать обработчик обновлений со случайным холмистым ландшафтом и сущностями.
+
+    Args:
+        width (int): Ширина ландшафта.
+        entities (int): Количество сущностей, считая игрока.
+        rng (Random): Генератор случайных чисел.
+        height (int, optional): Высота ландшафта. По умолчанию 60.
+
+    Returns:
+        ServerUpdatesHandler: Обработчик обновлений.
+    """
+    grid = []
+    ground = height // 2
+    for _ in range(width):
+        ground = min(max(ground + rng.choice([-1, 0, 0, 1]), 10), height - 5)
+        column = [""] * ground + ["grass"] + ["dirt"] * (height - ground - 1)
+        if rng.random() < 0.1:
+            column[ground - rng.randrange(3, 6)] = rng.choice(["crate", "upgrade", "bricks"])
+        grid.append(column)
+
+    entity_dicts = {}
+    for entity_id in range(entities):
+        x = rng.uniform(0, width - 1)
+        entity_dicts[str(entity_id)] = synthetic_entity(entity_id, x, grid[int(x)].index("grass") - 1.5)
+    player = entity_dicts["0"]
+    return ServerUpdatesHandler({
+        "terrain": {"grid": grid, "width": width, "height": height},
+        "entities": entity_dicts,
+        "checkpoints": {"john": player["checkpoints"], "josh": []},
+        "princess": {"x": width - 2, "y": 10},
+        "player_entity": player,
+        "player_id": "john",
+        "tick": 0,
+        "terrain_version": 0
+    })
+
+
+def synthetic_update(state: ServerUpdatesHandler, churn: int, rng: random.Random) -> dict:
+    """Создать обновление: игрок бежит вправо, остальные сущности блуждают, меняются churn плиток у игрока.
+
+    Args:
+        state (ServerUpdatesHandler): Обработчик обновлений.
+        churn (int): Количество изменённых плиток.
+        rng (Random): Генератор случайных чисел.
+
+    Returns:
+        dict: Обновление в формате сервера.
+    """
+    changes = {}
+    for key, entity in state.entities.items():
+        position = entity["position"]
+        if key == state.player_key:
+            x = (position["x"] + 0.2) % (state.terrain_width - 1)
+            y = position["y"]
+        else:
+            x = min(max(position["x"] + rng.uniform(-0.3, 0.3), 0), state.terrain_width - 1)
+            y = position["y"] + rng.uniform(-0.2, 0.2)
+        changes[key] = {"position": {"x": x, "y": y}, "velocity": {"x": x - position["x"], "y": 0}}
+
+    player_x = int(state.player_entity["position"]["x"])
+    terrain_updates = [{"x": min(max(player_x + rng.randrange(-20, 20), 0), state.terrain_width - 1),
+                        "y": rng.randrange(state.terrain_height), "tile": rng.choice(TILES + [""])}
+                       for _ in range(churn)]
+    version = state.terrain_version + (1 if churn else 0)
+    return {
+        "type": "update",
+        "tick": state.tick + 1,
+        "spawned_entities": {},
+        "entities": changes,
+        "removed_entities": [],
+        "chunks": [],
+        "actions": {"terrain": terrain_updates},
+        "terrain_version": version,
+        "terrain_base_version": state.terrain_version
+    }
+
+
+def run_scenario(scenario: dict, frames: int, seed: int = 0) -> dict:
+    """Прогнать сценарий.
+
+    Экран pygame должен быть создан до вызова.
+
+    Args:
+        scenario (dict): Сценарий ("width", "entities", "zoom", "churn").
+        frames (int): Количество кадров.
+        seed (int, optional): Зерно генератора. По умолчанию 0.
+
+    Returns:
+        dict: Средние времена фаз, кадра и обработки обновления, мс, и частота кадров.
+    """
+    rng = random.Random(seed)
+    state = synthetic_state(scenario["width"], scenario["entities"], rng)
+    camera = Camera(scenario["zoom"])
+    drawer = Drawer(camera, pygame.display.get_surface())
+    state.add_listener(TILES_CHANGED, drawer.terrain_layer.invalidate)
+
+    totals = dict.fromkeys(PHASES + ["update_ms", "frame_ms"], 0.0)
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame_start = time.perf_counter()
+        state.process_update(synthetic_update(state, scenario["churn"], rng))
+        totals["update_ms"] += (time.perf_counter() - frame_start) * 1000
+        camera.update(state.player_entity)
+        drawer.draw(state.princess, state.grid, state.entities, state.player_entity, state.tick)
+        for phase in PHASES:
+            totals[phase] += drawer.phase_times[phase]
+        totals["frame_ms"] += (time.perf_counter() - frame_start) * 1000
+    elapsed = time.perf_counter() - start
+
+    result = {key: value / frames for key, value in totals.items()}
+    result["fps"] = frames / elapsed
+    return result
+
+
+def run(scenarios: List[dict], frames: int, seed: int = 0) -> List[dict]:
+    """Прогнать сценарии и напечатать таблицу результатов.
+
+    Args:
+        scenarios (List[dict]): Сценарии.
+        frames (int): Количество кадров каждого сценария.
+        seed (int, optional): Зерно генератора. По умолчанию 0.
+
+    Returns:
+        List[dict]: Результаты сценариев вместе с их параметрами.
+    """
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    columns = ["name", "width", "entities", "zoom", "churn"] + PHASES + ["update_ms", "frame_ms", "fps"]
+    print(" ".join(f"{column:>11}" for column in columns))
+
+    results = []
+    for scenario in scenarios:
+        result = dict(scenario, **run_scenario(scenario, frames, seed))
+        results.append(result)
+        print(" ".join(f"{result[column]:>11.3f}" if isinstance(result[column], float) else f"{result[column]:>11}"
+                       for column in columns))
+    pygame.quit()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Замер отрисовки Drawer без экрана")
+    parser.add_argument("--frames", type=int, default=300, help="количество кадров сценария")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора")
+    parser.add_argument("--scenario", action="append", help="название сценария (по умолчанию все)")
+    arguments = parser.parse_args()
+    selected = [scenario for scenario in SCENARIOS
+                if arguments.scenario is None or scenario["name"] in arguments.scenario]
+    run(selected, arguments.frames, arguments.seed)
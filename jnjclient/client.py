@@ -5,7 +5,13 @@ import msgpack
 import pygame
 
 from jnjclient.graphics import Drawer, Camera
-from jnjclient.server_updates_handler import ServerUpdatesHandler
+from jnjclient.network import MAX_DATAGRAM_SIZE, NetworkThread
+from jnjclient.server_updates_handler import ServerUpdatesHandler, TILES_CHANGED
+
+INPUT_RATE = 30
+HEARTBEAT_INTERVAL = 0.25
+PING_INTERVAL = 1.0
+STATS_INTERVAL = 1.0
 
 
 class Client:
@@ -24,9 +30,17 @@ class Client:
         id (str): ID игрока.
         camera (Camera): Камера.
         drawer (Drawer): Рисовальщик
+        network (NetworkThread): Сетевой поток, принимающий обновления сервера.
+        fps (int): Ограничение частоты кадров (0 - без ограничения).
+        frame_time (float): Время работы последнего кадра без ожидания, мс.
+        sent_input (Optional[dict]): Последние отправленные данные ввода.
+        input_sent_time (float): Время последней отправки ввода (time.monotonic).
+        ping_time (float): Время последней отправки пинга (time.monotonic).
+        stats_window (Optional[tuple]): Время и счётчики сетевого потока в начале окна подсчёта частот.
+        network_stats (dict): Частота снимков, потери и поток данных за последнее окно.
     """
 
-    def __init__(self, ip: str, port: int):
+    def __init__(self, ip: str, port: int, fps: int = 60):
         """Клиент
 
         Класс для обмена данными с сервером.
@@ -34,7 +48,10 @@ class Client:
         Args:
             ip (str): IP сервера.
             port (int): Порт сервера.
+            fps (int, optional): Ограничение частоты кадров (0 - без ограничения). По умолчанию 60.
         """
+        if type(fps) != int or fps < 0:
+            raise ValueError("fps must be a non-negative integer")
         self.ip = ip
         self.port = port
 
@@ -53,37 +70,104 @@ class Client:
 
         self.camera = Camera(32)
         self.drawer = Drawer(self.camera, self.screen)
+        self.network = NetworkThread(self.sock)
+
+        self.fps = fps
+        self.frame_time = 0.0
+        self.sent_input = None
+        self.input_sent_time = 0.0
+        self.ping_time = 0.0
+        self.stats_window = None
+        self.network_stats = {}
 
     def receive_startup_data(self):
         """Получить обновления сервера.
 
         Получяет обновления, присылаемые сервером, обрабатывает их.
         """
-        startup_data = self.sock.recv(65536)
+        startup_data = self.sock.recv(MAX_DATAGRAM_SIZE)
         startup_data = msgpack.unpackb(startup_data)
         self.server = ServerUpdatesHandler(startup_data)
+        self.server.add_listener(TILES_CHANGED, self.drawer.terrain_layer.invalidate)
         self.id = self.server.id
         pygame.display.set_caption(self.id.upper())
 
+    def send_input(self, player_input: dict) -> bool:
+        """Отправить данные ввода серверу.
+
+        Ввод отправляется не чаще INPUT_RATE раз в секунду: сразу при изменении, а без изменений -
+        раз в HEARTBEAT_INTERVAL секунд, чтобы восстановить потерянную датаграмму.
+
+        Args:
+            player_input (dict): Данные ввода.
+
+        Returns:
+            bool: Отправлен ли ввод.
+        """
+        now = time.monotonic()
+        elapsed = now - self.input_sent_time
+        if elapsed < 1 / INPUT_RATE or (player_input == self.sent_input and elapsed < HEARTBEAT_INTERVAL):
+            return False
+
+        self.sock.sendto(msgpack.packb(player_input), (self.ip, self.port))
+        self.sent_input = player_input
+        self.input_sent_time = now
+        return True
+
+    def record_perf(self):
+        """Записать замер производительности в оверлей.
+
+        Частота снимков, потери и поток данных считаются по счётчикам сетевого потока раз в STATS_INTERVAL
+        секунд. Потери - доля тактов сервера, обновления которых не пришли.
+        """
+        now = time.monotonic()
+        counters = (now, self.network.bytes_received, self.network.updates_received, self.network.last_tick)
+        if self.stats_window is None:
+            self.stats_window = counters
+        elapsed = now - self.stats_window[0]
+        if elapsed >= STATS_INTERVAL:
+            _, bytes_received, updates_received, last_tick = self.stats_window
+            updates = counters[2] - updates_received
+            ticks = counters[3] - last_tick if counters[3] is not None and last_tick is not None else 0
+            self.network_stats = {
+                "snapshot_rate": updates / elapsed,
+                "bytes_per_second": (counters[1] - bytes_received) / elapsed,
+                "loss": max(0.0, 1 - updates / ticks) * 100 if ticks > 0 else None
+            }
+            self.stats_window = counters
+
+        rtt = self.network.rtt
+        self.drawer.overlay.record(dict(self.drawer.phase_times, **self.network_stats, fps=self.clock.get_fps(),
+                                        frame_ms=self.frame_time, rtt_ms=None if rtt is None else rtt * 1000))
+
     def start(self):
         """Запустить клиент.
         Запускает клиент.
         Отправляет запрос на подключение серверу.
         При готовности запускает цикл.
+        Обновления сервера принимает сетевой поток, цикл только применяет уже принятые.
+        Частота кадров ограничивается fps, время работы кадра записывается в frame_time.
+        F3 включает оверлей производительности, пока он включён, раз в PING_INTERVAL секунд отправляется пинг.
         """
         self.receive_startup_data()
+        self.network.start()
 
         walking = False
         jumping = False
         while self.running:
+            frame_start = time.perf_counter()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    running = False
-                    pygame.quit()
+                    self.running = False
 
                 if event.type == pygame.KEYDOWN:
                     if event.key in [pygame.K_w, pygame.K_SPACE]:
                         jumping = True
+                    elif event.key == pygame.K_F3:
+                        self.drawer.overlay.toggle()
+
+            if not self.running:
+                break
 
             keys = pygame.key.get_pressed()
 
@@ -94,27 +178,41 @@ class Client:
             else:
                 walking = False
 
-            self.sock.sendto(msgpack.packb(
-                {
-                    "player": self.id,
-                    "walking": walking,
-                    "jumping": jumping
-                }
-            ), (self.ip, self.port))
-            jumping = False
-
-            try:
-                update_data = self.sock.recv(1024)
-                update_data = msgpack.unpackb(update_data)
+            if self.send_input({"player": self.id, "walking": walking, "jumping": jumping}):
+                jumping = False
+
+            now = time.monotonic()
+            if self.drawer.overlay.enabled and now - self.ping_time >= PING_INTERVAL:
+                self.sock.sendto(msgpack.packb({"type": "ping", "player": self.id, "time": now}),
+                                 (self.ip, self.port))
+                self.ping_time = now
+
+            resync_request = self.server.resync_request()
+            if resync_request is not None:
+                self.sock.sendto(msgpack.packb(resync_request), (self.ip, self.port))
+
+            game_over = None
+            for update_data in self.network.drain():
                 if update_data["type"] == "update":
                     self.server.process_update(update_data)
+                elif update_data["type"] == "terrain_resync":
+                    self.server.process_resync(update_data)
+                elif update_data["type"] == "entities_resync":
+                    self.server.process_entities_resync(update_data)
                 elif update_data["type"] == "game_over":
-                    self.drawer.draw_game_over(update_data)
-                    pygame.time.wait(10000)
-                    pygame.quit()
-                    break
-            except:
-                pass
+                    game_over = update_data
+            if game_over is not None:
+                self.drawer.draw_game_over(game_over)
+                pygame.time.wait(10000)
+                break
 
             self.camera.update(self.server.player_entity)
-            self.drawer.draw(self.server.princess, self.server.grid, self.server.entities, self.server.player_entity)
+            self.drawer.draw(self.server.princess, self.server.grid, self.server.entities, self.server.player_entity,
+                             self.server.tick)
+            self.frame_time = (time.perf_counter() - frame_start) * 1000
+            self.clock.tick(self.fps)
+            self.record_perf()
+
+        self.network.stop()
+        self.drawer.overlay.close()
+        pygame.quit()
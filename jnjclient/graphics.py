@@ -1,8 +1,17 @@
+import time
+
 import pygame
-from typing import List
+from typing import List, Optional, Tuple
+
+from jnjclient.perf import PerfOverlay
+from jnjclient.textures import TextureManager
+from jnjclient.tile_grid import TileGrid
 
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
+TEXT_CACHE_SIZE = 256
+SKY_COLOR = (192, 235, 255)
+LAYER_CHUNK_SIZE = 16
 
 
 class Camera:
@@ -39,6 +48,163 @@ class Camera:
         self.x = player["position"]["x"]
         self.y = player["position"]["y"]
 
+    def is_visible(self, x: float, y: float, width: float, height: float) -> bool:
+        """Проверить, попадает ли прямоугольник на экран.
+
+        Args:
+            x (float): Координата x левого верхнего угла в плитках.
+            y (float): Координата y левого верхнего угла в плитках.
+            width (float): Ширина в плитках.
+            height (float): Высота в плитках.
+
+        Returns:
+            bool: Виден ли прямоугольник.
+        """
+        half_width = SCREEN_WIDTH / 2 / self.z
+        half_height = SCREEN_HEIGHT / 2 / self.z
+        return (x + width > self.x - half_width and x < self.x + half_width
+                and y + height > self.y - half_height and y < self.y + half_height)
+
+    def origin(self) -> Tuple[int, int]:
+        """Получить положение левого верхнего угла экрана.
+
+        Положение округляется до пикселя, чтобы фон можно было сдвигать на целое число пикселей.
+
+        Returns:
+            Tuple[int, int]: Координаты угла в пикселях мира.
+        """
+        return round(self.x * self.z) - SCREEN_WIDTH // 2, round(self.y * self.z) - SCREEN_HEIGHT // 2
+
+    def to_screen(self, x: float, y: float) -> Tuple[int, int]:
+        """Перевести координаты мира в координаты экрана.
+
+        Args:
+            x (float): Координата x в плитках.
+            y (float): Координата y в плитках.
+
+        Returns:
+            Tuple[int, int]: Координаты на экране в пикселях.
+        """
+        origin_x, origin_y = self.origin()
+        return round(x * self.z) - origin_x, round(y * self.z) - origin_y
+
+
+class TerrainLayer:
+    """Слой ландшафта.
+
+    Ландшафт рисуется заранее на поверхности чанков LAYER_CHUNK_SIZE x LAYER_CHUNK_SIZE плиток.
+    Перерисовываются только чанки с изменёнными плитками и все чанки при смене масштаба или сетки.
+    Изменённые области запоминаются, чтобы перерисовать их на фоне.
+
+    Attributes:
+        textures (TextureManager): Менеджер текстур.
+        grid (TileGrid): Сетка плиток, по которой нарисованы чанки.
+        z (int): Коэффициент масштабирования, в котором нарисованы чанки.
+        chunks (dict): Поверхности чанков по координатам чанка (None - в чанке нет плиток).
+        invalidated (list): Изменённые области плиток (x_min, y_min, x_max, y_max) с последнего take_invalidated.
+    """
+
+    def __init__(self, textures: TextureManager):
+        """Слой ландшафта.
+
+        Args:
+            textures (TextureManager): Менеджер текстур.
+        """
+        self.textures = textures
+        self.grid = None
+        self.z = textures.z
+        self.chunks = {}
+        self.invalidated = []
+
+    def invalidate(self, x_min: int, y_min: int, x_max: int, y_max: int):
+        """Сбросить чанки, задевающие область плиток.
+
+        Args:
+            x_min (int): Левая граница области.
+            y_min (int): Верхняя граница области.
+            x_max (int): Правая граница области (не включается).
+            y_max (int): Нижняя граница области (не включается).
+        """
+        for chunk_x in range(x_min // LAYER_CHUNK_SIZE, (x_max - 1) // LAYER_CHUNK_SIZE + 1):
+            for chunk_y in range(y_min // LAYER_CHUNK_SIZE, (y_max - 1) // LAYER_CHUNK_SIZE + 1):
+                self.chunks.pop((chunk_x, chunk_y), None)
+        self.invalidated.append((x_min, y_min, x_max, y_max))
+
+    def take_invalidated(self) -> list:
+        """Забрать изменённые области плиток.
+
+        Returns:
+            list: Области плиток (x_min, y_min, x_max, y_max).
+        """
+        invalidated = self.invalidated
+        self.invalidated = []
+        return invalidated
+
+    def sync(self, grid: TileGrid) -> bool:
+        """Сбросить все чанки при смене сетки или масштаба.
+
+        Args:
+            grid (TileGrid): Сетка плиток.
+
+        Returns:
+            bool: Были ли сброшены чанки.
+        """
+        if grid is self.grid and self.textures.z == self.z:
+            return False
+        self.grid = grid
+        self.z = self.textures.z
+        self.chunks = {}
+        self.invalidated = []
+        return True
+
+    def render_chunk(self, chunk_x: int, chunk_y: int) -> Optional[pygame.Surface]:
+        """Нарисовать чанк.
+
+        Args:
+            chunk_x (int): Координата x чанка.
+            chunk_y (int): Координата y чанка.
+
+        Returns:
+            Optional[Surface]: Поверхность чанка или None, если в чанке нет плиток.
+        """
+        surface = None
+        grid = self.grid
+        x_min = chunk_x * LAYER_CHUNK_SIZE
+        y_min = chunk_y * LAYER_CHUNK_SIZE
+        y_start = max(y_min, 0)
+        y_end = min(y_min + LAYER_CHUNK_SIZE, grid.height)
+        for x in range(max(x_min, 0), min(x_min + LAYER_CHUNK_SIZE, grid.width)):
+            offset = x * grid.height
+            for y, tile in enumerate(grid.tiles[offset + y_start:offset + y_end], y_start):
+                if tile == 0:
+                    continue
+                if surface is None:
+                    surface = pygame.Surface((LAYER_CHUNK_SIZE * self.z, LAYER_CHUNK_SIZE * self.z)).convert()
+                    surface.fill(SKY_COLOR)
+                surface.blit(self.textures.get(grid.names[tile]), ((x - x_min) * self.z, (y - y_min) * self.z))
+        return surface
+
+    def draw(self, surface: pygame.Surface, camera: Camera, area: pygame.Rect):
+        """Нарисовать чанки, попадающие в область экрана.
+
+        Args:
+            surface (Surface): Поверхность размером с экран.
+            camera (Camera): Камера.
+            area (Rect): Область экрана.
+        """
+        origin_x, origin_y = camera.origin()
+        size = LAYER_CHUNK_SIZE * self.z
+        surface.set_clip(area)
+        for chunk_x in range((area.left + origin_x) // size, (area.right - 1 + origin_x) // size + 1):
+            for chunk_y in range((area.top + origin_y) // size, (area.bottom - 1 + origin_y) // size + 1):
+                key = (chunk_x, chunk_y)
+                if key not in self.chunks:
+                    self.chunks[key] = self.render_chunk(chunk_x, chunk_y)
+                chunk = self.chunks[key]
+                if chunk is not None:
+                    surface.blit(chunk, (chunk_x * size - origin_x, chunk_y * size - origin_y))
+        surface.set_clip(None)
+
 
 class Drawer:
     """Рисовальщик.
@@ -48,16 +214,28 @@ class Drawer:
     Attributes:
         camera (Camera): Камера.
         screen (Surface): Экран pygame.
-        tile_images (dict): Словарь изображений плиток.
-        heart_image (Surface): Изображение сердца (для отображения здоровья).
-        checkpoint_active_image (Surface): Изображение активного чекпоинта.
-        checkpoint_inactive_image (Surface): Изображение неактивного чекпоинта.
-        princess_image (Surface): Изображение принцессы.
-        player_images (dict): Словарь изображений игрока.
+        textures (TextureManager): Менеджер текстур.
+        terrain_layer (TerrainLayer): Слой ландшафта.
+        heart_image (Optional[Surface]): Изображение сердца (для отображения здоровья), создаётся при первой
+            отрисовке интерфейса.
         boosts_names (dict): Словарь названий усилений.
         animation_frame (int): Текущий кадр анимации.
         font (Font): Обычный шрифт.
         game_over_font (Font): Шрифт экрана конца игры.
+        text_cache (dict): Отрисованные строки по шрифту, тексту и цвету.
+        hud (Optional[tuple]): Состояние интерфейса, по которому нарисовано hud_image.
+        hud_image (Optional[Surface]): Изображение интерфейса.
+        hud_rect (Optional[Rect]): Область экрана, занятая интерфейсом.
+        background (Surface): Фон (небо и ландшафт) размером с экран.
+        background_origin (Optional[Tuple[int, int]]): Положение камеры, для которого нарисован фон
+            (None - фон нужно нарисовать целиком).
+        sprites (list): Изображения текущего кадра с координатами на экране.
+        sprite_rects (list): Области экрана, занятые изображениями прошлого кадра.
+        overlay (PerfOverlay): Оверлей производительности.
+        overlay_font (Font): Шрифт оверлея.
+        overlay_rect (Optional[Rect]): Область экрана, занятая оверлеем в прошлом кадре.
+        phase_times (dict): Время фаз отрисовки последнего кадра, мс ("grid_ms", "entities_ms", "hud_ms",
+            "flip_ms").
 
     """
 
@@ -72,25 +250,9 @@ class Drawer:
         """
         self.camera = camera
         self.screen = screen
-        self.tile_images = {
-            "dirt": pygame.image.load("jnjclient/assets/textures/tiles/dirt.png"),
-            "grass": pygame.image.load("jnjclient/assets/textures/tiles/grass.png"),
-            "bricks": pygame.image.load("jnjclient/assets/textures/tiles/bricks.png"),
-            "crate": pygame.image.load("jnjclient/assets/textures/tiles/crate.png"),
-            "upgrade": pygame.image.load("jnjclient/assets/textures/tiles/upgrade.png"),
-        }
-
-        self.heart_image = pygame.transform.scale(pygame.image.load("jnjclient/assets/textures/heart.png"), (32, 32))
-        self.checkpoint_active_image = pygame.image.load("jnjclient/assets/textures/checkpoint_active.png")
-        self.checkpoint_inactive_image = pygame.image.load("jnjclient/assets/textures/checkpoint_inactive.png")
-        self.princess_image = pygame.image.load("jnjclient/assets/textures/princess.png")
-
-        self.player_images = {
-            "default": pygame.image.load("jnjclient/assets/textures/player/player_default.png"),
-            "jump": pygame.image.load("jnjclient/assets/textures/player/player_jump.png"),
-            "run_0": pygame.image.load("jnjclient/assets/textures/player/player_run_0.png"),
-            "run_1": pygame.image.load("jnjclient/assets/textures/player/player_run_1.png")
-        }
+        self.textures = TextureManager(camera.z)
+        self.terrain_layer = TerrainLayer(self.textures)
+        self.heart_image = None
 
         self.boosts_names = {
             "jump_boost": "Усиление прыжка",
@@ -103,20 +265,37 @@ class Drawer:
 
         self.font = pygame.font.SysFont(None, 32)
         self.game_over_font = pygame.font.SysFont(None, 72)
-
-    def draw_image(self, image, pos):
+        self.text_cache = {}
+        self.hud = None
+        self.hud_image = None
+        self.hud_rect = None
+
+        self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.background_origin = None
+        self.sprites = []
+        self.sprite_rects = []
+
+        self.overlay = PerfOverlay()
+        self.overlay_font = pygame.font.SysFont(None, 22)
+        self.overlay_rect = None
+        self.phase_times = {}
+
+    def draw_image(self, name: str, pos: dict, flipped: bool = False):
         """Нарисовать извображение.
 
-        Рисует предоставленное изображение на предоставленных координатах относительно камеры.
+        Добавляет в кадр текстуру с предоставленным названием на предоставленных координатах относительно камеры.
+        Изображения за пределами экрана пропускаются.
 
         Args:
-            image (Surface): Изображение pygame.
+            name (str): Название текстуры.
             pos (dict): Словарь с координатами.
+            flipped (bool, optional): Отразить по горизонтали. По умолчанию False.
         """
-        image = pygame.transform.scale(image, (
-            image.get_size()[0] * self.camera.z / 16, image.get_size()[1] * self.camera.z / 16))
-        self.screen.blit(image, ((pos["x"] - self.camera.x) * self.camera.z + SCREEN_WIDTH / 2,
-                                 (pos["y"] - self.camera.y) * self.camera.z + SCREEN_HEIGHT / 2))
+        image = self.textures.get(name, flipped)
+        if not self.camera.is_visible(pos["x"], pos["y"], image.get_width() / self.camera.z,
+                                      image.get_height() / self.camera.z):
+            return
+        self.sprites.append((image, self.camera.to_screen(pos["x"], pos["y"])))
 
     def draw_entity(self, entity: dict):
         """Нарисовать сущность.
@@ -139,17 +318,15 @@ class Drawer:
         Args:
             entity (dict): Словарь игрока.
         """
-        image = self.player_images["default"]
+        image = "player_default"
         if entity["velocity"]["x"] != 0:
             if self.animation_frame % 2 == 0:
-                image = self.player_images["run_0"]
+                image = "player_run_0"
             else:
-                image = self.player_images["run_1"]
+                image = "player_run_1"
         if not entity["is_on_ground"]:
-            image = self.player_images["jump"]
-        if entity["velocity"]["x"] < 0:
-            image = pygame.transform.flip(image, 1, 0)
-        self.draw_image(image, entity["position"])
+            image = "player_jump"
+        self.draw_image(image, entity["position"], entity["velocity"]["x"] < 0)
 
     def update_animation_frame(self):
         """Обновить кадр анимации.
@@ -158,18 +335,61 @@ class Drawer:
         """
         self.animation_frame = (self.animation_frame + 1) % 128
 
-    def draw_grid(self, grid: List[List[str]]):
-        """Нарисовать сетку.
+    def paint_background(self, area: pygame.Rect):
+        """Нарисовать область фона.
 
-        Рисует сетку плиток ландшафта.
+        Args:
+            area (Rect): Область экрана.
+        """
+        self.background.fill(SKY_COLOR, area)
+        self.terrain_layer.draw(self.background, self.camera, area)
+
+    def update_background(self, grid: TileGrid) -> Optional[List[pygame.Rect]]:
+        """Обновить фон.
+
+        При движении камеры фон сдвигается, и дорисовываются только открывшиеся полосы.
+        Без движения перерисовываются только области изменённых плиток.
 
         Args:
-            grid (List[List[str]]): Сетка плиток.
+            grid (TileGrid): Сетка плиток.
+
+        Returns:
+            Optional[List[Rect]]: Изменённые области экрана или None, если изменился весь фон.
         """
-        for x in range(len(grid)):
-            for y in range(len(grid[x])):
-                if grid[x][y] != '':
-                    self.draw_image(self.tile_images[grid[x][y]], {"x": x, "y": y})
+        screen_rect = self.screen.get_rect()
+        origin = self.camera.origin()
+        reset = self.terrain_layer.sync(grid)
+        previous = self.background_origin
+        self.background_origin = origin
+
+        if reset or previous is None or abs(origin[0] - previous[0]) >= SCREEN_WIDTH \
+                or abs(origin[1] - previous[1]) >= SCREEN_HEIGHT:
+            self.terrain_layer.take_invalidated()
+            self.paint_background(screen_rect)
+            return None
+
+        dx = origin[0] - previous[0]
+        dy = origin[1] - previous[1]
+        if dx or dy:
+            self.background.scroll(-dx, -dy)
+            if dx > 0:
+                self.paint_background(pygame.Rect(SCREEN_WIDTH - dx, 0, dx, SCREEN_HEIGHT))
+            elif dx < 0:
+                self.paint_background(pygame.Rect(0, 0, -dx, SCREEN_HEIGHT))
+            if dy > 0:
+                self.paint_background(pygame.Rect(0, SCREEN_HEIGHT - dy, SCREEN_WIDTH, dy))
+            elif dy < 0:
+                self.paint_background(pygame.Rect(0, 0, SCREEN_WIDTH, -dy))
+
+        changed = []
+        for x_min, y_min, x_max, y_max in self.terrain_layer.take_invalidated():
+            left, top = self.camera.to_screen(x_min, y_min)
+            right, bottom = self.camera.to_screen(x_max, y_max)
+            area = pygame.Rect(left, top, right - left, bottom - top).clip(screen_rect)
+            if area.width and area.height:
+                self.paint_background(area)
+                changed.append(area)
+        return None if dx or dy else changed
 
     def draw_entities(self, entities: dict):
         """Нарисовать сущности.
@@ -182,32 +402,140 @@ class Drawer:
         for entity in entities.values():
             self.draw_entity(entity)
 
-    def draw_health(self, entity: dict):
-        """Нарисовать здоровье.
+    def render_text(self, font: pygame.font.Font, text: str,
+                    color: Tuple[int, int, int] = (255, 0, 0)) -> pygame.Surface:
+        """Отрисовать текст.
+
+        Отрисованные строки кэшируются, кэш очищается при превышении TEXT_CACHE_SIZE строк.
 
-        Рисует здоровье предоставленной сущности в виде кол-ва сердечек в левом верхнем углу экрана.
+        Args:
+            font (Font): Шрифт.
+            text (str): Текст.
+            color (Tuple[int, int, int], optional): Цвет. По умолчанию красный.
+
+        Returns:
+            Surface: Изображение текста.
+        """
+        key = (font, text, color)
+        image = self.text_cache.get(key)
+        if image is None:
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache = {}
+            image = font.render(text, True, color)
+            self.text_cache[key] = image
+        return image
+
+    def hud_state(self, entity: dict, tick: int) -> tuple:
+        """Получить отображаемое состояние интерфейса.
+
+        Оставшееся время усилений считается по такту окончания усиления и текущему такту сервера.
 
         Args:
             entity (dict): Словарь сущности.
+            tick (int): Текущий такт сервера.
+
+        Returns:
+            tuple: Здоровье и кортеж пар (усиление, оставшиеся секунды) активных усилений.
         """
-        for i in range(entity["health"]):
-            self.screen.blit(self.heart_image, (32 + i * 36, 32))
+        boosts = tuple((boost, int((expiry - tick) / 30)) for boost, expiry in entity["boosts"].items()
+                       if expiry > tick)
+        return entity["health"], boosts
+
+    def render_hud(self, state: tuple) -> pygame.Surface:
+        """Отрисовать интерфейс.
 
-    def draw_boosts(self, entity: dict):
-        """Нарисовать усиления.
+        Рисует здоровье в виде кол-ва сердечек и под ним усиления с оставшимся временем.
 
-        Рисует здорусиления предоставленной сущности в левом верхнем углу экрана под здоровьем.
+        Args:
+            state (tuple): Состояние интерфейса (см. hud_state).
+
+        Returns:
+            Surface: Изображение интерфейса.
+        """
+        health, boosts = state
+        if self.heart_image is None:
+            self.heart_image = pygame.transform.scale(self.textures.original("heart"), (32, 32))
+        texts = [self.render_text(self.font, self.boosts_names[boost] + ": " + str(seconds) + " секунд")
+                 for boost, seconds in boosts]
+        width = max([max(health, 0) * 36] + [text.get_width() for text in texts])
+        surface = pygame.Surface((max(width, 1), 32 + len(texts) * 36), pygame.SRCALPHA)
+        for i in range(health):
+            surface.blit(self.heart_image, (i * 36, 0))
+        for row, text in enumerate(texts):
+            surface.blit(text, (0, 32 + row * 36))
+        return surface
+
+    def update_hud(self, entity: dict, tick: int) -> bool:
+        """Обновить интерфейс.
+
+        Изображение интерфейса перерисовывается, только когда меняется его состояние.
 
         Args:
             entity (dict): Словарь сущности.
+            tick (int): Текущий такт сервера.
+
+        Returns:
+            bool: Изменилось ли изображение интерфейса.
         """
-        boosts = [boost for boost in entity["boosts"].keys() if entity["boosts"][boost]]
-        row = 0
-        for boost in boosts:
-            img = self.font.render(self.boosts_names[boost] + ": " + str(int(entity["boosts"][boost] / 30)) + " секунд",
-                                   True, (255, 0, 0))
-            self.screen.blit(img, (32, 64 + row * 36))
-            row += 1
+        state = self.hud_state(entity, tick)
+        if state == self.hud:
+            return False
+        self.hud = state
+        self.hud_image = self.render_hud(state)
+        return True
+
+    def present(self, background_rects: Optional[List[pygame.Rect]], hud_changed: bool):
+        """Вывести кадр на экран.
+
+        На экране восстанавливается фон под изображениями прошлого кадра и в изменённых областях фона,
+        поверх рисуются изображения кадра и интерфейс. Обновляются только затронутые области экрана.
+        Интерфейс рисуется в левом верхнем углу экрана заново, только если он изменился или его задели.
+        Включённый оверлей производительности рисуется в правом верхнем углу поверх всего каждый кадр.
+
+        Args:
+            background_rects (Optional[List[Rect]]): Изменённые области фона (None - изменился весь фон).
+            hud_changed (bool): Изменилось ли изображение интерфейса.
+        """
+        sprite_rects = [image.get_rect(topleft=position) for image, position in self.sprites]
+        hud_rect = self.hud_image.get_rect(topleft=(32, 32))
+        overlay_image = self.overlay.get_image(self.overlay_font)
+        overlay_rect = None
+        if overlay_image is not None:
+            overlay_rect = overlay_image.get_rect(topright=(SCREEN_WIDTH - 16, 16))
+
+        if background_rects is None:
+            self.screen.blit(self.background, (0, 0))
+            for image, position in self.sprites:
+                self.screen.blit(image, position)
+            self.screen.blit(self.hud_image, hud_rect)
+            if overlay_image is not None:
+                self.screen.blit(overlay_image, overlay_rect)
+            pygame.display.update()
+        else:
+            restored = self.sprite_rects + background_rects
+            if self.overlay_rect is not None:
+                restored.append(self.overlay_rect)
+            old_hud_rect = self.hud_rect if self.hud_rect is not None else hud_rect
+            redraw_hud = hud_changed or self.hud_rect is None or \
+                any(old_hud_rect.colliderect(rect) or hud_rect.colliderect(rect) for rect in restored + sprite_rects)
+            if redraw_hud:
+                restored.append(old_hud_rect)
+            for rect in restored:
+                self.screen.blit(self.background, rect, rect)
+            for image, position in self.sprites:
+                self.screen.blit(image, position)
+            if redraw_hud:
+                self.screen.blit(self.hud_image, hud_rect)
+                restored.append(hud_rect)
+            if overlay_image is not None:
+                self.screen.blit(overlay_image, overlay_rect)
+                restored.append(overlay_rect)
+            pygame.display.update(restored + sprite_rects)
+
+        self.sprite_rects = sprite_rects
+        self.hud_rect = hud_rect
+        self.overlay_rect = overlay_rect
+        self.sprites = []
 
     def draw_checkpoints(self, player_entity: dict):
         """Нарисовать чекпоинты.
@@ -218,9 +546,9 @@ class Drawer:
             player_entity (_type_): Словарь сущности.
         """
         for checkpoint in player_entity["checkpoints"]:
-            image = self.checkpoint_inactive_image
+            image = "checkpoint_inactive"
             if checkpoint == player_entity["current_checkpoint"]:
-                image = self.checkpoint_active_image
+                image = "checkpoint_active"
             self.draw_image(image, checkpoint)
 
     def draw_princess(self, princess: dict):
@@ -231,7 +559,7 @@ class Drawer:
         Args:
             princess (dict): Словарь координат принцессы.
         """
-        self.draw_image(self.princess_image, princess)
+        self.draw_image("princess", princess)
 
     def draw_game_over(self, game_over: dict):
         """Нарисовать экран завершения игры.
@@ -242,31 +570,44 @@ class Drawer:
             game_over (dict): Словарь конца игры.
         """
         self.screen.fill((0, 0, 0))
-        image_row_1 = self.game_over_font.render(f"ИГРА ОКОНЧЕНА", True, (255, 0, 0))
-        image_row_2 = self.game_over_font.render(f"ПОБЕДИЛ: {game_over['winner']}", True, (255, 0, 0))
-        image_row_3 = self.game_over_font.render(f"ПРОИГРАЛ: {game_over['looser']}", True, (255, 0, 0))
+        image_row_1 = self.render_text(self.game_over_font, "ИГРА ОКОНЧЕНА")
+        image_row_2 = self.render_text(self.game_over_font, f"ПОБЕДИЛ: {game_over['winner']}")
+        image_row_3 = self.render_text(self.game_over_font, f"ПРОИГРАЛ: {game_over['looser']}")
         self.screen.blit(image_row_1, (128, 128))
         self.screen.blit(image_row_2, (128, 170))
         self.screen.blit(image_row_3, (128, 212))
         pygame.display.update()
+        self.background_origin = None
 
-    def draw(self, princess: dict, grid: List[List[str]], entities: dict, player_entity: dict):
+    def draw(self, princess: dict, grid: TileGrid, entities: dict, player_entity: dict, tick: int):
         """Нарисовать кадр.
 
         Вызыват все методы отрисовки игрового мира в правильном порядке.
+        На экран выводятся только изменившиеся области кадра. Время фаз записывается в phase_times.
 
         Args:
             princess (dict): Словарь координат принцессы.
-            grid (List[List[str]]): Сетка плиток.
+            grid (TileGrid): Сетка плиток.
             entities (dict): Словарь сущностей.
             player_entity (dict): Словарь сущности игрока.
+            tick (int): Текущий такт сервера.
         """
-        self.screen.fill((192, 235, 255))
-        self.draw_grid(grid)
+        start = time.perf_counter()
+        self.textures.set_zoom(self.camera.z)
+        background_rects = self.update_background(grid)
+        grid_done = time.perf_counter()
         self.draw_checkpoints(player_entity)
         self.draw_entities(entities)
         self.draw_princess(princess)
         self.update_animation_frame()
-        self.draw_health(player_entity)
-        self.draw_boosts(player_entity)
-        pygame.display.update()
+        entities_done = time.perf_counter()
+        hud_changed = self.update_hud(player_entity, tick)
+        hud_done = time.perf_counter()
+        self.present(background_rects, hud_changed)
+        flip_done = time.perf_counter()
+        self.phase_times = {
+            "grid_ms": (grid_done - start) * 1000,
+            "entities_ms": (entities_done - grid_done) * 1000,
+            "hud_ms": (hud_done - entities_done) * 1000,
+            "flip_ms": (flip_done - hud_done) * 1000
+        }
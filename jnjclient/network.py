@@ -0,0 +1,108 @@
+import socket
+import time
+from collections import deque
+from threading import Thread
+from typing import List
+
+import msgpack
+
+MAX_DATAGRAM_SIZE = 65507
+RECEIVE_TIMEOUT = 0.5
+
+
+class NetworkThread(Thread):
+    """Сетевой поток клиента.
+
+    Принимает датаграммы сервера, распаковывает их и складывает в очередь, пока цикл отрисовки работает
+    без ожидания сети. Очередь - deque, добавление и изъятие из которой потокобезопасны без блокировок.
+    Ответы на пинг обрабатываются сразу в потоке, чтобы RTT не зависел от частоты кадров.
+    Счётчики только растут, частоты считает читающий по разнице значений.
+
+    Attributes:
+        sock (socket): Сокет клиента.
+        messages (deque): Очередь принятых сообщений.
+        running (bool): Работает ли поток.
+        bytes_received (int): Принято байт.
+        updates_received (int): Принято обновлений.
+        first_tick (Optional[int]): Такт первого принятого обновления.
+        last_tick (Optional[int]): Наибольший такт принятого обновления.
+        rtt (Optional[float]): Последнее время пинга до сервера и обратно, с.
+    """
+
+    def __init__(self, sock: socket.socket):
+        """Сетевой поток клиента.
+
+        Args:
+            sock (socket): Сокет клиента.
+        """
+        super().__init__(daemon=True)
+        self.sock = sock
+        self.messages = deque()
+        self.running = True
+        self.bytes_received = 0
+        self.updates_received = 0
+        self.first_tick = None
+        self.last_tick = None
+        self.rtt = None
+
+    def run(self):
+        """Принимать датаграммы, пока поток не остановлен.
+
+        Таймаут сокета нужен только для проверки остановки, повреждённые датаграммы (в том числе без нужных
+        полей) отбрасываются, не останавливая поток.
+        """
+        self.sock.settimeout(RECEIVE_TIMEOUT)
+        while self.running:
+            try:
+                data = self.sock.recv(MAX_DATAGRAM_SIZE)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            try:
+                self.receive(data)
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def receive(self, data: bytes):
+        """Обработать принятую датаграмму.
+
+        Args:
+            data (bytes): Датаграмма.
+
+        Raises:
+            ValueError, KeyError, TypeError: Повреждённая датаграмма.
+        """
+        message = msgpack.unpackb(data)
+        if type(message) != dict:
+            return
+
+        self.bytes_received += len(data)
+        if message.get("type") == "pong":
+            self.rtt = time.monotonic() - message["time"]
+            return
+        if message.get("type") == "update":
+            tick = message["tick"]
+            if type(tick) != int:
+                raise ValueError('tick should be a int')
+            self.last_tick = tick if self.last_tick is None else max(self.last_tick, tick)
+            if self.first_tick is None:
+                self.first_tick = tick
+            self.updates_received += 1
+        self.messages.append(message)
+
+    def drain(self) -> List[dict]:
+        """Забрать все принятые сообщения.
+
+        Returns:
+            List[dict]: Сообщения в порядке приёма.
+        """
+        messages = []
+        while self.messages:
+            messages.append(self.messages.popleft())
+        return messages
+
+    def stop(self):
+        """Остановить поток."""
+        self.running = False
@@ -0,0 +1,174 @@
+import csv
+import os
+import time
+from collections import deque
+from typing import Optional
+
+import pygame
+
+from jnjserver.paths import user_dir
+
+GRAPH_LENGTH = 120
+GRAPH_HEIGHT = 40
+REFRESH_INTERVAL = 0.25
+DATA_PATH = user_dir("data", "jnjclient")
+CSV_PATH = os.path.join(DATA_PATH, "perf.csv")
+FIELDS = ["time", "fps", "frame_ms", "grid_ms", "entities_ms", "hud_ms", "flip_ms", "snapshot_rate", "rtt_ms",
+          "loss", "bytes_per_second"]
+GRAPHS = [("frame_ms", "Кадр, мс", (255, 255, 0)), ("rtt_ms", "RTT, мс", (0, 255, 255)),
+          ("bytes_per_second", "Приём, Б/с", (0, 255, 0))]
+
+
+class PerfOverlay:
+    """Оверлей производительности.
+
+    Показывает частоту кадров, время фаз отрисовки, частоту снимков сервера, RTT, потери и поток данных
+    с графиками последних GRAPH_LENGTH замеров. Пока оверлей включён, замеры пишутся в CSV.
+    Изображение оверлея перерисовывается не чаще раза в REFRESH_INTERVAL секунд.
+
+    Attributes:
+        enabled (bool): Включён ли оверлей.
+        csv_path (str): Путь к CSV файлу замеров.
+        csv_file (Optional[TextIO]): Открытый CSV файл.
+        writer (Optional[DictWriter]): Запись CSV.
+        sample (dict): Последний замер.
+        history (dict): Последние замеры по названию величины.
+        image (Optional[Surface]): Изображение оверлея.
+        rendered_time (float): Время последней перерисовки изображения (time.monotonic).
+    """
+
+    def __init__(self, csv_path: str = CSV_PATH):
+        """Оверлей производительности.
+
+        Args:
+            csv_path (str, optional): Путь к CSV файлу замеров. По умолчанию CSV_PATH.
+        """
+        self.enabled = False
+        self.csv_path = csv_path
+        self.csv_file = None
+        self.writer = None
+        self.sample = {}
+        self.history = {field: deque(maxlen=GRAPH_LENGTH) for field, _, _ in GRAPHS}
+        self.image = None
+        self.rendered_time = 0.0
+
+    def toggle(self):
+        """Включить или выключить оверлей.
+
+        При включении CSV файл открывается на дозапись (папка создаётся при необходимости), при выключении закрывается.
+        """
+        self.enabled = not self.enabled
+        if self.enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(self.csv_path)), exist_ok=True)
+            new_file = not self.csv_exists()
+            self.csv_file = open(self.csv_path, "a", newline="")
+            self.writer = csv.DictWriter(self.csv_file, FIELDS)
+            if new_file:
+                self.writer.writeheader()
+        else:
+            self.close()
+
+    def csv_exists(self) -> bool:
+        """Существует ли непустой CSV файл.
+
+        Returns:
+            bool: Есть ли в файле данные.
+        """
+        try:
+            with open(self.csv_path) as file:
+                return bool(file.read(1))
+        except FileNotFoundError:
+            return False
+
+    def close(self):
+        """Закрыть CSV файл."""
+        if self.csv_file is not None:
+            self.csv_file.close()
+        self.csv_file = None
+        self.writer = None
+
+    def record(self, sample: dict):
+        """Записать замер.
+
+        Args:
+            sample (dict): Значения величин FIELDS, кроме времени (None - величина ещё не измерена).
+        """
+        if not self.enabled:
+            return
+        self.sample = dict(sample, time=round(time.time(), 3))
+        for field in self.history:
+            self.history[field].append(sample.get(field))
+        self.writer.writerow(self.sample)
+
+    def format(self) -> list:
+        """Получить строки оверлея.
+
+        Returns:
+            list: Строки текста.
+        """
+
+        def value(field: str, digits: int = 1) -> str:
+            number = self.sample.get(field)
+            return "-" if number is None else f"{number:.{digits}f}"
+
+        return [
+            f"FPS {value('fps', 0)}  кадр {value('frame_ms')} мс",
+            f"фон {value('grid_ms')}  спрайты {value('entities_ms')}  интерфейс {value('hud_ms')}  "
+            f"вывод {value('flip_ms')} мс",
+            f"снимки {value('snapshot_rate', 0)}/с  RTT {value('rtt_ms')} мс  потери {value('loss')}%",
+            f"приём {value('bytes_per_second', 0)} Б/с",
+        ]
+
+    def render(self, font: pygame.font.Font) -> pygame.Surface:
+        """Нарисовать оверлей.
+
+        Args:
+            font (Font): Шрифт.
+
+        Returns:
+            Surface: Изображение оверлея.
+        """
+        lines = [font.render(line, True, (255, 255, 255)) for line in self.format()]
+        labels = [font.render(label, True, color) for _, label, color in GRAPHS]
+        width = max([GRAPH_LENGTH * len(GRAPHS) + 8 * (len(GRAPHS) + 1)] + [line.get_width() + 16 for line in lines])
+        text_height = sum(line.get_height() for line in lines)
+        label_height = max(label.get_height() for label in labels)
+        surface = pygame.Surface((width, text_height + GRAPH_HEIGHT + label_height + 24), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 160))
+
+        y = 8
+        for line in lines:
+            surface.blit(line, (8, y))
+            y += line.get_height()
+
+        y += 8
+        for index, (field, _, color) in enumerate(GRAPHS):
+            left = 8 + index * (GRAPH_LENGTH + 8)
+            pygame.draw.rect(surface, (96, 96, 96), (left, y, GRAPH_LENGTH, GRAPH_HEIGHT), 1)
+            surface.blit(labels[index], (left, y + GRAPH_HEIGHT + 4))
+            values = [number for number in self.history[field] if number is not None]
+            top = max(values, default=0)
+            if top <= 0:
+                continue
+            points = [(left + column, y + GRAPH_HEIGHT - 1 - number / top * (GRAPH_HEIGHT - 2))
+                      for column, number in enumerate(self.history[field]) if number is not None]
+            if len(points) > 1:
+                pygame.draw.lines(surface, color, False, points)
+        return surface
+
+    def get_image(self, font: pygame.font.Font) -> Optional[pygame.Surface]:
+        """Получить изображение оверлея, перерисовав его, если прошло REFRESH_INTERVAL секунд.
+
+        Args:
+            font (Font): Шрифт.
+
+        Returns:
+            Optional[Surface]: Изображение оверлея или None, если оверлей выключен.
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        if self.image is None or now - self.rendered_time >= REFRESH_INTERVAL:
+            self.image = self.render(font)
+            self.rendered_time = now
+        return self.image
@@ -1,17 +1,47 @@
+from typing import Callable, Optional
+
+from jnjclient.tile_grid import TileGrid
+from jnjserver.protocol import RESYNC_RETRY_TICKS, STREAM_RADIUS
+
+TILES_CHANGED = "tiles_changed"
+ENTITY_SPAWNED = "entity_spawned"
+ENTITY_MOVED = "entity_moved"
+ENTITY_REMOVED = "entity_removed"
+STATS_CHANGED = "stats_changed"
+EVENTS = [TILES_CHANGED, ENTITY_SPAWNED, ENTITY_MOVED, ENTITY_REMOVED, STATS_CHANGED]
+STAT_FIELDS = ["health", "boosts", "checkpoints", "current_checkpoint"]
+
+
 class ServerUpdatesHandler:
     """Обработчик обновлений.
 
     Обрабатывает принятые с сервера данные обновлений текущей игры.
+    Плитки хранятся в TileGrid, сущности - в таблице по ID и обновляются на месте. Об изменениях
+    оповещаются слушатели событий:
+    TILES_CHANGED (x_min, y_min, x_max, y_max) - изменилась область плиток, правая и нижняя границы не включаются;
+    ENTITY_SPAWNED (key, entity) - появилась сущность;
+    ENTITY_MOVED (key, entity) - сущность переместилась;
+    ENTITY_REMOVED (key) - сущность удалена;
+    STATS_CHANGED (entity) - изменились здоровье, усиления или чекпоинты игрока.
 
     Attributes:
-        grid (List[List[str]]): Двумерный список плиток.
+        grid (TileGrid): Сетка плиток.
         terrain_width (int): Ширина ландшафта в плитках.
         terrain_height (int): Высота ландшафта в плитках.
         entities (dict): Словарь сущностей.
         checkpoints (dict): Словарь чекпоинтов.
         princess (dict): Словарь координат принцессы.
         player_entity (dict): Словарь сущности игрока.
+        player_key (str): ID сущности игрока строкой.
         id: (str): ID игрока ("john", "josh").
+        tick (int): Такт сервера, к которому относятся данные.
+        terrain_version (int): Версия ландшафта, полностью известная клиенту.
+        resync_needed (bool): Пропущены ли изменения ландшафта.
+        resync_requested_tick (Optional[int]): Такт последнего запроса догоняния (None - не запрашивалось).
+        resync_parts (dict): Принятые части догоняния по версии.
+        entities_resync_needed (bool): Пропущены ли изменения сущностей.
+        entities_resync_parts (dict): ID сущностей в принятых частях догоняния сущностей по номеру части.
+        listeners (dict): Слушатели по событию.
     """
 
     def __init__(self, startup_data: dict):
@@ -22,25 +52,228 @@ class ServerUpdatesHandler:
         Args:
             startup_data (dict): Словарь начальных данных.
         """
-        self.grid = startup_data["terrain"]["grid"]
+        self.listeners = {event: [] for event in EVENTS}
         self.terrain_width = startup_data["terrain"]["width"]
         self.terrain_height = startup_data["terrain"]["height"]
+        if "chunks" in startup_data["terrain"]:
+            # Генерируемый и разбитый на чанки ландшафт присылается по мере приближения игроков
+            self.grid = TileGrid(self.terrain_width, self.terrain_height)
+            for name in startup_data["terrain"].get("palette", []):
+                self.grid.tile_id(name)
+            self.apply_chunks(startup_data["terrain"]["chunks"])
+        else:
+            self.grid = TileGrid.from_columns(startup_data["terrain"]["grid"], self.terrain_height)
         self.entities = startup_data["entities"]
         self.checkpoints = startup_data["checkpoints"]
         self.princess = startup_data["princess"]
-        self.player_entity = startup_data["player_entity"]
+        self.player_key = str(startup_data["player_entity"]["id"])
+        self.player_entity = self.entities[self.player_key]
         self.id = startup_data["player_id"]
+        self.tick = startup_data["tick"]
+        self.terrain_version = startup_data["terrain_version"]
+        self.resync_needed = False
+        self.resync_requested_tick = None
+        self.resync_parts = {}
+        self.entities_resync_needed = False
+        self.entities_resync_parts = {}
 
     def process_update(self, update_data: dict):
         """Обработать обновление
 
         Обрабатывает обновление, присланное с сервера.
+        Сервер присылает полные записи только о появившихся сущностях, а для остальных - только изменённые поля.
+        Изменённые поля-словари (координаты, скорость, усиления) обновляются на месте.
+        Обновления присылаются каждый такт, поэтому пропуск такта значит пропуск изменений сущностей:
+        они применяются, но запрашивается догоняние сущностей. Обновления не новее уже применённого
+        (переставленные или повторённые сетью) отбрасываются.
 
         Args:
             update_data (dict): Словарь с данными обновления.
         """
-        self.entities = update_data["entities"]
+        if update_data["tick"] <= self.tick:
+            return
+        if update_data["tick"] != self.tick + 1:
+            self.entities_resync_needed = True
+        self.tick = update_data["tick"]
+        self.entities_resync_parts = {}
+        for key, entity in update_data["spawned_entities"].items():
+            self.entities[key] = entity
+            self.notify(ENTITY_SPAWNED, key, entity)
+            if key == self.player_key:
+                self.notify(STATS_CHANGED, entity)
+
+        for key, changes in update_data["entities"].items():
+            entity = self.entities.get(key)
+            if entity is None:
+                self.entities_resync_needed = True
+                continue
+            for field, value in changes.items():
+                current = entity.get(field)
+                if type(current) == dict and type(value) == dict:
+                    current.update(value)
+                else:
+                    entity[field] = value
+            if "position" in changes:
+                self.notify(ENTITY_MOVED, key, entity)
+            if key == self.player_key and any(field in changes for field in STAT_FIELDS):
+                self.notify(STATS_CHANGED, entity)
+
+        for entity_id in update_data["removed_entities"]:
+            key = str(entity_id)
+            if self.entities.pop(key, None) is not None:
+                self.notify(ENTITY_REMOVED, key)
+
+        self.player_entity = self.entities[self.player_key]
+        self.apply_chunks(update_data["chunks"])
+        if update_data["terrain_version"] <= self.terrain_version:
+            return
+
+        # Изменения применяются и при пропуске, догоняние перезапишет все плитки, изменённые с известной версии
+        self.apply_terrain_updates(update_data["actions"]["terrain"])
+        if update_data["terrain_base_version"] == self.terrain_version and not self.resync_needed:
+            self.terrain_version = update_data["terrain_version"]
+        else:
+            self.resync_needed = True
+
+    def add_listener(self, event: str, listener: Callable):
+        """Добавить слушателя события.
+
+        Args:
+            event (str): Событие (см. EVENTS).
+            listener (Callable): Слушатель, аргументы зависят от события.
+
+        Raises:
+            ValueError: Неизвестное событие.
+        """
+        if event not in self.listeners:
+            raise ValueError(f'unknown event {event}')
+        self.listeners[event].append(listener)
+
+    def notify(self, event: str, *args):
+        """Оповестить слушателей события.
+
+        Args:
+            event (str): Событие.
+            *args: Аргументы события.
+        """
+        for listener in self.listeners[event]:
+            listener(*args)
+
+    def apply_terrain_updates(self, terrain_updates: list):
+        """Применить изменения плиток.
+
+        Args:
+            terrain_updates (list): Список изменений плиток.
+        """
+        for grid_update in terrain_updates:
+            x = grid_update["x"]
+            y = grid_update["y"]
+            if self.grid.is_loaded(x, y):
+                self.grid.set(x, y, grid_update["tile"])
+                self.notify(TILES_CHANGED, x, y, x + 1, y + 1)
+
+    def apply_chunks(self, chunks: list):
+        """Записать присланные чанки ландшафта.
+
+        Args:
+            chunks (list): Список данных чанков (координаты левой верхней плитки и столбцы).
+        """
+        for chunk in chunks:
+            for local_x, tiles in enumerate(chunk["columns"]):
+                self.grid.set_column(chunk["x"] + local_x, chunk["y"], tiles)
+            if chunk["columns"]:
+                self.notify(TILES_CHANGED, chunk["x"], chunk["y"], chunk["x"] + len(chunk["columns"]),
+                            chunk["y"] + max(len(tiles) for tiles in chunk["columns"]))
+
+    def missing_columns(self) -> Optional[list]:
+        """Найти ещё не присланные полностью столбцы ландшафта рядом с игроком.
+
+        Returns:
+            Optional[list]: Первый и последний отсутствующие столбцы или None, если все на месте.
+        """
+        player_x = int(self.player_entity["position"]["x"])
+        missing = [x for x in range(max(0, player_x - STREAM_RADIUS), min(player_x + STREAM_RADIUS, self.grid.width))
+                   if not self.grid.is_column_loaded(x)]
+        if not missing:
+            return None
+        return [missing[0], missing[-1]]
+
+    def resync_request(self) -> Optional[dict]:
+        """Получить запрос догоняния ландшафта.
+
+        Запрос нужен при пропуске изменений ландшафта или сущностей и при отсутствии столбцов рядом с игроком.
+        Запрос повторяется раз в RESYNC_RETRY_TICKS тактов, пока догоняние не завершится.
+
+        Returns:
+            Optional[dict]: Запрос догоняния или None, если он не нужен.
+        """
+        missing_columns = self.missing_columns()
+        if not self.resync_needed and not self.entities_resync_needed and missing_columns is None:
+            return None
+        if self.resync_requested_tick is not None and self.tick - self.resync_requested_tick < RESYNC_RETRY_TICKS:
+            return None
+
+        self.resync_requested_tick = self.tick
+        return {
+            "type": "resync",
+            "player": self.id,
+            "terrain_version": self.terrain_version,
+            "columns": missing_columns,
+            "entities": self.entities_resync_needed
+        }
+
+    def process_resync(self, resync_data: dict):
+        """Обработать часть догоняния ландшафта.
+
+        Версия ландшафта обновляется, когда приняты все части догоняния.
+
+        Args:
+            resync_data (dict): Часть догоняния.
+        """
+        version = resync_data["version"]
+        if version < self.terrain_version:
+            return
+
+        self.apply_chunks(resync_data["chunks"])
+        self.apply_terrain_updates(resync_data["updates"])
+
+        parts = self.resync_parts.setdefault(version, set())
+        parts.add(resync_data["part"])
+        if len(parts) == resync_data["parts"]:
+            self.resync_parts = {}
+            self.terrain_version = version
+            self.resync_needed = False
+            self.resync_requested_tick = None
+
+    def process_entities_resync(self, resync_data: dict):
+        """Обработать часть догоняния сущностей.
+
+        Части содержат полное состояние сущностей на такт сервера и применяются, только пока не принято
+        обновление следующего такта. Когда приняты все части, удаляются сущности, которых в них не было.
+
+        Args:
+            resync_data (dict): Часть догоняния.
+        """
+        if resync_data["tick"] != self.tick:
+            return
+
+        for key, entity in resync_data["entities"].items():
+            self.entities[key] = entity
+            self.notify(ENTITY_SPAWNED, key, entity)
+            if key == self.player_key:
+                self.notify(STATS_CHANGED, entity)
+        self.player_entity = self.entities[self.player_key]
+
+        self.entities_resync_parts[resync_data["part"]] = resync_data["entities"].keys()
+        if len(self.entities_resync_parts) < resync_data["parts"]:
+            return
 
-        self.player_entity = update_data["player_entity"]
-        for grid_update in update_data["actions"]["terrain"]:
-            self.grid[grid_update["x"]][grid_update["y"]] = grid_update["tile"]
+        resynced = set()
+        for keys in self.entities_resync_parts.values():
+            resynced.update(keys)
+        for key in [key for key in self.entities if key not in resynced]:
+            del self.entities[key]
+            self.notify(ENTITY_REMOVED, key)
+        self.entities_resync_parts = {}
+        self.entities_resync_needed = False
+        self.resync_requested_tick = None
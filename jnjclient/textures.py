@@ -0,0 +1,152 @@
+from threading import Thread
+
+import pygame
+
+from jnjclient.atlas import ATLAS_PATH, INDEX_PATH, TEXTURES_PATH, load_atlas
+
+TEXTURES = {
+    "dirt": "tiles/dirt",
+    "grass": "tiles/grass",
+    "bricks": "tiles/bricks",
+    "crate": "tiles/crate",
+    "upgrade": "tiles/upgrade",
+    "heart": "heart",
+    "checkpoint_active": "checkpoint_active",
+    "checkpoint_inactive": "checkpoint_inactive",
+    "princess": "princess",
+    "player_default": "player/player_default",
+    "player_jump": "player/player_jump",
+    "player_run_0": "player/player_run_0",
+    "player_run_1": "player/player_run_1",
+}
+
+
+class TextureManager:
+    """Менеджер текстур.
+
+    Текстуры берутся из одного атласа (см. jnjclient.atlas), который загружается в отдельном потоке,
+    пока клиент подключается к серверу. Атлас переводится в формат экрана и масштабируется под камеру
+    целиком, обычный и отражённый, при первом обращении и при смене масштаба. Текстуры - части этих
+    изображений.
+
+    Attributes:
+        loader (Thread): Поток загрузки атласа.
+        loaded (Optional[tuple]): Загруженные изображение атласа и прямоугольники текстур.
+        error (Optional[Exception]): Ошибка загрузки атласа.
+        atlas (Optional[Surface]): Атлас в формате экрана (None - ещё не получен из потока загрузки).
+        rects (dict): Прямоугольники текстур в атласе по названию текстуры.
+        z (int): Коэффициент масштабирования кэшированных вариантов.
+        scaled (dict): Масштабированные атласы по отражению.
+        images (dict): Масштабированные изображения по названию текстуры и отражению.
+    """
+
+    def __init__(self, z: int = 8, textures_path: str = TEXTURES_PATH, atlas_path: str = ATLAS_PATH,
+                 index_path: str = INDEX_PATH):
+        """Менеджер текстур.
+
+        Загрузка атласа начинается сразу. Экран pygame должен быть создан до первого обращения к текстурам.
+
+        Args:
+            z (int, optional): Коэффициент масштабирования. По умолчанию 8.
+            textures_path (str, optional): Путь к папке исходных текстур. По умолчанию TEXTURES_PATH.
+            atlas_path (str, optional): Путь к изображению атласа. По умолчанию ATLAS_PATH.
+            index_path (str, optional): Путь к индексу атласа. По умолчанию INDEX_PATH.
+        """
+        self.loaded = None
+        self.error = None
+        self.loader = Thread(target=self.load, args=(textures_path, atlas_path, index_path), daemon=True)
+        self.loader.start()
+
+        self.atlas = None
+        self.rects = {}
+        self.z = z
+        self.scaled = {}
+        self.images = {}
+
+    def load(self, textures_path: str, atlas_path: str, index_path: str):
+        """Загрузить атлас (выполняется в потоке загрузки).
+
+        Args:
+            textures_path (str): Путь к папке исходных текстур.
+            atlas_path (str): Путь к изображению атласа.
+            index_path (str): Путь к индексу атласа.
+        """
+        try:
+            self.loaded = load_atlas(textures_path, atlas_path, index_path)
+        except Exception as error:
+            self.error = error
+
+    def wait(self):
+        """Дождаться загрузки атласа и перевести его в формат экрана.
+
+        Raises:
+            RuntimeError: Атлас не загрузился.
+        """
+        if self.atlas is not None:
+            return
+        self.loader.join()
+        if self.error is not None:
+            raise RuntimeError("texture atlas could not be loaded") from self.error
+
+        atlas, rects = self.loaded
+        self.atlas = atlas.convert_alpha()
+        self.rects = {name: pygame.Rect(rects[key]) for name, key in TEXTURES.items()}
+        self.loaded = None
+
+    def set_zoom(self, z: int):
+        """Установить коэффициент масштабирования.
+
+        Кэш масштабированных изображений сбрасывается только при изменении коэффициента.
+
+        Args:
+            z (int): Коэффициент масштабирования.
+        """
+        if z != self.z:
+            self.z = z
+            self.scaled = {}
+            self.images = {}
+
+    def original(self, name: str) -> pygame.Surface:
+        """Получить исходное изображение.
+
+        Args:
+            name (str): Название текстуры.
+
+        Returns:
+            Surface: Изображение в исходном размере.
+        """
+        self.wait()
+        return self.atlas.subsurface(self.rects[name])
+
+    def get(self, name: str, flipped: bool = False) -> pygame.Surface:
+        """Получить изображение в масштабе камеры.
+
+        Плитка 16 пикселей изображения занимает z пикселей экрана.
+
+        Args:
+            name (str): Название текстуры.
+            flipped (bool, optional): Отразить по горизонтали. По умолчанию False.
+
+        Returns:
+            Surface: Масштабированное изображение.
+        """
+        key = (name, flipped)
+        image = self.images.get(key)
+        if image is None:
+            self.wait()
+            atlas = self.scaled.get(flipped)
+            if atlas is None:
+                atlas = pygame.transform.scale(self.atlas, (self.atlas.get_width() * self.z // 16,
+                                                            self.atlas.get_height() * self.z // 16))
+                if flipped:
+                    atlas = pygame.transform.flip(atlas, True, False)
+                self.scaled[flipped] = atlas
+
+            x, y, width, height = self.rects[name]
+            x, y = x * self.z // 16, y * self.z // 16
+            width, height = int(width * self.z / 16), int(height * self.z / 16)
+            if flipped:
+                x = atlas.get_width() - x - width
+            image = atlas.subsurface((x, y, width, height))
+            self.images[key] = image
+        return image
@@ -0,0 +1,157 @@
+from math import ceil
+from typing import List
+
+CHUNK_SIZE = 32
+
+
+class TileGrid:
+    """Сетка плиток клиента.
+
+    Плитки хранятся номерами в одном bytearray по столбцам (номер плитки (x, y) - tiles[x * height + y]),
+    названия - в таблице names. Номер 0 - пустая плитка "". Ландшафт присылается чанками по CHUNK_SIZE строк
+    по мере приближения игроков, поэтому присланность хранится для каждой части столбца в CHUNK_SIZE строк.
+    Пока часть не прислана, её плитки считаются пустыми, а столбец - не присланным.
+
+    Attributes:
+        width (int): Ширина в плитках.
+        height (int): Высота в плитках.
+        tiles (bytearray): Номера плиток.
+        chunks_y (int): Количество частей столбца по CHUNK_SIZE строк.
+        loaded (bytearray): Присланы ли части столбцов (1 - прислана),
+            номер части с плиткой (x, y) - x * chunks_y + y // CHUNK_SIZE.
+        names (List[str]): Названия плиток по номеру.
+        ids (dict): Номера плиток по названию.
+    """
+
+    def __init__(self, width: int, height: int):
+        """Сетка плиток клиента.
+
+        Args:
+            width (int): Ширина в плитках.
+            height (int): Высота в плитках.
+
+        Raises:
+            ValueError: Размеры - неотрицательные целые числа.
+        """
+        if type(width) != int or type(height) != int or width < 0 or height < 0:
+            raise ValueError("width and height should be non-negative integers")
+        self.width = width
+        self.height = height
+        self.tiles = bytearray(width * height)
+        self.chunks_y = ceil(height / CHUNK_SIZE)
+        self.loaded = bytearray(width * self.chunks_y)
+        self.names = [""]
+        self.ids = {"": 0}
+
+    @staticmethod
+    def from_columns(columns: List[List[str]], height: int) -> "TileGrid":
+        """Создать сетку из столбцов названий плиток.
+
+        Args:
+            columns (List[List[str]]): Столбцы, пустой список - столбец не прислан.
+            height (int): Высота в плитках.
+
+        Returns:
+            TileGrid: Сетка плиток.
+        """
+        grid = TileGrid(len(columns), height)
+        for x, column in enumerate(columns):
+            if column:
+                grid.set_column(x, 0, column)
+        return grid
+
+    def tile_id(self, name: str) -> int:
+        """Получить номер плитки, добавив название в таблицу при необходимости.
+
+        Args:
+            name (str): Название плитки.
+
+        Raises:
+            ValueError: Названий плиток больше 256.
+
+        Returns:
+            int: Номер плитки.
+        """
+        tile_id = self.ids.get(name)
+        if tile_id is None:
+            if len(self.names) == 256:
+                raise ValueError("too many tile names")
+            tile_id = len(self.names)
+            self.names.append(name)
+            self.ids[name] = tile_id
+        return tile_id
+
+    def get(self, x: int, y: int) -> str:
+        """Получить название плитки.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+
+        Returns:
+            str: Название плитки.
+        """
+        return self.names[self.tiles[x * self.height + y]]
+
+    def set(self, x: int, y: int, name: str):
+        """Записать плитку в присланный столбец.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            name (str): Название плитки.
+        """
+        self.tiles[x * self.height + y] = self.tile_id(name)
+
+    def is_loaded(self, x: int, y: int) -> bool:
+        """Прислана ли часть столбца с плиткой.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+
+        Returns:
+            bool: Прислана ли часть столбца.
+        """
+        return bool(self.loaded[x * self.chunks_y + y // CHUNK_SIZE])
+
+    def is_column_loaded(self, x: int) -> bool:
+        """Присланы ли все части столбца.
+
+        Args:
+            x (int): Координата x.
+
+        Returns:
+            bool: Присланы ли все части столбца.
+        """
+        start = x * self.chunks_y
+        return all(self.loaded[start:start + self.chunks_y])
+
+    def set_column(self, x: int, y: int, names: List[str]):
+        """Записать часть столбца и отметить присланными покрытые ею части по CHUNK_SIZE строк.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y верхней плитки.
+            names (List[str]): Названия плиток сверху вниз.
+        """
+        start = x * self.height + y
+        self.tiles[start:start + len(names)] = bytes(self.tile_id(name) for name in names)
+        if names:
+            first = x * self.chunks_y + y // CHUNK_SIZE
+            last = x * self.chunks_y + (y + len(names) - 1) // CHUNK_SIZE
+            self.loaded[first:last + 1] = b"\x01" * (last - first + 1)
+
+    def column(self, x: int) -> List[str]:
+        """Получить столбец названий плиток.
+
+        Args:
+            x (int): Координата x.
+
+        Returns:
+            List[str]: Названия плиток сверху вниз или пустой список, если столбец прислан не полностью.
+        """
+        if not self.is_column_loaded(x):
+            return []
+        start = x * self.height
+        return [self.names[tile] for tile in self.tiles[start:start + self.height]]
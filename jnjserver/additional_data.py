@@ -46,9 +46,20 @@ class AdditionalDataLoader:
         Returns:
             AdditionalData: Дополнительные данные.
         """
-        json_data = open(json_path)
-        data = json.load(json_data)
+        with open(json_path) as json_data:
+            data = json.load(json_data)
+        return AdditionalDataLoader.parse(data)
 
+    @staticmethod
+    def parse(data: dict) -> AdditionalData:
+        """Создать дополнительные данные из разобранного JSON.
+
+        Args:
+            data (dict): Словарь дополнительных данных.
+
+        Returns:
+            AdditionalData: Дополнительные данные.
+        """
         checkpoints = {
             "john": [],
             "josh": []
@@ -0,0 +1,411 @@
+import json
+import mmap
+import struct
+from collections import OrderedDict
+from math import ceil, floor
+from typing import BinaryIO, List, TextIO, Tuple
+from jnjserver.terrain import CHUNK_SIZE, STREAM_CHUNKS_PER_UPDATE, Terrain, TerrainLog
+
+MAGIC = b"JNJT"
+VERSION = 1
+HEADER = struct.Struct("<4sHIIH")
+DATA_OFFSET = 8192
+MAX_TILES = 256
+
+
+class ChunkedTerrain(Terrain):
+    """Ландшафт, разбитый на чанки в отображённом в память файле.
+
+    Ландшафт хранится в файле чанками CHUNK_SIZE x CHUNK_SIZE плиток, по байту (номеру в палитре) на плитку.
+    Чанки загружаются при первом обращении и выгружаются, когда загруженных чанков больше бюджета
+    (первыми выгружаются давно не использованные). Файл отображается в память с копированием при записи,
+    поэтому изменения ландшафта во время игры не попадают в файл уровня.
+
+    Attributes:
+        width (int): Ширина ландшафта.
+        height (int): Высота ландшафта.
+        chunks_x (int): Количество чанков по горизонтали.
+        chunks_y (int): Количество чанков по вертикали.
+        palette (List[str]): Названия плиток по номерам.
+        palette_indexes (dict): Номера плиток по названиям.
+        max_chunks (int): Бюджет загруженных чанков.
+        chunks (OrderedDict): Загруженные чанки по координатам чанка (от давно использованных к недавним).
+        dirty_chunks (set): Координаты загруженных чанков, изменённых после загрузки.
+        last_key (tuple): Координаты последнего прочитанного чанка.
+        last_chunk (bytearray): Последний прочитанный чанк.
+        map (mmap): Отображённый в память файл ландшафта.
+        log (TerrainLog): Журнал изменений ландшафта.
+        listeners (list): Слушатели изменений ландшафта.
+        streamed (set): Координаты x полос, поставленных в очередь отправки клиентам.
+        new_chunks (List[Tuple[int, int]]): Координаты чанков, которые нужно отправить клиентам.
+    """
+
+    def __init__(self, path: str, max_chunks: int = 256, offset: int = 0):
+        """Ландшафт, разбитый на чанки в отображённом в память файле.
+
+        Args:
+            path (str): Путь к файлу ландшафта (см. ChunkedTerrainLoader.convert).
+            max_chunks (int, optional): Бюджет загруженных чанков. По умолчанию 256 (256 КБ).
+            offset (int, optional): Смещение ландшафта в файле, кратное mmap.ALLOCATIONGRANULARITY.
+                По умолчанию 0.
+
+        Raises:
+            ValueError: Бюджет - положительное целое число.
+            ValueError: Файл не является файлом ландшафта.
+        """
+        if type(max_chunks) != int or max_chunks < 1:
+            raise ValueError('max_chunks should be a positive int')
+
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY, offset=offset)
+
+        magic, version, width, height, chunk_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or chunk_size != CHUNK_SIZE:
+            self.map.close()
+            raise ValueError(f'{path} is not a terrain chunks file')
+
+        palette_length = struct.unpack_from("<I", self.map, HEADER.size)[0]
+        palette_start = HEADER.size + 4
+        self.palette = json.loads(self.map[palette_start:palette_start + palette_length].decode("utf-8"))
+        self.palette_indexes = {tile: index for index, tile in enumerate(self.palette)}
+
+        self.width = width
+        self.height = height
+        self.chunks_x = ceil(width / CHUNK_SIZE)
+        self.chunks_y = ceil(height / CHUNK_SIZE)
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+        self.dirty_chunks = set()
+        self.last_key = None
+        self.last_chunk = None
+        self.log = TerrainLog()
+        self.listeners = []
+        self.streamed = set()
+        self.new_chunks = []
+
+    def chunk_offset(self, chunk_x: int, chunk_y: int) -> int:
+        """Получить смещение чанка в файле.
+
+        Args:
+            chunk_x (int): Координата x чанка.
+            chunk_y (int): Координата y чанка.
+
+        Returns:
+            int: Смещение чанка в байтах.
+        """
+        return DATA_OFFSET + (chunk_y * self.chunks_x + chunk_x) * CHUNK_SIZE * CHUNK_SIZE
+
+    def chunk(self, chunk_x: int, chunk_y: int) -> bytearray:
+        """Получить чанк, загрузив его при необходимости.
+
+        Args:
+            chunk_x (int): Координата x чанка.
+            chunk_y (int): Координата y чанка.
+
+        Returns:
+            bytearray: Номера плиток чанка (столбцами).
+        """
+        key = (chunk_x, chunk_y)
+        if key == self.last_key:
+            return self.last_chunk
+
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            offset = self.chunk_offset(chunk_x, chunk_y)
+            chunk = bytearray(self.map[offset:offset + CHUNK_SIZE * CHUNK_SIZE])
+            self.chunks[key] = chunk
+            while len(self.chunks) > self.max_chunks:
+                self.evict()
+        else:
+            self.chunks.move_to_end(key)
+
+        self.last_key = key
+        self.last_chunk = chunk
+        return chunk
+
+    def evict(self):
+        """Выгрузить давно не использованный чанк.
+
+        Изменённый чанк записывается в отображённую память (в файл уровня изменения не попадают).
+        """
+        key, chunk = self.chunks.popitem(last=False)
+        if key in self.dirty_chunks:
+            self.dirty_chunks.discard(key)
+            offset = self.chunk_offset(*key)
+            self.map[offset:offset + CHUNK_SIZE * CHUNK_SIZE] = chunk
+        if key == self.last_key:
+            self.last_key = None
+            self.last_chunk = None
+
+    def prefetch(self, x: float, y: float, radius: int):
+        """Загрузить чанки вокруг точки.
+
+        Вызывается миром для игроков, чтобы чанки вокруг них не выгружались.
+        Полосы в радиусе, впервые попавшие в окрестность игроков, ставятся в очередь отправки клиентам.
+
+        Args:
+            x (float): Координата x.
+            y (float): Координата y.
+            radius (int): Радиус в плитках.
+        """
+        chunk_x_min = max(0, floor(x - radius) // CHUNK_SIZE)
+        chunk_x_max = min(self.chunks_x - 1, floor(x + radius) // CHUNK_SIZE)
+        chunk_y_min = max(0, floor(y - radius) // CHUNK_SIZE)
+        chunk_y_max = min(self.chunks_y - 1, floor(y + radius) // CHUNK_SIZE)
+        for chunk_x in range(chunk_x_min, chunk_x_max + 1):
+            for chunk_y in range(chunk_y_min, chunk_y_max + 1):
+                self.chunk(chunk_x, chunk_y)
+        for chunk_x in range(chunk_x_min, chunk_x_max + 1):
+            self.stream(chunk_x)
+
+    def columns(self, chunk_x: int) -> List[List[str]]:
+        """Получить столбцы полосы шириной CHUNK_SIZE плиток, загрузив её чанки при необходимости.
+
+        Args:
+            chunk_x (int): Координата x полосы.
+
+        Returns:
+            List[List[str]]: Столбцы полосы.
+        """
+        palette = self.palette
+        chunks = [self.chunk(chunk_x, chunk_y) for chunk_y in range(self.chunks_y)]
+        columns = []
+        for local_x in range(min(CHUNK_SIZE, self.width - chunk_x * CHUNK_SIZE)):
+            start = local_x * CHUNK_SIZE
+            column = []
+            for chunk in chunks:
+                column.extend(palette[index] for index in chunk[start:start + CHUNK_SIZE])
+            columns.append(column[:self.height])
+        return columns
+
+    def chunk_data(self, chunk_x: int, chunk_y: int) -> dict:
+        """Получить данные о чанке ландшафта, прочитав названия плиток прямо из байтов чанка.
+
+        Args:
+            chunk_x (int): Координата x чанка.
+            chunk_y (int): Координата y чанка.
+
+        Returns:
+            dict: Координаты левой верхней плитки чанка и столбцы названий плиток.
+        """
+        palette = self.palette
+        chunk = self.chunk(chunk_x, chunk_y)
+        y_min = chunk_y * CHUNK_SIZE
+        rows = min(CHUNK_SIZE, self.height - y_min)
+        columns = []
+        for local_x in range(min(CHUNK_SIZE, self.width - chunk_x * CHUNK_SIZE)):
+            start = local_x * CHUNK_SIZE
+            columns.append([palette[index] for index in chunk[start:start + rows]])
+        return {
+            "x": chunk_x * CHUNK_SIZE,
+            "y": y_min,
+            "columns": columns
+        }
+
+    def get_tile(self, x: int, y: int) -> str:
+        """Получить название плитки на координатах.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+
+        Raises:
+            ValueError: Координата x - целое число.
+            ValueError: Координата y - целое число.
+            ValueError: Нет плитки на координатах.
+
+        Returns:
+            str: Название плитки.
+        """
+        if type(x) != int:
+            raise ValueError('x should be a int')
+
+        if type(y) != int:
+            raise ValueError('y should be a int')
+
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            raise ValueError(f'There is no tile with x: {x}, y: {y}')
+
+        chunk = self.chunk(x // CHUNK_SIZE, y // CHUNK_SIZE)
+        return self.palette[chunk[x % CHUNK_SIZE * CHUNK_SIZE + y % CHUNK_SIZE]]
+
+    def store_tile(self, x: int, y: int, tile: str):
+        """Записать название плитки на координатах.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            tile (str): Название плитки.
+
+        Raises:
+            ValueError: Нет плитки на координатах.
+            ValueError: Слишком много разных плиток.
+        """
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            raise ValueError(f'There is no tile with x: {x}, y: {y}')
+
+        index = self.palette_indexes.get(tile)
+        if index is None:
+            if len(self.palette) >= MAX_TILES:
+                raise ValueError(f'terrain can not have more than {MAX_TILES} tiles')
+            index = len(self.palette)
+            self.palette.append(tile)
+            self.palette_indexes[tile] = index
+
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        self.chunk(*key)[x % CHUNK_SIZE * CHUNK_SIZE + y % CHUNK_SIZE] = index
+        self.dirty_chunks.add(key)
+
+    def stream(self, chunk_x: int):
+        """Поставить чанки полосы в очередь отправки клиентам, если полоса ещё не отправлялась.
+
+        Args:
+            chunk_x (int): Координата x полосы.
+        """
+        if chunk_x not in self.streamed:
+            self.streamed.add(chunk_x)
+            self.new_chunks.extend((chunk_x, chunk_y) for chunk_y in range(self.chunks_y))
+
+    def extract_chunks(self) -> List[dict]:
+        """Извлечь чанки, которые нужно отправить клиентам.
+
+        За раз извлекается не больше STREAM_CHUNKS_PER_UPDATE чанков, чтобы обновление поместилось
+        в одну UDP датаграмму. Остальные отправляются в следующих обновлениях.
+
+        Returns:
+            List[dict]: Данные чанков.
+        """
+        keys = self.new_chunks[:STREAM_CHUNKS_PER_UPDATE]
+        del self.new_chunks[:STREAM_CHUNKS_PER_UPDATE]
+        return [self.chunk_data(chunk_x, chunk_y) for chunk_x, chunk_y in keys]
+
+    def startup_data(self) -> dict:
+        """Получить начальные данные о ландшафте.
+
+        Весь ландшафт не отправляется: полосы рядом с игроками приходят в обновлениях,
+        недостающие клиент запрашивает догонянием.
+
+        Returns:
+            dict: Размеры ландшафта и палитра.
+        """
+        return {
+            "grid": [],
+            "width": self.width,
+            "height": self.height,
+            "palette": list(self.palette),
+            "chunks": []
+        }
+
+    def close(self):
+        """Закрыть файл ландшафта."""
+        self.chunks.clear()
+        self.last_key = None
+        self.last_chunk = None
+        self.map.close()
+
+
+class ChunkedTerrainLoader:
+    @staticmethod
+    def convert(csv_path: str, path: str):
+        """Преобразовать CSV файл ландшафта в файл чанков.
+
+        Args:
+            csv_path (str): Путь к CSV файлу.
+            path (str): Путь к файлу чанков.
+
+        Raises:
+            ValueError: Строки CSV файла разной длины.
+            ValueError: Слишком много разных плиток.
+        """
+        with open(csv_path) as csv_file, open(path, "wb") as file:
+            ChunkedTerrainLoader.write(csv_file, file, csv_path)
+
+    @staticmethod
+    def write(csv_file: TextIO, file: BinaryIO, name: str = "terrain") -> Tuple[int, int, List[str]]:
+        """Записать ландшафт из CSV файла в формате чанков.
+
+        Ландшафт записывается с текущей позиции файла.
+        CSV файл читается и записывается полосами по CHUNK_SIZE строк, поэтому весь ландшафт не держится в памяти.
+
+        Args:
+            csv_file (TextIO): Открытый CSV файл.
+            file (BinaryIO): Открытый для записи файл чанков.
+            name (str, optional): Название ландшафта для сообщений об ошибках.
+
+        Raises:
+            ValueError: Строки CSV файла разной длины.
+            ValueError: Слишком много разных плиток.
+
+        Returns:
+            Tuple[int, int, List[str]]: Ширина, высота и палитра (названия плиток по номерам).
+        """
+        palette = [""]
+        palette_indexes = {"": 0}
+        width = None
+        height = 0
+
+        def index_of(tile: str) -> int:
+            if tile == "air":
+                tile = ""
+            index = palette_indexes.get(tile)
+            if index is None:
+                if len(palette) >= MAX_TILES:
+                    raise ValueError(f'terrain can not have more than {MAX_TILES} tiles')
+                index = len(palette)
+                palette.append(tile)
+                palette_indexes[tile] = index
+            return index
+
+        def write_band(band: List[List[int]]):
+            # Чанки хранятся полосами по CHUNK_SIZE строк, внутри чанка плитки лежат столбцами
+            for chunk_x in range(ceil(width / CHUNK_SIZE)):
+                chunk = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+                for local_y, row in enumerate(band):
+                    for local_x, index in enumerate(row[chunk_x * CHUNK_SIZE:(chunk_x + 1) * CHUNK_SIZE]):
+                        chunk[local_x * CHUNK_SIZE + local_y] = index
+                file.write(chunk)
+
+        start = file.tell()
+        band = []
+        file.write(bytes(DATA_OFFSET))
+        for row in csv_file:
+            tiles = row[:-1].split(';')
+            if width is None:
+                width = len(tiles)
+            elif len(tiles) != width:
+                raise ValueError(f'row {height} of {name} has {len(tiles)} tiles instead of {width}')
+            band.append([index_of(tile) for tile in tiles])
+            height += 1
+            if len(band) == CHUNK_SIZE:
+                write_band(band)
+                band = []
+        if band:
+            write_band(band)
+        if width is None:
+            raise ValueError(f'{name} is empty')
+
+        palette_data = json.dumps(palette).encode("utf-8")
+        if HEADER.size + 4 + len(palette_data) > DATA_OFFSET:
+            raise ValueError('terrain palette is too long')
+        end = file.tell()
+        file.seek(start)
+        file.write(HEADER.pack(MAGIC, VERSION, width, height, CHUNK_SIZE))
+        file.write(struct.pack("<I", len(palette_data)))
+        file.write(palette_data)
+        file.seek(end)
+        return width, height, palette
+
+    @staticmethod
+    def load(path: str, max_chunks: int = 256) -> ChunkedTerrain:
+        """Загрузить ландшафт из файла чанков.
+
+        Читается только заголовок, чанки загружаются по мере обращения к ним.
+
+        Args:
+            path (str): Путь к файлу чанков.
+            max_chunks (int, optional): Бюджет загруженных чанков. По умолчанию 256.
+
+        Returns:
+            ChunkedTerrain: Ландшафт.
+        """
+        return ChunkedTerrain(path, max_chunks)
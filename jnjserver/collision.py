@@ -0,0 +1,126 @@
+from typing import List, Tuple
+from jnjserver.terrain import CHUNK_SIZE, Terrain, TileSet
+
+Rect = Tuple[int, int, int, int]
+
+
+def merge_rects(solid: List[List[bool]], x_offset: int, y_offset: int) -> List[Rect]:
+    """Объединить твёрдые плитки в прямоугольники.
+
+    Жадно берёт первую свободную твёрдую плитку по строкам, растягивает её вправо, затем вниз,
+    пока все плитки прямоугольника твёрдые и свободные.
+
+    Args:
+        solid (List[List[bool]]): Твёрдость плиток области по столбцам.
+        x_offset (int): Координата x левого столбца области.
+        y_offset (int): Координата y верхней строки области.
+
+    Returns:
+        List[Rect]: Прямоугольники (x0, y0, x1, y1), правая и нижняя границы не включаются.
+    """
+    width = len(solid)
+    height = len(solid[0]) if width else 0
+    used = [[False] * height for _ in range(width)]
+    rects = []
+
+    for y in range(height):
+        for x in range(width):
+            if not solid[x][y] or used[x][y]:
+                continue
+
+            x_end = x + 1
+            while x_end < width and solid[x_end][y] and not used[x_end][y]:
+                x_end += 1
+
+            y_end = y + 1
+            while y_end < height and all(solid[column][y_end] and not used[column][y_end]
+                                         for column in range(x, x_end)):
+                y_end += 1
+
+            for column in range(x, x_end):
+                used[column][y:y_end] = [True] * (y_end - y)
+            rects.append((x + x_offset, y + y_offset, x_end + x_offset, y_end + y_offset))
+    return rects
+
+
+class CollisionRects:
+    """Прямоугольники столкновений ландшафта.
+
+    Ландшафт делится на области CHUNK_SIZE x CHUNK_SIZE, твёрдые плитки каждой области объединяются
+    в прямоугольники. Длинный пол или стена проверяются одним прямоугольником вместо десятков плиток.
+    Прямоугольники области строятся при первом запросе и перестраиваются после изменения её плиток.
+
+    Attributes:
+        terrain (Terrain): Ландшафт.
+        tileset (TileSet): Сет плиток.
+        regions (dict): Прямоугольники по координатам области.
+    """
+
+    def __init__(self, terrain: Terrain, tileset: TileSet):
+        """Прямоугольники столкновений ландшафта.
+
+        Args:
+            terrain (Terrain): Ландшафт.
+            tileset (TileSet): Сет плиток.
+        """
+        self.terrain = terrain
+        self.tileset = tileset
+        self.regions = {}
+        terrain.add_listener(self.on_tile_changed)
+
+    def on_tile_changed(self, x: int, y: int, tile: str):
+        """Сбросить прямоугольники области изменённой плитки.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            tile (str): Новое название плитки.
+        """
+        self.regions.pop((x // CHUNK_SIZE, y // CHUNK_SIZE), None)
+
+    def region(self, region_x: int, region_y: int) -> List[Rect]:
+        """Получить прямоугольники области, построив их при необходимости.
+
+        Args:
+            region_x (int): Координата x области.
+            region_y (int): Координата y области.
+
+        Returns:
+            List[Rect]: Прямоугольники области.
+        """
+        key = (region_x, region_y)
+        rects = self.regions.get(key)
+        if rects is None:
+            x_min = region_x * CHUNK_SIZE
+            y_min = region_y * CHUNK_SIZE
+            x_max = min(x_min + CHUNK_SIZE, self.terrain.width)
+            y_max = min(y_min + CHUNK_SIZE, self.terrain.height)
+            tiles = self.tileset.tiles
+            solid = [[tiles[self.terrain.get_tile(x, y)].solid for y in range(y_min, y_max)]
+                     for x in range(x_min, x_max)]
+            rects = merge_rects(solid, x_min, y_min)
+            self.regions[key] = rects
+        return rects
+
+    def query(self, x_min: int, y_min: int, x_max: int, y_max: int) -> List[Rect]:
+        """Получить прямоугольники в окне, обрезанные по окну.
+
+        Args:
+            x_min (int): Левая граница окна.
+            y_min (int): Верхняя граница окна.
+            x_max (int): Правая граница окна (не включается).
+            y_max (int): Нижняя граница окна (не включается).
+
+        Returns:
+            List[Rect]: Части прямоугольников внутри окна.
+        """
+        if x_min >= x_max or y_min >= y_max:
+            return []
+
+        found = []
+        for region_x in range(x_min // CHUNK_SIZE, (x_max - 1) // CHUNK_SIZE + 1):
+            for region_y in range(y_min // CHUNK_SIZE, (y_max - 1) // CHUNK_SIZE + 1):
+                for x0, y0, x1, y1 in self.region(region_x, region_y):
+                    if x0 < x_max and x1 > x_min and y0 < y_max and y1 > y_min:
+                        found.append((max(x0, x_min), max(y0, y_min), min(x1, x_max), min(y1, y_max)))
+        return found
@@ -1,8 +1,8 @@
 import random
-from math import floor
 from jnjserver.vector import Vector
+from jnjserver.physics import move, move_rects
 import json
-from typing import Union, List
+from typing import Union, List, Tuple
 
 
 class EntityType:
@@ -45,12 +45,34 @@ class EntityType:
         self.max_health = max_health
 
 
+NO_CHECKPOINTS = ()
+ZERO_CHECKPOINT = Vector(0, 0)
+
+# Флаги изменённых полей сущности
+POSITION = 1
+VELOCITY = 2
+IS_ON_GROUND = 4
+HEALTH = 8
+BOOSTS = 16
+CURRENT_CHECKPOINT = 32
+ALL_FIELDS = 63
+FIELDS = (
+    (POSITION, "position"),
+    (VELOCITY, "velocity"),
+    (IS_ON_GROUND, "is_on_ground"),
+    (HEALTH, "health"),
+    (BOOSTS, "boosts"),
+    (CURRENT_CHECKPOINT, "current_checkpoint")
+)
+
+
 class Entity:
     """Сущность.
 
     Класс описывающий сущность.
     Сущность должна быть добавлена в мир.
     Сущность может быть свзязана с игроком.
+    Использует __slots__, чтобы в мире помещались десятки тысяч временных сущностей.
 
     Attributes:
         player_id (str): ID привязанного игрока.
@@ -61,14 +83,27 @@ class Entity:
         velocity (Vector): Вектор скорости.
         is_on_ground (bool): Стоит ли на земле.
         health (int): Здоровье.
-        boosts (dict): Словарь с улучшениями и их сроками действия.
+        boosts (dict): Словарь с улучшениями и тактами их окончания (0 - улучшение не действует).
         double_jump_ability (bool): Возможность двойного прыжка.
         checkpoints (List[Vector]): Список доступныъх чекпоинтов.
         current_checkpoint (Vector): Текущий чекпоинт.
         is_in_princess (bool): Касается ли принцессы.
         max_speed (Union[int, float]): Максимальная скорость по горизонтали.
+        is_sleeping (bool): Спит ли сущность (не обновляется, пока не будет разбужена).
+        has_input (bool): Получала ли сущность команды движения в текущем такте.
+        last_update_tick (int): Такт мира, на котором сущность обновлялась последний раз.
+        key (str): ID сущности строкой (ключ в данных для клиента).
+        dirty (int): Флаги полей, изменённых с последнего получения изменений.
+        stale (int): Флаги полей, сериализованные значения которых устарели.
+        fragments (dict): Сериализованные значения изменяемых полей.
+        checkpoints_fragment (tuple): Список чекпоинтов и его сериализованное значение.
     """
 
+    __slots__ = ("player_id", "id", "world", "type", "position", "velocity", "is_on_ground", "health", "boosts",
+                 "double_jump_ability", "checkpoints", "current_checkpoint", "is_in_princess", "max_speed",
+                 "is_sleeping", "has_input", "last_update_tick", "key", "dirty", "stale", "fragments",
+                 "checkpoints_fragment")
+
     def __init__(self, entity_type: EntityType, position: Vector, health: int):
         """Сущность.
 
@@ -77,85 +112,128 @@ class Entity:
             position (Vector): Позиция.
             health (int): Здоровье.
         """
-        self.player_id = None
-        self.id = 0
-        self.world = None
-        self.type = entity_type
-        self.position = position
         self.velocity = Vector(0, 0)
-        self.is_on_ground = False
-        self.health = max(0, min(health, self.type.max_health))
+        self.fragments = {}
         self.boosts = {
             "jump_boost": 0,
             "speed_boost": 0,
             "double_jump": 0,
             "breaking_through": 0
         }
+        self.reset(entity_type, position, health)
+
+    def reset(self, entity_type: EntityType, position: Vector, health: int):
+        """Сбросить сущность.
+
+        Задаёт сущности начальное состояние. Используется пулом сущностей для повторного использования
+        вектора скорости и словаря усилений.
+
+        Args:
+            entity_type (EntityType): Тип сущности.
+            position (Vector): Позиция.
+            health (int): Здоровье.
+        """
+        self.player_id = None
+        self.id = 0
+        self.world = None
+        self.type = entity_type
+        self.position = position
+        self.velocity.x = 0
+        self.velocity.y = 0
+        self.is_on_ground = False
+        self.health = max(0, min(health, self.type.max_health))
+        for boost in self.boosts.keys():
+            self.boosts[boost] = 0
         self.double_jump_ability = False
-        self.checkpoints = []
-        self.current_checkpoint = Vector(0, 0)
+        # Пустой список чекпоинтов и нулевой чекпоинт общие для всех сущностей, они только читаются
+        self.checkpoints = NO_CHECKPOINTS
+        self.current_checkpoint = ZERO_CHECKPOINT
         self.is_in_princess = False
         self.max_speed = 0.4
+        self.is_sleeping = False
+        self.has_input = False
+        self.last_update_tick = 0
+        self.key = "0"
+        self.dirty = ALL_FIELDS
+        self.stale = ALL_FIELDS
+        self.checkpoints_fragment = None
+
+    def mark_dirty(self, fields: int):
+        """Отметить поля изменёнными.
+
+        Сущность с изменениями попадает в список изменённых сущностей мира.
+
+        Args:
+            fields (int): Флаги полей.
+        """
+        if not self.dirty and self.world is not None:
+            self.world.dirty_entities.append(self)
+        self.dirty |= fields
+        self.stale |= fields
 
     def physics(self):
         """Расчёт физики сущности.
 
-        Считает физику для сущности отталкиваясь от ландшафта мира сущности.
+        Считает физику для сущности отталкиваясь от ландшафта мира сущности: по прямоугольникам столкновений,
+        если они есть у мира, иначе по отдельным плиткам.
+        """
+        self.update_max_speed()
+        if self.world.collision is not None:
+            movement = move_rects(self.position.x, self.position.y, self.type.size.x, self.type.size.y,
+                                  self.velocity.x, self.velocity.y, self.max_speed, self.world.collision.query,
+                                  self.world.terrain.width, self.world.terrain.height)
+        else:
+            movement = move(self.position.x, self.position.y, self.type.size.x, self.type.size.y,
+                            self.velocity.x, self.velocity.y, self.max_speed, self.world.is_solid,
+                            self.world.terrain.width, self.world.terrain.height)
+        self.apply_movement(*movement)
+
+    def update_max_speed(self):
+        """Обновить максимальную скорость.
+
+        Максимальная скорость по горизонтали удваивается при действии усиления скорости.
         """
         if self.boosts["speed_boost"]:
             self.max_speed = 0.8
         else:
             self.max_speed = 0.4
 
-        self.velocity.y = min(self.velocity.y + 0.12, 1)
-        if self.velocity.x > 0:
-            self.velocity.x = max(0.0, self.velocity.x - 0.15)
-        elif self.velocity.x < 0:
-            self.velocity.x = min(0.0, self.velocity.x + 0.15)
-
-        self.velocity.x = max(-self.max_speed, min(self.velocity.x, self.max_speed))
-        colliding_tiles = []
-
-        x_tiles_min = floor(self.position.x) - 1
-        x_tiles_max = floor(self.position.x + self.type.size.x) + 2
-        y_tiles_min = floor(self.position.y) - 1
-        y_tiles_max = floor(self.position.y + self.type.size.y) + 2
+    def apply_movement(self, x: Union[int, float], y: Union[int, float], velocity_x: Union[int, float],
+                       velocity_y: Union[int, float], is_on_ground: bool, ceil_tiles: List[Tuple[int, int]]):
+        """Применить результат расчёта движения.
 
-        x_tiles_min = max(0, min(x_tiles_min, self.world.terrain.width))
-        x_tiles_max = max(0, min(x_tiles_max, self.world.terrain.width))
-        y_tiles_min = max(0, min(y_tiles_min, self.world.terrain.height))
-        y_tiles_max = max(0, min(y_tiles_max, self.world.terrain.height))
+        Переносит сущность на посчитанные координаты, ломает плитки, об которые она ударилась головой,
+        убивает сущность при падении за пределы ландшафта и проверяет касание принцессы.
 
-        for x in range(x_tiles_min, x_tiles_max):
-            for y in range(y_tiles_min, y_tiles_max):
-                if self.world.tileset.get(self.world.terrain.get_tile(x, y)).solid:
-                    colliding_tiles.append(Vector(x, y))
-
-        self.is_on_ground = False
-
-        x_min = self.velocity.x
-        y_min = self.velocity.y
-
-        for tile in colliding_tiles:
-            if self.position.x + self.type.size.x + x_min > tile.x and self.position.x + x_min < tile.x + 1 and self.position.y + self.type.size.y > tile.y and self.position.y < tile.y + 1:
-                if x_min > 0:
-                    x_min = min(x_min, tile.x - (self.position.x + self.type.size.x))
-                elif x_min < 0:
-                    x_min = max(x_min, tile.x + 1 - self.position.x)
-                self.velocity.x = 0
-
-            elif self.position.x + self.type.size.x > tile.x and self.position.x < tile.x + 1 and self.position.y + self.type.size.y + y_min > tile.y and self.position.y + y_min < tile.y + 1:
-                if y_min > 0:
-                    y_min = min(y_min, tile.y - (self.position.y + self.type.size.y))
-                    self.is_on_ground = True
-                    self.double_jump_ability = True
-                elif y_min < 0:
-                    y_min = max(y_min, tile.y + 1 - self.position.y)
-                    self.hit_ceil(tile)
-                self.velocity.y = 0
-
-        self.position.x += x_min
-        self.position.y += y_min
+        Args:
+            x (Union[int, float]): Новая координата x.
+            y (Union[int, float]): Новая координата y.
+            velocity_x (Union[int, float]): Новая скорость по горизонтали.
+            velocity_y (Union[int, float]): Новая скорость по вертикали.
+            is_on_ground (bool): Стоит ли на земле.
+            ceil_tiles (List[Tuple[int, int]]): Координаты плиток, об которые сущность ударилась головой.
+        """
+        changed = 0
+        if self.position.x != x or self.position.y != y:
+            changed |= POSITION
+        if self.velocity.x != velocity_x or self.velocity.y != velocity_y:
+            changed |= VELOCITY
+        if self.is_on_ground != is_on_ground:
+            changed |= IS_ON_GROUND
+        if changed:
+            self.mark_dirty(changed)
+
+        self.velocity.x = velocity_x
+        self.velocity.y = velocity_y
+        self.is_on_ground = is_on_ground
+        if is_on_ground:
+            self.double_jump_ability = True
+
+        for tile_x, tile_y in ceil_tiles:
+            self.hit_ceil(Vector(tile_x, tile_y))
+
+        self.position.x = x
+        self.position.y = y
 
         if self.position.y > self.world.terrain.height:
             self.die()
@@ -212,7 +290,10 @@ class Entity:
             available_boosts = [boost for boost in self.boosts.keys() if not self.boosts[boost]]
             if available_boosts:
                 boost = random.choice(available_boosts)
-                self.boosts[boost] = random.randint(450, 600)
+                expiry_tick = self.world.tick + random.randint(450, 600)
+                self.boosts[boost] = expiry_tick
+                self.mark_dirty(BOOSTS)
+                self.world.timers.schedule(expiry_tick, self.expire_boost, boost, expiry_tick)
         if self.boosts["breaking_through"] or self.world.terrain.get_tile(tile.x, tile.y) in ["crate", "upgrade"]:
             self.world.terrain.set_tile(tile.x, tile.y, "")
 
@@ -238,10 +319,16 @@ class Entity:
         if type(walking_velocity) not in [int, float]:
             raise ValueError('walking_velocity should be a number')
 
+        self.has_input = True
+        self.wake()
+
+        velocity_x = self.velocity.x
         if direction == "left":
             self.velocity.x -= walking_velocity
         elif direction == "right":
             self.velocity.x += walking_velocity
+        if self.velocity.x != velocity_x:
+            self.mark_dirty(VELOCITY)
 
     def jump(self, jump_velocity: Union[int, float]):
         """Подпрыгнуть.
@@ -258,13 +345,18 @@ class Entity:
         if type(jump_velocity) not in [int, float]:
             raise ValueError('jump_velocity should be a number')
 
+        self.has_input = True
+        self.wake()
+
         if self.boosts["jump_boost"]:
             jump_velocity += 0.2
         if self.is_on_ground:
             self.velocity.y -= jump_velocity
+            self.mark_dirty(VELOCITY)
         elif self.double_jump_ability and self.boosts["double_jump"]:
             self.velocity.y -= jump_velocity
             self.double_jump_ability = False
+            self.mark_dirty(VELOCITY)
 
     def die(self):
         """Умереть.
@@ -275,14 +367,21 @@ class Entity:
         for bk in self.boosts.keys():
             self.boosts[bk] = 0
         self.health -= 1
+        self.mark_dirty(POSITION | BOOSTS | HEALTH)
 
-    def update_boosts(self):
-        """Обновить состояние усилений.
+    def expire_boost(self, boost: str, expiry_tick: int):
+        """Завершить действие усиления.
 
-        Уменьшает оставшееся время работы усилений.
+        Вызывается службой таймеров мира на такте окончания усиления.
+        Если усиление было сброшено или выдано заново, устаревший таймер ничего не делает.
+
+        Args:
+            boost (str): Название усиления.
+            expiry_tick (int): Такт окончания, на который был запущен таймер.
         """
-        for boost in self.boosts.keys():
-            self.boosts[boost] = max(self.boosts[boost] - 1, 0)
+        if self.boosts[boost] == expiry_tick:
+            self.boosts[boost] = 0
+            self.mark_dirty(BOOSTS)
 
     def update_checkpoint(self):
         """Обновить чекпоинт.
@@ -290,8 +389,29 @@ class Entity:
         Проверяет пересечение с чекпоинтами и меняет чекпоинт на текущий, если сущность пересекается с ним.
         """
         for checkpoint in self.checkpoints:
-            if self.check_collision(checkpoint, Vector(1, 1)):
+            if self.check_collision(checkpoint, Vector(1, 1)) and checkpoint is not self.current_checkpoint:
                 self.current_checkpoint = checkpoint
+                self.mark_dirty(CURRENT_CHECKPOINT)
+
+    def can_sleep(self) -> bool:
+        """Может ли сущность уснуть.
+
+        Сущность может уснуть, если она стоит на земле, неподвижна и не получала команд движения.
+
+        Returns:
+            bool: Может ли сущность уснуть.
+        """
+        if self.has_input or not self.is_on_ground:
+            return False
+        return self.velocity.x == 0 and self.velocity.y == 0
+
+    def wake(self):
+        """Разбудить.
+
+        Возвращает спящую сущность в список обновляемых сущностей мира.
+        """
+        if self.is_sleeping and self.world is not None:
+            self.world.wake_entity(self)
 
     def update(self):
         """Обновить всё.
@@ -299,30 +419,93 @@ class Entity:
         Обновляет состояние сущности.        
         """
         self.physics()
-        self.update_boosts()
         self.update_checkpoint()
 
+    def refresh_fragments(self):
+        """Обновить сериализованные значения устаревших полей."""
+        stale = self.stale
+        if not stale:
+            return
+
+        fragments = self.fragments
+        if stale & POSITION:
+            fragments["position"] = self.position.dict()
+        if stale & VELOCITY:
+            fragments["velocity"] = self.velocity.dict()
+        if stale & IS_ON_GROUND:
+            fragments["is_on_ground"] = self.is_on_ground
+        if stale & HEALTH:
+            fragments["health"] = self.health
+        if stale & BOOSTS:
+            fragments["boosts"] = dict(self.boosts)
+        if stale & CURRENT_CHECKPOINT:
+            fragments["current_checkpoint"] = self.current_checkpoint.dict()
+        self.stale = 0
+
+    def serialized_checkpoints(self) -> List[dict]:
+        """Получить сериализованный список чекпоинтов.
+
+        Список чекпоинтов не меняется, поэтому сериализуется один раз.
+
+        Returns:
+            List[dict]: Список словарей чекпоинтов.
+        """
+        if self.checkpoints_fragment is None or self.checkpoints_fragment[0] is not self.checkpoints:
+            self.checkpoints_fragment = (self.checkpoints, [c.dict() for c in self.checkpoints])
+        return self.checkpoints_fragment[1]
+
     def dict(self) -> dict:
         """Создать словарь содержащий свойства сущности.
 
         Возвращает словарь содержащий свойства сущности.
         Нужно для отправки данных клиенту.
+        Сериализованные значения полей переиспользуются, пока поля не изменятся.
 
         Returns:
             dict: Словарь содержащий свойства сущности.
         """
+        self.refresh_fragments()
+        fragments = self.fragments
         return {
             "id": self.id,
             "type": self.type.name,
-            "position": self.position.dict(),
-            "velocity": self.velocity.dict(),
-            "is_on_ground": self.is_on_ground,
-            "health": self.health,
-            "boosts": self.boosts,
-            "checkpoints": [c.dict() for c in self.checkpoints],
-            "current_checkpoint": self.current_checkpoint.dict()
+            "position": fragments["position"],
+            "velocity": fragments["velocity"],
+            "is_on_ground": fragments["is_on_ground"],
+            "health": fragments["health"],
+            "boosts": fragments["boosts"],
+            "checkpoints": self.serialized_checkpoints(),
+            "current_checkpoint": fragments["current_checkpoint"]
         }
 
+    def spawn_dict(self) -> dict:
+        """Создать запись о появлении сущности.
+
+        Возвращает словарь со всеми свойствами сущности, включая неизменяемые (ID, тип, чекпоинты).
+        Сбрасывает флаги изменённых полей.
+
+        Returns:
+            dict: Словарь содержащий свойства сущности.
+        """
+        self.dirty = 0
+        return self.dict()
+
+    def extract_changes(self) -> dict:
+        """Извлечь изменения.
+
+        Возвращает сериализованные значения полей, изменённых с предыдущего извлечения, и сбрасывает флаги.
+
+        Returns:
+            dict: Словарь изменённых свойств сущности.
+        """
+        self.refresh_fragments()
+        changes = {}
+        for field, name in FIELDS:
+            if self.dirty & field:
+                changes[name] = self.fragments[name]
+        self.dirty = 0
+        return changes
+
 
 class EntitySet:
     """Сет типов сущностей.
@@ -373,8 +556,20 @@ class EntitySetLoader:
         Returns:
             EntitySet: Сет типов сущностей.
         """
-        json_data = open(json_path)
-        data = json.load(json_data)
+        with open(json_path) as json_data:
+            data = json.load(json_data)
+        return EntitySetLoader.parse(data)
+
+    @staticmethod
+    def parse(data: List[dict]) -> EntitySet:
+        """Создать сет типов сущностей из разобранного JSON.
+
+        Args:
+            data (List[dict]): Список словарей типов сущностей.
+
+        Returns:
+            EntitySet: Сет типов сущностей.
+        """
         entities_types = {}
 
         for entity_type_data in data:
@@ -0,0 +1,171 @@
+from typing import Optional
+from jnjserver.entity import EntityType, Entity
+from jnjserver.vector import Vector
+
+SLOT_BITS = 20
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+class EntityTable:
+    """Таблица сущностей.
+
+    Хранит сущности мира плотным списком для быстрого обхода.
+    ID сущности состоит из номера ячейки (младшие SLOT_BITS бит) и поколения ячейки (старшие биты).
+    Поколение увеличивается при удалении сущности, поэтому устаревший ID не найдёт новую сущность в той же ячейке.
+    Добавление, удаление и поиск по ID выполняются за O(1).
+
+    Attributes:
+        dense (List[Entity]): Плотный список сущностей.
+        slot_indexes (List[int]): Индекс сущности в плотном списке для каждой ячейки (-1 - ячейка свободна).
+        generations (List[int]): Поколение каждой ячейки.
+        free_slots (List[int]): Список свободных ячеек.
+    """
+
+    def __init__(self):
+        """Таблица сущностей."""
+        self.dense = []
+        self.slot_indexes = []
+        self.generations = []
+        self.free_slots = []
+
+    def add(self, entity: Entity) -> int:
+        """Добавить сущность.
+
+        Args:
+            entity (Entity): Сущность.
+
+        Raises:
+            ValueError: Закончились ячейки.
+
+        Returns:
+            int: ID сущности.
+        """
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.slot_indexes)
+            if slot > SLOT_MASK:
+                raise ValueError('entity table is full')
+            self.slot_indexes.append(-1)
+            self.generations.append(0)
+
+        self.slot_indexes[slot] = len(self.dense)
+        self.dense.append(entity)
+        return (self.generations[slot] << SLOT_BITS) | slot
+
+    def get(self, entity_id: int) -> Optional[Entity]:
+        """Получить сущность по ID.
+
+        Args:
+            entity_id (int): ID сущности.
+
+        Returns:
+            Optional[Entity]: Сущность или None, если сущности с таким ID нет.
+        """
+        slot = entity_id & SLOT_MASK
+        if slot >= len(self.slot_indexes) or self.generations[slot] != entity_id >> SLOT_BITS:
+            return None
+        index = self.slot_indexes[slot]
+        if index == -1:
+            return None
+        return self.dense[index]
+
+    def remove(self, entity_id: int) -> Entity:
+        """Удалить сущность по ID.
+
+        Последняя сущность плотного списка переносится на место удалённой.
+
+        Args:
+            entity_id (int): ID сущности.
+
+        Raises:
+            ValueError: Нет сущности с таким ID.
+
+        Returns:
+            Entity: Удалённая сущность.
+        """
+        entity = self.get(entity_id)
+        if entity is None:
+            raise ValueError(f'There is no entity with id: {entity_id}')
+
+        slot = entity_id & SLOT_MASK
+        index = self.slot_indexes[slot]
+        last = self.dense.pop()
+        if last is not entity:
+            self.dense[index] = last
+            self.slot_indexes[last.id & SLOT_MASK] = index
+
+        self.slot_indexes[slot] = -1
+        self.generations[slot] += 1
+        self.free_slots.append(slot)
+        return entity
+
+    def __contains__(self, entity_id: int) -> bool:
+        """Есть ли сущность с ID.
+
+        Args:
+            entity_id (int): ID сущности.
+
+        Returns:
+            bool: Есть ли сущность с ID.
+        """
+        return self.get(entity_id) is not None
+
+    def __iter__(self):
+        """Обойти сущности.
+
+        Returns:
+            Iterator[Entity]: Итератор по сущностям.
+        """
+        return iter(self.dense)
+
+    def __len__(self) -> int:
+        """Количество сущностей.
+
+        Returns:
+            int: Количество сущностей.
+        """
+        return len(self.dense)
+
+
+class EntityPool:
+    """Пул сущностей.
+
+    Список свободных объектов сущностей для повторного использования.
+    Снижает количество выделений памяти при частом создании и удалении временных сущностей (снаряды, частицы).
+
+    Attributes:
+        free (List[Entity]): Список свободных сущностей.
+    """
+
+    def __init__(self):
+        """Пул сущностей."""
+        self.free = []
+
+    def acquire(self, entity_type: EntityType, position: Vector, health: int) -> Entity:
+        """Получить сущность.
+
+        Возвращает свободную сущность в начальном состоянии или создаёт новую.
+
+        Args:
+            entity_type (EntityType): Тип сущности.
+            position (Vector): Позиция.
+            health (int): Здоровье.
+
+        Returns:
+            Entity: Сущность.
+        """
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(entity_type, position, health)
+            return entity
+        return Entity(entity_type, position, health)
+
+    def release(self, entity: Entity):
+        """Вернуть сущность в пул.
+
+        Args:
+            entity (Entity): Сущность.
+        """
+        entity.world = None
+        self.free.append(entity)
@@ -0,0 +1,513 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from math import ceil, floor
+from typing import List, Optional
+from jnjserver.additional_data import AdditionalData
+from jnjserver.terrain import CHUNK_SIZE, STREAM_CHUNKS_PER_UPDATE, Terrain, TerrainLog
+from jnjserver.vector import Vector
+
+MASK = (1 << 64) - 1
+LATTICE_STEP = 16
+SEGMENT_WIDTH = 8
+PIT_SEGMENT_WIDTH = 24
+FLAT_RADIUS = 2
+MAX_CHECKPOINTS = 32
+
+
+def mix(seed: int, a: int, b: int) -> float:
+    """Детерминированное псевдослучайное число по зерну и двум ключам.
+
+    Одинаково во всех процессах, в отличие от hash() строк.
+
+    Args:
+        seed (int): Зерно.
+        a (int): Первый ключ.
+        b (int): Второй ключ.
+
+    Returns:
+        float: Число от 0 до 1.
+    """
+    z = (seed * 0x9E3779B97F4A7C15 + a * 0xBF58476D1CE4E5B9 + b * 0x94D049BB133111EB) & MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return (z ^ (z >> 31)) / (1 << 64)
+
+
+class LevelGenerator:
+    """Генератор уровня гонки.
+
+    Джон начинает слева, Джош справа, принцесса стоит посередине.
+    Каждый столбец ландшафта считается независимо по зерну и координате x, поэтому любой чанк
+    можно сгенерировать отдельно, в любом процессе и в любом порядке.
+
+    Attributes:
+        seed (int): Зерно.
+        width (int): Ширина ландшафта.
+        height (int): Высота ландшафта.
+        checkpoint_spacing (int): Расстояние между чекпоинтами.
+        checkpoints_count (int): Количество чекпоинтов каждого игрока.
+        princess_x (int): Координата x принцессы.
+    """
+
+    def __init__(self, seed: int, width: int = 1024, height: int = 60, checkpoint_spacing: int = 20):
+        """Генератор уровня гонки.
+
+        Args:
+            seed (int): Зерно.
+            width (int, optional): Ширина ландшафта. По умолчанию 1024.
+            height (int, optional): Высота ландшафта. По умолчанию 60.
+            checkpoint_spacing (int, optional): Наименьшее расстояние между чекпоинтами. По умолчанию 20.
+
+        Raises:
+            ValueError: Зерно - целое число.
+            ValueError: Ширина - целое число не меньше 64.
+            ValueError: Высота - целое число не меньше 40.
+        """
+        if type(seed) != int:
+            raise ValueError('seed should be a int')
+        if type(width) != int or width < 64:
+            raise ValueError('width should be a int not less than 64')
+        if type(height) != int or height < 40:
+            raise ValueError('height should be a int not less than 40')
+
+        self.seed = seed
+        self.width = width
+        self.height = height
+        # На длинных уровнях чекпоинты реже, чтобы их список оставался коротким
+        self.checkpoint_spacing = max(checkpoint_spacing, (width // 2 - 8) // MAX_CHECKPOINTS)
+        self.checkpoints_count = max(1, min((width // 2 - 8) // self.checkpoint_spacing, MAX_CHECKPOINTS))
+        self.princess_x = width // 2
+
+    def john_checkpoint_x(self, index: int) -> int:
+        """Получить координату x чекпоинта Джона.
+
+        Args:
+            index (int): Номер чекпоинта.
+
+        Returns:
+            int: Координата x.
+        """
+        return 2 + index * self.checkpoint_spacing
+
+    def josh_checkpoint_x(self, index: int) -> int:
+        """Получить координату x чекпоинта Джоша.
+
+        Args:
+            index (int): Номер чекпоинта.
+
+        Returns:
+            int: Координата x.
+        """
+        return self.width - 3 - index * self.checkpoint_spacing
+
+    def special_column(self, x: int) -> Optional[int]:
+        """Получить ближайший к столбцу чекпоинт или принцессу.
+
+        Args:
+            x (int): Координата x.
+
+        Returns:
+            Optional[int]: Координата x чекпоинта или принцессы не дальше FLAT_RADIUS или None.
+        """
+        if abs(x - self.princess_x) <= FLAT_RADIUS:
+            return self.princess_x
+
+        index = round((x - 2) / self.checkpoint_spacing)
+        if 0 <= index < self.checkpoints_count and abs(x - self.john_checkpoint_x(index)) <= FLAT_RADIUS:
+            return self.john_checkpoint_x(index)
+
+        index = round((self.width - 3 - x) / self.checkpoint_spacing)
+        if 0 <= index < self.checkpoints_count and abs(x - self.josh_checkpoint_x(index)) <= FLAT_RADIUS:
+            return self.josh_checkpoint_x(index)
+        return None
+
+    def raw_ground(self, x: int) -> int:
+        """Высота земли без выравнивания площадок.
+
+        Значения в узлах решётки с шагом LATTICE_STEP линейно интерполируются.
+
+        Args:
+            x (int): Координата x.
+
+        Returns:
+            int: Координата y верхней плитки земли.
+        """
+        lattice = x // LATTICE_STEP
+        t = (x % LATTICE_STEP) / LATTICE_STEP
+        left = mix(self.seed, 1, lattice)
+        right = mix(self.seed, 1, lattice + 1)
+        base = self.height - 20
+        return base + round((left + (right - left) * t) * 12 - 6)
+
+    def ground(self, x: int) -> int:
+        """Высота земли.
+
+        Вокруг чекпоинтов и принцессы земля ровная.
+
+        Args:
+            x (int): Координата x.
+
+        Returns:
+            int: Координата y верхней плитки земли.
+        """
+        special = self.special_column(x)
+        return self.raw_ground(x if special is None else special)
+
+    def is_pit(self, x: int) -> bool:
+        """Яма ли в столбце.
+
+        Ямы шириной 2-3 плитки не бывают у краёв ландшафта, у чекпоинтов и у принцессы.
+
+        Args:
+            x (int): Координата x.
+
+        Returns:
+            bool: Яма ли в столбце.
+        """
+        segment = x // PIT_SEGMENT_WIDTH
+        if mix(self.seed, 2, segment) >= 0.15:
+            return False
+        start = segment * PIT_SEGMENT_WIDTH + 8 + floor(mix(self.seed, 3, segment) * 6)
+        if not start <= x < start + 2 + floor(mix(self.seed, 4, segment) * 2):
+            return False
+        if x < 8 or x >= self.width - 8:
+            return False
+        for near_x in range(x - FLAT_RADIUS - 2, x + FLAT_RADIUS + 3):
+            if self.special_column(near_x) is not None:
+                return False
+        return True
+
+    def column(self, x: int) -> List[str]:
+        """Сгенерировать столбец ландшафта.
+
+        Args:
+            x (int): Координата x.
+
+        Returns:
+            List[str]: Названия плиток столбца сверху вниз.
+        """
+        if self.is_pit(x):
+            return [""] * self.height
+
+        ground = self.ground(x)
+        column = [""] * ground + ["grass"] + ["dirt"] * (self.height - ground - 1)
+
+        segment = x // SEGMENT_WIDTH
+        if self.special_column(x) is not None:
+            # Над чекпоинтами и принцессой ничего нет, чтобы игрок появлялся на свободном месте
+            return column
+        if mix(self.seed, 5, segment) < 0.35:
+            # Платформа из кирпичей и ящиков на 4-5 плиток выше земли в начале сегмента
+            start = segment * SEGMENT_WIDTH + floor(mix(self.seed, 6, segment) * 3)
+            length = 3 + floor(mix(self.seed, 7, segment) * 3)
+            if start <= x < start + length:
+                row = self.ground(segment * SEGMENT_WIDTH) - 4 - floor(mix(self.seed, 8, segment) * 2)
+                if 0 <= row < ground:
+                    column[row] = "crate" if mix(self.seed, 9, x) < 0.3 else "bricks"
+        elif mix(self.seed, 10, segment) < 0.15 and x == segment * SEGMENT_WIDTH + SEGMENT_WIDTH // 2:
+            column[ground - 4] = "upgrade"
+        return column
+
+    def chunk_columns(self, chunk_x: int) -> List[List[str]]:
+        """Сгенерировать столбцы чанка.
+
+        Args:
+            chunk_x (int): Координата x чанка.
+
+        Returns:
+            List[List[str]]: Столбцы чанка (не дальше правого края ландшафта).
+        """
+        x_min = chunk_x * CHUNK_SIZE
+        return [self.column(x) for x in range(x_min, min(x_min + CHUNK_SIZE, self.width))]
+
+    def additional_data(self) -> AdditionalData:
+        """Создать дополнительные данные уровня.
+
+        Чекпоинты стоят над землёй, первыми идут чекпоинты у краёв ландшафта.
+
+        Returns:
+            AdditionalData: Дополнительные данные.
+        """
+        checkpoints = {
+            "john": [],
+            "josh": []
+        }
+        for index in range(self.checkpoints_count):
+            x = self.john_checkpoint_x(index)
+            checkpoints["john"].append(Vector(x, self.ground(x) - 3))
+            x = self.josh_checkpoint_x(index)
+            checkpoints["josh"].append(Vector(x, self.ground(x) - 3))
+
+        princess = Vector(self.princess_x, self.ground(self.princess_x) - 2)
+        return AdditionalData(checkpoints, princess, [])
+
+
+def generate_chunk(seed: int, width: int, height: int, chunk_x: int) -> List[List[str]]:
+    """Сгенерировать столбцы чанка в рабочем процессе.
+
+    Args:
+        seed (int): Зерно.
+        width (int): Ширина ландшафта.
+        height (int): Высота ландшафта.
+        chunk_x (int): Координата x чанка.
+
+    Returns:
+        List[List[str]]: Столбцы чанка.
+    """
+    return LevelGenerator(seed, width, height).chunk_columns(chunk_x)
+
+
+class ProceduralTerrain(Terrain):
+    """Генерируемый ландшафт.
+
+    Ландшафт хранится полосами по CHUNK_SIZE столбцов. Полосы вокруг игроков генерируются сразу,
+    полосы чуть дальше - заранее в фоновых процессах. Неизменённые полосы выгружаются,
+    когда их больше бюджета, и при следующем обращении генерируются заново.
+    Полосы, впервые попавшие в окрестность игроков, отправляются клиентам в обновлениях чанками
+    CHUNK_SIZE x CHUNK_SIZE плиток, как и у ChunkedTerrain.
+
+    Attributes:
+        generator (LevelGenerator): Генератор уровня.
+        width (int): Ширина ландшафта.
+        height (int): Высота ландшафта.
+        chunks_y (int): Количество чанков в полосе.
+        max_chunks (int): Бюджет неизменённых полос в памяти.
+        lookahead (int): На сколько плиток дальше окрестности игроков полосы генерируются заранее.
+        chunks (OrderedDict): Неизменённые полосы по координате x полосы (от давно использованных к недавним).
+        edited_chunks (dict): Изменённые полосы по координате x полосы (не выгружаются).
+        last_key (int): Координата x последней прочитанной полосы.
+        last_columns (List[List[str]]): Последняя прочитанная полоса.
+        executor (ProcessPoolExecutor): Пул фоновых процессов (None - генерация в этом процессе).
+        pending (dict): Генерируемые в фоне полосы по координате x полосы.
+        streamed (set): Координаты x полос, отправленных клиентам.
+        new_chunks (List[Tuple[int, int]]): Координаты чанков, которые нужно отправить клиентам.
+        log (TerrainLog): Журнал изменений ландшафта.
+        listeners (list): Слушатели изменений ландшафта.
+    """
+
+    def __init__(self, generator: LevelGenerator, workers: int = 1, max_chunks: int = 64, lookahead: int = 64):
+        """Генерируемый ландшафт.
+
+        Args:
+            generator (LevelGenerator): Генератор уровня.
+            workers (int, optional): Количество фоновых процессов (0 - генерация в этом процессе). По умолчанию 1.
+            max_chunks (int, optional): Бюджет неизменённых полос в памяти. По умолчанию 64.
+            lookahead (int, optional): На сколько плиток дальше окрестности игроков генерировать заранее.
+                По умолчанию 64.
+
+        Raises:
+            ValueError: Бюджет - положительное целое число.
+        """
+        if type(max_chunks) != int or max_chunks < 1:
+            raise ValueError('max_chunks should be a positive int')
+
+        self.generator = generator
+        self.width = generator.width
+        self.height = generator.height
+        self.chunks_y = ceil(self.height / CHUNK_SIZE)
+        self.max_chunks = max_chunks
+        self.lookahead = lookahead
+        self.chunks = OrderedDict()
+        self.edited_chunks = {}
+        self.last_key = None
+        self.last_columns = None
+        self.executor = ProcessPoolExecutor(workers) if workers else None
+        self.pending = {}
+        self.streamed = set()
+        self.new_chunks = []
+        self.log = TerrainLog()
+        self.listeners = []
+
+    def columns(self, chunk_x: int) -> List[List[str]]:
+        """Получить столбцы полосы, сгенерировав её при необходимости.
+
+        Args:
+            chunk_x (int): Координата x полосы.
+
+        Returns:
+            List[List[str]]: Столбцы полосы.
+        """
+        if chunk_x == self.last_key:
+            return self.last_columns
+
+        columns = self.edited_chunks.get(chunk_x)
+        if columns is None:
+            columns = self.chunks.get(chunk_x)
+            if columns is None:
+                future = self.pending.pop(chunk_x, None)
+                columns = future.result() if future is not None else self.generator.chunk_columns(chunk_x)
+                self.store_chunk(chunk_x, columns)
+            else:
+                self.chunks.move_to_end(chunk_x)
+
+        self.last_key = chunk_x
+        self.last_columns = columns
+        return columns
+
+    def store_chunk(self, chunk_x: int, columns: List[List[str]]):
+        """Положить сгенерированную полосу в память, выгрузив лишние.
+
+        Args:
+            chunk_x (int): Координата x полосы.
+            columns (List[List[str]]): Столбцы полосы.
+        """
+        self.chunks[chunk_x] = columns
+        while len(self.chunks) > self.max_chunks:
+            evicted_x, _ = self.chunks.popitem(last=False)
+            if evicted_x == self.last_key:
+                self.last_key = None
+                self.last_columns = None
+
+    def collect_generated(self):
+        """Забрать готовые полосы из фоновых процессов."""
+        for chunk_x, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[chunk_x]
+                if chunk_x not in self.chunks and chunk_x not in self.edited_chunks:
+                    self.store_chunk(chunk_x, future.result())
+
+    def request(self, chunk_x: int):
+        """Запросить фоновую генерацию полосы.
+
+        Args:
+            chunk_x (int): Координата x полосы.
+        """
+        if self.executor is None or chunk_x in self.pending:
+            return
+        if chunk_x in self.chunks or chunk_x in self.edited_chunks:
+            return
+        future: Future = self.executor.submit(generate_chunk, self.generator.seed, self.width, self.height, chunk_x)
+        self.pending[chunk_x] = future
+
+    def prefetch(self, x: float, y: float, radius: int):
+        """Подготовить полосы вокруг точки.
+
+        Полосы в радиусе генерируются сразу и отправляются клиентам, полосы дальше на lookahead плиток
+        запрашиваются у фоновых процессов.
+
+        Args:
+            x (float): Координата x.
+            y (float): Координата y.
+            radius (int): Радиус в плитках.
+        """
+        self.collect_generated()
+        last_chunk = (self.width - 1) // CHUNK_SIZE
+        for chunk_x in range(max(0, floor(x - radius) // CHUNK_SIZE),
+                             min(last_chunk, floor(x + radius) // CHUNK_SIZE) + 1):
+            self.columns(chunk_x)
+            self.stream(chunk_x)
+        for chunk_x in range(max(0, floor(x - radius - self.lookahead) // CHUNK_SIZE),
+                             min(last_chunk, floor(x + radius + self.lookahead) // CHUNK_SIZE) + 1):
+            self.request(chunk_x)
+
+    def get_tile(self, x: int, y: int) -> str:
+        """Получить название плитки на координатах.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+
+        Raises:
+            ValueError: Координата x - целое число.
+            ValueError: Координата y - целое число.
+            ValueError: Нет плитки на координатах.
+
+        Returns:
+            str: Название плитки.
+        """
+        if type(x) != int:
+            raise ValueError('x should be a int')
+
+        if type(y) != int:
+            raise ValueError('y should be a int')
+
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            raise ValueError(f'There is no tile with x: {x}, y: {y}')
+
+        return self.columns(x // CHUNK_SIZE)[x % CHUNK_SIZE][y]
+
+    def store_tile(self, x: int, y: int, tile: str):
+        """Записать название плитки на координатах.
+
+        Изменённая полоса больше не выгружается.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            tile (str): Название плитки.
+
+        Raises:
+            ValueError: Нет плитки на координатах.
+        """
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            raise ValueError(f'There is no tile with x: {x}, y: {y}')
+
+        chunk_x = x // CHUNK_SIZE
+        columns = self.columns(chunk_x)
+        if chunk_x not in self.edited_chunks:
+            self.chunks.pop(chunk_x, None)
+            self.edited_chunks[chunk_x] = columns
+        columns[x % CHUNK_SIZE][y] = tile
+
+    def stream(self, chunk_x: int):
+        """Поставить чанки полосы в очередь отправки клиентам, если полоса ещё не отправлялась.
+
+        Args:
+            chunk_x (int): Координата x полосы.
+        """
+        if chunk_x not in self.streamed:
+            self.streamed.add(chunk_x)
+            self.new_chunks.extend((chunk_x, chunk_y) for chunk_y in range(self.chunks_y))
+
+    def chunk_data(self, chunk_x: int, chunk_y: int) -> dict:
+        """Получить данные о чанке ландшафта.
+
+        Args:
+            chunk_x (int): Координата x чанка.
+            chunk_y (int): Координата y чанка.
+
+        Returns:
+            dict: Координаты левой верхней плитки чанка и столбцы названий плиток.
+        """
+        y_min = chunk_y * CHUNK_SIZE
+        return {
+            "x": chunk_x * CHUNK_SIZE,
+            "y": y_min,
+            "columns": [column[y_min:y_min + CHUNK_SIZE] for column in self.columns(chunk_x)]
+        }
+
+    def extract_chunks(self) -> List[dict]:
+        """Извлечь чанки, которые нужно отправить клиентам.
+
+        За раз извлекается не больше STREAM_CHUNKS_PER_UPDATE чанков, чтобы обновление поместилось
+        в одну UDP датаграмму. Остальные отправляются в следующих обновлениях.
+
+        Returns:
+            List[dict]: Данные чанков.
+        """
+        keys = self.new_chunks[:STREAM_CHUNKS_PER_UPDATE]
+        del self.new_chunks[:STREAM_CHUNKS_PER_UPDATE]
+        return [self.chunk_data(chunk_x, chunk_y) for chunk_x, chunk_y in keys]
+
+    def startup_data(self) -> dict:
+        """Получить начальные данные о ландшафте.
+
+        Весь ландшафт не отправляется: полосы рядом с игроками приходят в обновлениях,
+        недостающие клиент запрашивает догонянием.
+
+        Returns:
+            dict: Размеры ландшафта.
+        """
+        return {
+            "grid": [],
+            "width": self.width,
+            "height": self.height,
+            "chunks": []
+        }
+
+    def close(self):
+        """Остановить фоновые процессы."""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        self.pending = {}
@@ -0,0 +1,321 @@
+import argparse
+import json
+import random
+import time
+from typing import List, Optional, Tuple
+
+from jnjserver.additional_data import AdditionalData
+from jnjserver.entity import Entity
+from jnjserver.generator import LevelGenerator, ProceduralTerrain
+from jnjserver.level import LevelLoader
+from jnjserver.player import apply_input
+from jnjserver.terrain import Terrain
+from jnjserver.vector import Vector
+from jnjserver.world import World
+
+MAPS = ["level", "generated", "crates"]
+BACKENDS = {
+    "tiles": {"collision_rects": False},
+    "rects": {"collision_rects": True},
+}
+REFERENCE_BACKEND = "tiles"
+FIELDS = ["id", "x", "y", "velocity_x", "velocity_y", "is_on_ground", "health"]
+GOLDEN_PATH = "tests/golden"
+GOLDEN_TICKS = 200
+GOLDEN_SEED = 0
+EXTRA_PLAYERS = 4
+
+
+def crates_level() -> Tuple[Terrain, AdditionalData]:
+    """Создать синтетическую карту: пол, ряды ящиков и усилений под потолком и яма посередине.
+
+    Returns:
+        Tuple[Terrain, AdditionalData]: Ландшафт и дополнительные данные.
+    """
+    grid = [['' for _ in range(29)] + ['bricks'] for _ in range(96)]
+    for x in range(96):
+        if x % 3 == 0:
+            grid[x][24] = 'crate' if x % 6 else 'upgrade'
+        if x % 8 < 2:
+            grid[x][21] = 'bricks'
+    for x in range(44, 48):
+        grid[x][29] = ''
+    checkpoints = {"john": [Vector(2, 26)], "josh": [Vector(92, 26)]}
+    return Terrain(grid), AdditionalData(checkpoints, Vector(1000, 1000), [])
+
+
+def build_world(map_name: str, backend: str) -> World:
+    """Создать мир на карте с физикой выбранного варианта и расставить игроков.
+
+    Джон и Джош встают на свои первые чекпоинты, ещё EXTRA_PLAYERS сущностей игроков - на чекпоинты
+    по очереди со сдвигом, чтобы они сталкивались с разным ландшафтом.
+
+    Args:
+        map_name (str): Карта (см. MAPS).
+        backend (str): Вариант физики (см. BACKENDS).
+
+    Raises:
+        ValueError: Неизвестная карта или вариант физики.
+
+    Returns:
+        World: Мир.
+    """
+    if map_name not in MAPS:
+        raise ValueError(f'unknown map {map_name}')
+    if backend not in BACKENDS:
+        raise ValueError(f'unknown backend {backend}')
+
+    if map_name == "level":
+        level = LevelLoader.load_cached()
+        tileset, entityset = level.tileset, level.entityset
+        terrain, additional_data = level.terrain, level.additional_data
+    else:
+        tileset, entityset = LevelLoader.load_sets()
+        if map_name == "generated":
+            generator = LevelGenerator(1, 256)
+            terrain = ProceduralTerrain(generator, workers=0)
+            additional_data = generator.additional_data()
+        else:
+            terrain, additional_data = crates_level()
+
+    world = World(tileset, entityset, terrain, additional_data, collision_rects=BACKENDS[backend]["collision_rects"])
+
+    player_type = world.entityset.get("player")
+    for index in range(2 + EXTRA_PLAYERS):
+        player_id = ["john", "josh"][index % 2]
+        checkpoints = world.checkpoints[player_id]
+        position = checkpoints[0].clone()
+        position.x += index // 2 * 1.3
+        entity = Entity(player_type, position, 6)
+        if index < 2:
+            entity.player_id = player_id
+        entity.checkpoints = checkpoints
+        entity.current_checkpoint = checkpoints[0]
+        world.add_entity(entity)
+    return world
+
+
+def close_world(world: World):
+    """Освободить ландшафт мира.
+
+    Args:
+        world (World): Мир.
+    """
+    world.terrain.close()
+
+
+def input_script(seed: int, players: int, ticks: int) -> List[List[dict]]:
+    """Создать сценарий ввода.
+
+    Каждый игрок идёт в случайную сторону или стоит случайное число тактов и иногда прыгает,
+    так же, как ввод приходит с клиента.
+
+    Args:
+        seed (int): Зерно генератора.
+        players (int): Количество игроков.
+        ticks (int): Количество тактов.
+
+    Returns:
+        List[List[dict]]: Данные ввода игроков по тактам.
+    """
+    rng = random.Random(seed)
+    walking = [False] * players
+    held = [0] * players
+    script = []
+    for _ in range(ticks):
+        inputs = []
+        for index in range(players):
+            if held[index] == 0:
+                walking[index] = rng.choice(["left", "right", "right", False])
+                held[index] = rng.randrange(5, 40)
+            held[index] -= 1
+            inputs.append({"walking": walking[index], "jumping": rng.random() < 0.08})
+        script.append(inputs)
+    return script
+
+
+def record(world: World, script: List[List[dict]]) -> Tuple[List[dict], float]:
+    """Записать траекторию мира по сценарию ввода.
+
+    Ввод i-го игрока сценария применяется к i-й по ID сущности игрока. После каждого такта записываются
+    поля FIELDS всех сущностей мира по возрастанию ID и изменения ландшафта.
+
+    Args:
+        world (World): Мир.
+        script (List[List[dict]]): Данные ввода игроков по тактам.
+
+    Returns:
+        Tuple[List[dict], float]: Траектория по тактам и время расчёта тактов мира, с.
+    """
+    players = sorted((entity for entity in world.entities if entity.type.name == "player"),
+                     key=lambda entity: entity.id)
+    trajectory = []
+    elapsed = 0.0
+    for inputs in script:
+        for entity, player_input in zip(players, inputs):
+            if world.entities.get(entity.id) is entity:
+                apply_input(entity, player_input)
+        start = time.perf_counter()
+        world.update()
+        elapsed += time.perf_counter() - start
+        trajectory.append({
+            "entities": [[entity.id, entity.position.x, entity.position.y, entity.velocity.x, entity.velocity.y,
+                          entity.is_on_ground, entity.health]
+                         for entity in sorted(world.entities, key=lambda entity: entity.id)],
+            "terrain": [[update["x"], update["y"], update["tile"]] for update in world.terrain.extract_updates()]
+        })
+    return trajectory, elapsed
+
+
+def compare(expected: List[dict], actual: List[dict], tolerance: float = 0.0) -> Optional[str]:
+    """Сравнить траектории.
+
+    Args:
+        expected (List[dict]): Эталонная траектория.
+        actual (List[dict]): Проверяемая траектория.
+        tolerance (float, optional): Допустимое отличие координат и скоростей (0 - побитовое совпадение).
+            По умолчанию 0.
+
+    Returns:
+        Optional[str]: Описание первого расхождения или None, если траектории совпадают.
+    """
+    if len(expected) != len(actual):
+        return f"length {len(actual)} != {len(expected)}"
+    for tick, (expected_frame, actual_frame) in enumerate(zip(expected, actual), 1):
+        expected_ids = [row[0] for row in expected_frame["entities"]]
+        actual_ids = [row[0] for row in actual_frame["entities"]]
+        if expected_ids != actual_ids:
+            return f"tick {tick}: entities {actual_ids} != {expected_ids}"
+        for expected_row, actual_row in zip(expected_frame["entities"], actual_frame["entities"]):
+            for field, expected_value, actual_value in zip(FIELDS, expected_row, actual_row):
+                if type(expected_value) == float or type(actual_value) == float:
+                    equal = abs(expected_value - actual_value) <= tolerance
+                else:
+                    equal = expected_value == actual_value
+                if not equal:
+                    return f"tick {tick}: entity {expected_row[0]} {field} {actual_value!r} != {expected_value!r}"
+        if expected_frame["terrain"] != actual_frame["terrain"]:
+            return f"tick {tick}: terrain {actual_frame['terrain']} != {expected_frame['terrain']}"
+    return None
+
+
+def save_trajectory(path: str, trajectory: List[dict]):
+    """Сохранить траекторию в JSON файл.
+
+    Числа записываются кратчайшим точным представлением, поэтому загруженная траектория совпадает побитово.
+
+    Args:
+        path (str): Путь к файлу.
+        trajectory (List[dict]): Траектория.
+    """
+    with open(path, "w") as file:
+        json.dump(trajectory, file, separators=(",", ":"))
+
+
+def load_trajectory(path: str) -> List[dict]:
+    """Загрузить траекторию из JSON файла.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        List[dict]: Траектория.
+    """
+    with open(path) as file:
+        return json.load(file)
+
+
+def golden_file(map_name: str) -> str:
+    """Получить путь к эталонной траектории карты.
+
+    Args:
+        map_name (str): Карта.
+
+    Returns:
+        str: Путь к файлу.
+    """
+    return f"{GOLDEN_PATH}/{map_name}.json"
+
+
+def run_backend(map_name: str, backend: str, script: List[List[dict]], seed: int = 0) -> Tuple[List[dict], float]:
+    """Записать траекторию варианта физики на карте.
+
+    Усиления из блоков улучшения выбираются модулем random, поэтому перед записью он получает то же зерно.
+
+    Args:
+        map_name (str): Карта.
+        backend (str): Вариант физики.
+        script (List[List[dict]]): Данные ввода игроков по тактам.
+        seed (int, optional): Зерно модуля random. По умолчанию 0.
+
+    Returns:
+        Tuple[List[dict], float]: Траектория и время расчёта тактов мира, с.
+    """
+    random.seed(seed)
+    world = build_world(map_name, backend)
+    try:
+        return record(world, script)
+    finally:
+        close_world(world)
+
+
+def run(maps: List[str], backends: List[str], ticks: int, seed: int = 0, tolerance: float = 0.0,
+        golden: bool = False, save: bool = False) -> List[dict]:
+    """Сравнить варианты физики на картах и напечатать таблицу результатов.
+
+    Эталон - траектория варианта REFERENCE_BACKEND, записанная сейчас, или сохранённая в GOLDEN_PATH
+    (записана на GOLDEN_TICKS тактов с зерном GOLDEN_SEED).
+
+    Args:
+        maps (List[str]): Карты.
+        backends (List[str]): Варианты физики.
+        ticks (int): Количество тактов.
+        seed (int, optional): Зерно сценария ввода. По умолчанию 0.
+        tolerance (float, optional): Допустимое отличие координат и скоростей. По умолчанию 0.
+        golden (bool, optional): Сравнивать с сохранёнными эталонами. По умолчанию False.
+        save (bool, optional): Сохранить траекторию REFERENCE_BACKEND как эталон. По умолчанию False.
+
+    Returns:
+        List[dict]: Результаты ("map", "backend", "ms_per_tick", "speedup", "mismatch").
+    """
+    columns = ["map", "backend", "ms_per_tick", "speedup", "mismatch"]
+    print(" ".join(f"{column:>11}" for column in columns))
+    script = input_script(seed, 2 + EXTRA_PLAYERS, ticks)
+
+    results = []
+    for map_name in maps:
+        reference, reference_time = run_backend(map_name, REFERENCE_BACKEND, script, seed)
+        if save:
+            save_trajectory(golden_file(map_name), reference)
+        expected = load_trajectory(golden_file(map_name)) if golden else reference
+        for backend in backends:
+            if backend == REFERENCE_BACKEND:
+                trajectory, elapsed = reference, reference_time
+            else:
+                trajectory, elapsed = run_backend(map_name, backend, script, seed)
+            result = {
+                "map": map_name,
+                "backend": backend,
+                "ms_per_tick": elapsed / ticks * 1000,
+                "speedup": reference_time / elapsed if elapsed else 0.0,
+                "mismatch": compare(expected, trajectory, tolerance)
+            }
+            results.append(result)
+            print(f"{map_name:>11} {backend:>11} {result['ms_per_tick']:>11.3f} {result['speedup']:>11.2f} "
+                  f"{result['mismatch'] or 'ok':>11}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение траекторий вариантов физики с эталоном")
+    parser.add_argument("--ticks", type=int, default=GOLDEN_TICKS, help="количество тактов")
+    parser.add_argument("--seed", type=int, default=GOLDEN_SEED, help="зерно сценария ввода")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="допустимое отличие координат и скоростей")
+    parser.add_argument("--map", action="append", choices=MAPS, help="карта (по умолчанию все)")
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS),
+                        help="вариант физики (по умолчанию все)")
+    parser.add_argument("--golden", action="store_true", help="сравнивать с сохранёнными эталонами")
+    parser.add_argument("--save", action="store_true", help=f"сохранить траектории {REFERENCE_BACKEND} как эталоны")
+    arguments = parser.parse_args()
+    run(arguments.map or MAPS, arguments.backend or list(BACKENDS), arguments.ticks, arguments.seed,
+        arguments.tolerance, arguments.golden, arguments.save)
@@ -0,0 +1,332 @@
+import hashlib
+import json
+import os
+import struct
+from typing import List, Optional, Tuple
+from jnjserver.additional_data import AdditionalData, AdditionalDataLoader
+from jnjserver.chunked_terrain import ChunkedTerrain, ChunkedTerrainLoader
+from jnjserver.entity import EntitySet, EntitySetLoader
+from jnjserver.paths import user_dir
+from jnjserver.terrain import Terrain, TerrainLoader, TileSet, TileSetLoader
+
+MAGIC = b"JNJL"
+VERSION = 2
+HEADER = struct.Struct("<4sHIQ")
+TERRAIN_ALIGNMENT = 1 << 16
+
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCES = {
+    "tiles": os.path.join(PACKAGE_PATH, "tiles.json"),
+    "entities_types": os.path.join(PACKAGE_PATH, "entities_types.json"),
+    "terrain": os.path.join(PACKAGE_PATH, "terrain.csv"),
+    "additional_data": os.path.join(PACKAGE_PATH, "additional_data.json")
+}
+CACHE_PATH = user_dir("cache", "jnjserver")
+DEFAULT_BUNDLE = os.path.join(CACHE_PATH, "level.jnjl")
+
+
+class Level:
+    """Уровень.
+
+    Всё, из чего строится мир: плитки, типы сущностей, ландшафт и дополнительные данные.
+
+    Attributes:
+        tileset (TileSet): Сет плиток.
+        entityset (EntitySet): Сет типов сущностей.
+        terrain (Terrain): Ландшафт (ChunkedTerrain, если уровень загружен из скомпилированного файла).
+        additional_data (AdditionalData): Дополнительные данные.
+    """
+
+    def __init__(self, tileset: TileSet, entityset: EntitySet, terrain: Terrain,
+                 additional_data: AdditionalData):
+        """Уровень.
+
+        Args:
+            tileset (TileSet): Сет плиток.
+            entityset (EntitySet): Сет типов сущностей.
+            terrain (Terrain): Ландшафт.
+            additional_data (AdditionalData): Дополнительные данные.
+        """
+        self.tileset = tileset
+        self.entityset = entityset
+        self.terrain = terrain
+        self.additional_data = additional_data
+
+
+def source_stamp(path: str, digest: bool = True) -> dict:
+    """Получить отпечаток исходного файла.
+
+    Args:
+        path (str): Путь к файлу.
+        digest (bool, optional): Считать ли хеш содержимого. По умолчанию True.
+
+    Returns:
+        dict: Путь, время изменения, размер и хеш SHA-256 (None, если не считался).
+    """
+    stat = os.stat(path)
+    sha256 = None
+    if digest:
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                sha256.update(block)
+        sha256 = sha256.hexdigest()
+    return {
+        "path": os.path.abspath(path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha256
+    }
+
+
+class LevelCompiler:
+    """Компилятор уровня.
+
+    Проверяет исходные файлы уровня и собирает их в один двоичный файл:
+    заголовок, JSON с плитками, типами сущностей, чекпоинтами, принцессой, отпечатками исходников
+    и размером файла (по нему распознаётся обрезанный файл), затем ландшафт в формате чанков (см. ChunkedTerrain) с выравниванием TERRAIN_ALIGNMENT.
+    """
+
+    @staticmethod
+    def read_sources(sources: dict) -> tuple:
+        """Прочитать JSON файлы уровня.
+
+        Args:
+            sources (dict): Пути к исходным файлам по ролям (см. DEFAULT_SOURCES).
+
+        Returns:
+            tuple: Разобранные JSON плиток, типов сущностей и дополнительных данных.
+        """
+        with open(sources["tiles"]) as json_file:
+            tiles = json.load(json_file)
+        with open(sources["entities_types"]) as json_file:
+            entities_types = json.load(json_file)
+        with open(sources["additional_data"]) as json_file:
+            additional_data = json.load(json_file)
+        return tiles, entities_types, additional_data
+
+    @staticmethod
+    def validate(tileset: TileSet, entityset: EntitySet, additional: AdditionalData, width: int, height: int,
+                 palette: List[str]):
+        """Проверить уровень.
+
+        Args:
+            tileset (TileSet): Сет плиток.
+            entityset (EntitySet): Сет типов сущностей.
+            additional (AdditionalData): Дополнительные данные.
+            width (int): Ширина ландшафта.
+            height (int): Высота ландшафта.
+            palette (List[str]): Названия плиток ландшафта.
+
+        Raises:
+            ValueError: Уровень некорректен.
+        """
+        for tile in tileset.tiles.values():
+            if type(tile.name) != str or type(tile.solid) != bool:
+                raise ValueError(f'tile {tile.name!r} should have a string name and a bool solid')
+        if "player" not in entityset.entities_types:
+            raise ValueError('entities types should contain "player"')
+        for tile in palette:
+            if tile not in tileset.tiles:
+                raise ValueError(f'terrain has unknown tile {tile!r}')
+
+        for player_id in ("john", "josh"):
+            if not additional.checkpoints[player_id]:
+                raise ValueError(f'{player_id} should have checkpoints')
+        for point in [additional.princess] + additional.checkpoints["john"] + additional.checkpoints["josh"]:
+            if not (0 <= point.x < width and 0 <= point.y < height):
+                raise ValueError(f'point ({point.x}, {point.y}) is outside of the terrain')
+
+    @staticmethod
+    def compile(sources: dict, bundle_path: str):
+        """Скомпилировать уровень.
+
+        Файл уровня сначала пишется во временный файл, поэтому прерванная компиляция не портит старый.
+
+        Args:
+            sources (dict): Пути к исходным файлам по ролям (см. DEFAULT_SOURCES).
+            bundle_path (str): Путь к файлу уровня.
+
+        Raises:
+            ValueError: Исходные файлы уровня некорректны.
+            OSError: Файл уровня не удалось записать.
+        """
+        tiles, entities_types, additional_data = LevelCompiler.read_sources(sources)
+        tileset = TileSetLoader.parse(tiles)
+        entityset = EntitySetLoader.parse(entities_types)
+        additional = AdditionalDataLoader.parse(additional_data)
+
+        os.makedirs(os.path.dirname(os.path.abspath(bundle_path)), exist_ok=True)
+        temporary_path = bundle_path + ".tmp"
+        try:
+            with open(sources["terrain"]) as csv_file, open(temporary_path, "wb") as file:
+                file.write(bytes(TERRAIN_ALIGNMENT))
+                width, height, palette = ChunkedTerrainLoader.write(csv_file, file, sources["terrain"])
+                size = file.tell()
+                LevelCompiler.validate(tileset, entityset, additional, width, height, palette)
+
+                metadata = json.dumps({
+                    "tiles": tiles,
+                    "entities_types": entities_types,
+                    "additional_data": {
+                        "checkpoints": additional_data["checkpoints"],
+                        "princess": additional_data["princess"]
+                    },
+                    "sources": {role: source_stamp(path) for role, path in sources.items()},
+                    "size": size
+                }).encode("utf-8")
+                if HEADER.size + len(metadata) > TERRAIN_ALIGNMENT:
+                    raise ValueError('level metadata is too long')
+
+                file.seek(0)
+                file.write(HEADER.pack(MAGIC, VERSION, len(metadata), TERRAIN_ALIGNMENT))
+                file.write(metadata)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        os.replace(temporary_path, bundle_path)
+
+
+class LevelLoader:
+    """Загрузчик уровня из скомпилированного файла."""
+
+    @staticmethod
+    def read_metadata(bundle_path: str) -> Optional[dict]:
+        """Прочитать метаданные уровня.
+
+        Args:
+            bundle_path (str): Путь к файлу уровня.
+
+        Returns:
+            Optional[dict]: Метаданные со смещением ландшафта или None, если файл не читается, повреждён
+                или он другой версии.
+        """
+        try:
+            with open(bundle_path, "rb") as file:
+                header = file.read(HEADER.size)
+                if len(header) != HEADER.size:
+                    return None
+                magic, version, metadata_length, terrain_offset = HEADER.unpack(header)
+                if magic != MAGIC or version != VERSION:
+                    return None
+                metadata = json.loads(file.read(metadata_length).decode("utf-8"))
+                size = os.fstat(file.fileno()).st_size
+        except (OSError, ValueError):
+            return None
+        if type(metadata) != dict or "sources" not in metadata or metadata.get("size") != size:
+            return None
+        metadata["terrain_offset"] = terrain_offset
+        return metadata
+
+    @staticmethod
+    def is_fresh(metadata: Optional[dict], sources: dict) -> bool:
+        """Соответствует ли скомпилированный уровень исходным файлам.
+
+        Если время изменения и размер исходника совпадают, хеш не считается.
+        Если время изменилось, а хеш совпал, уровень всё ещё актуален.
+
+        Args:
+            metadata (Optional[dict]): Метаданные уровня.
+            sources (dict): Пути к исходным файлам по ролям.
+
+        Returns:
+            bool: Актуален ли уровень.
+        """
+        if metadata is None or set(metadata["sources"]) != set(sources):
+            return False
+
+        for role, path in sources.items():
+            stamp = metadata["sources"][role]
+            current = source_stamp(path, digest=False)
+            if current["path"] != stamp["path"] or current["size"] != stamp["size"]:
+                return False
+            if current["mtime_ns"] != stamp["mtime_ns"] and source_stamp(path)["sha256"] != stamp["sha256"]:
+                return False
+        return True
+
+    @staticmethod
+    def load(bundle_path: str, max_chunks: int = 256) -> Level:
+        """Загрузить уровень.
+
+        Ландшафт отображается в память, поэтому время загрузки не зависит от размера карты.
+
+        Args:
+            bundle_path (str): Путь к файлу уровня.
+            max_chunks (int, optional): Бюджет загруженных чанков ландшафта. По умолчанию 256.
+
+        Raises:
+            ValueError: Файл не является файлом уровня.
+
+        Returns:
+            Level: Уровень.
+        """
+        metadata = LevelLoader.read_metadata(bundle_path)
+        if metadata is None:
+            raise ValueError(f'{bundle_path} is not a level bundle')
+        return Level(TileSetLoader.parse(metadata["tiles"]),
+                     EntitySetLoader.parse(metadata["entities_types"]),
+                     ChunkedTerrain(bundle_path, max_chunks, metadata["terrain_offset"]),
+                     AdditionalDataLoader.parse(metadata["additional_data"]))
+
+    @staticmethod
+    def load_sets(sources: dict = None) -> Tuple[TileSet, EntitySet]:
+        """Загрузить только сеты плиток и типов сущностей, не проверяя и не компилируя уровень.
+
+        Нужно для генерируемых уровней, которым ландшафт и дополнительные данные из файлов не нужны.
+
+        Args:
+            sources (dict, optional): Пути к исходным файлам по ролям. По умолчанию DEFAULT_SOURCES.
+
+        Returns:
+            Tuple[TileSet, EntitySet]: Сет плиток и сет типов сущностей.
+        """
+        if sources is None:
+            sources = DEFAULT_SOURCES
+        return TileSetLoader.load(sources["tiles"]), EntitySetLoader.load(sources["entities_types"])
+
+    @staticmethod
+    def load_sources(sources: dict) -> Level:
+        """Загрузить уровень из исходных файлов в память без компиляции.
+
+        Args:
+            sources (dict): Пути к исходным файлам по ролям.
+
+        Raises:
+            ValueError: Исходные файлы уровня некорректны.
+
+        Returns:
+            Level: Уровень с ландшафтом в памяти.
+        """
+        tiles, entities_types, additional_data = LevelCompiler.read_sources(sources)
+        tileset = TileSetLoader.parse(tiles)
+        entityset = EntitySetLoader.parse(entities_types)
+        additional = AdditionalDataLoader.parse(additional_data)
+        terrain = TerrainLoader.load(sources["terrain"])
+        palette = sorted({tile for column in terrain.grid for tile in column})
+        LevelCompiler.validate(tileset, entityset, additional, terrain.width, terrain.height, palette)
+        return Level(tileset, entityset, terrain, additional)
+
+    @staticmethod
+    def load_cached(sources: dict = None, bundle_path: str = DEFAULT_BUNDLE, max_chunks: int = 256) -> Level:
+        """Загрузить уровень, перекомпилировав его, если исходные файлы изменились или файл уровня повреждён.
+
+        Если файл уровня не удалось записать (например, папка кэша только для чтения),
+        уровень загружается из исходных файлов в память.
+
+        Args:
+            sources (dict, optional): Пути к исходным файлам по ролям. По умолчанию DEFAULT_SOURCES.
+            bundle_path (str, optional): Путь к файлу уровня. По умолчанию DEFAULT_BUNDLE.
+            max_chunks (int, optional): Бюджет загруженных чанков ландшафта. По умолчанию 256.
+
+        Returns:
+            Level: Уровень.
+        """
+        if sources is None:
+            sources = DEFAULT_SOURCES
+        if not LevelLoader.is_fresh(LevelLoader.read_metadata(bundle_path), sources):
+            try:
+                LevelCompiler.compile(sources, bundle_path)
+            except OSError:
+                return LevelLoader.load_sources(sources)
+        return LevelLoader.load(bundle_path, max_chunks)
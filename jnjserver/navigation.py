@@ -0,0 +1,700 @@
+import heapq
+from collections import OrderedDict
+from math import ceil, floor
+from typing import Callable, List, Optional, Tuple
+from jnjserver.entity import Entity
+from jnjserver.physics import Number, accelerate
+from jnjserver.player import WALK_VELOCITY, JUMP_VELOCITY, apply_input
+from jnjserver.terrain import Terrain, TileSet
+from jnjserver.vector import Vector
+
+Node = Tuple[int, int]
+Edge = Tuple[Node, float, str]
+
+WALK_SPEED = 0.4
+MAX_DROP = 8
+MAX_JUMP_TICKS = 120
+TAKEOFF_TOLERANCE = 0.25
+ARRIVAL_TOLERANCE = 0.15
+EPSILON = 1e-9
+
+
+def jump_arc(dy: int, climb: bool) -> Optional[List[Tuple[float, float]]]:
+    """Посчитать траекторию прыжка с места на плитку выше или ниже.
+
+    Повторяет физику сущности (см. physics.move) в пустом пространстве: в первом такте прыжок,
+    затем ходьба в одну сторону со скоростью WALK_VELOCITY. При прыжке с подъёмом (climb) сущность
+    начинает идти, только когда её ноги поднимутся выше целевой плитки, поэтому может запрыгнуть на уступ вплотную.
+
+    Args:
+        dy (int): Смещение строки ног при приземлении (отрицательное - выше).
+        climb (bool): Подниматься ли сначала вертикально.
+
+    Returns:
+        Optional[List[Tuple[float, float]]]: Смещения по горизонтали и вертикали после каждого такта до приземления
+            или None, если на такую высоту не запрыгнуть.
+    """
+    velocity_x = 0
+    velocity_y = -JUMP_VELOCITY
+    x = 0
+    y = 0
+    above = False
+    arc = []
+    while len(arc) < MAX_JUMP_TICKS:
+        walking = not climb or y <= dy
+        velocity_x, velocity_y = accelerate(velocity_x + (WALK_VELOCITY if walking else 0), velocity_y, WALK_SPEED)
+        x += velocity_x
+        y += velocity_y
+        arc.append((x, y))
+        if y < dy:
+            above = True
+        elif above and velocity_y > 0:
+            return arc
+    return None
+
+
+def fall_ticks(height: int) -> List[int]:
+    """Посчитать, за сколько тактов сущность падает на каждую высоту.
+
+    Args:
+        height (int): Высота ландшафта.
+
+    Returns:
+        List[int]: Количество тактов падения на 0, 1, 2... плиток.
+    """
+    ticks = [0]
+    velocity_y = 0
+    y = 0
+    tick = 0
+    while len(ticks) <= height:
+        tick += 1
+        velocity_y = accelerate(0, velocity_y, WALK_SPEED)[1]
+        y += velocity_y
+        while len(ticks) <= min(y, height):
+            ticks.append(tick)
+    return ticks
+
+
+class NavigationGraph:
+    """Граф навигации по ландшафту.
+
+    Узлы - клетки, на которых может стоять сущность (над твёрдой плиткой, с местом для тела).
+    Рёбра - ходьба на соседнюю клетку, шаг с обрыва с падением и прыжки в пределах досягаемости,
+    которую дают скорости ходьбы и прыжка игрока (см. jump_arc): с разбега ("jump") и с подъёмом ("climb").
+    Цена ребра - такты на его прохождение.
+    Рёбра узла считаются при первом запросе и сбрасываются по столбцам при изменении плиток рядом.
+
+    Attributes:
+        terrain (Terrain): Ландшафт.
+        tileset (TileSet): Сет плиток.
+        size (Vector): Размер сущности.
+        jumps (Dict[int, Dict[int, Dict[int, list]]]): Прыжки по направлению и смещениям цели по горизонтали
+            и вертикали: вид прыжка, цена и клетки, которые траектория задевает (относительно узла).
+        radius (int): На сколько столбцов в сторону от изменённой плитки сбрасываются рёбра.
+        falls (List[int]): Такты падения по высоте.
+        solid_columns (Dict[int, List[bool]]): Твёрдость клеток по столбцам.
+        standable_columns (Dict[int, List[bool]]): Можно ли стоять на клетках по столбцам.
+        columns (Dict[int, Dict[int, List[Edge]]]): Посчитанные рёбра по столбцу и строке узла.
+        listeners (List[Callable[[int, int], None]]): Функции, вызываемые со столбцами сброшенных рёбер.
+    """
+
+    def __init__(self, terrain: Terrain, tileset: TileSet, size: Vector = Vector(0.75, 1.5)):
+        """Граф навигации по ландшафту.
+
+        Args:
+            terrain (Terrain): Ландшафт.
+            tileset (TileSet): Сет плиток.
+            size (Vector, optional): Размер сущности. По умолчанию размер игрока.
+        """
+        self.terrain = terrain
+        self.tileset = tileset
+        self.size = size
+        self.jumps = {-1: {}, 1: {}}
+        for kind in ("jump", "climb"):
+            for dy in range(-MAX_DROP, 0 if kind == "climb" else MAX_DROP + 1):
+                arc = jump_arc(dy, kind == "climb")
+                if arc is None:
+                    continue
+                for dx in range(1, floor(arc[-1][0] + 0.5 - TAKEOFF_TOLERANCE) + 1):
+                    for direction in (-1, 1):
+                        cost = max(len(arc), dx / WALK_SPEED)
+                        options = self.jumps[direction].setdefault(dx, {}).setdefault(dy, [])
+                        options.append((kind, cost, self.arc_cells(arc, direction, dx)))
+        self.radius = max(self.jumps[1]) + 1
+        self.falls = fall_ticks(terrain.height)
+        self.solid_columns = {}
+        self.standable_columns = {}
+        self.columns = {}
+        self.listeners = []
+        terrain.add_listener(self.on_tile_changed)
+
+    def add_listener(self, callback: Callable[[int, int], None]):
+        """Добавить функцию, вызываемую при сбросе рёбер.
+
+        Args:
+            callback (Callable[[int, int], None]): Функция от первого и последнего столбца сброшенных рёбер.
+        """
+        self.listeners.append(callback)
+
+    def on_tile_changed(self, x: int, y: int, tile: str):
+        """Сбросить рёбра узлов, до которых могло дотянуться изменение плитки.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            tile (str): Новое название плитки.
+        """
+        self.solid_columns.pop(x, None)
+        for column in range(x - ceil(self.size.x), x + ceil(self.size.x) + 1):
+            self.standable_columns.pop(column, None)
+        for column in range(x - self.radius, x + self.radius + 1):
+            self.columns.pop(column, None)
+        for callback in self.listeners:
+            callback(x - self.radius, x + self.radius)
+
+    def is_solid(self, x: int, y: int) -> bool:
+        """Твёрдая ли клетка для навигации.
+
+        Клетки за левым и правым краем ландшафта твёрдые, выше и ниже ландшафта - пустые.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+
+        Returns:
+            bool: Твёрдая ли клетка.
+        """
+        column = self.solid_columns.get(x)
+        if column is None:
+            if x < 0 or x >= self.terrain.width:
+                return True
+            tiles = self.tileset.tiles
+            column = [tiles[self.terrain.get_tile(x, row)].solid for row in range(self.terrain.height)]
+            self.solid_columns[x] = column
+        return 0 <= y < len(column) and column[y]
+
+    def is_free(self, x: Number, y: Number) -> bool:
+        """Помещается ли сущность на координатах, не задевая твёрдых клеток.
+
+        Касание границы клетки не считается пересечением, как и в физике.
+
+        Args:
+            x (Number): Координата x.
+            y (Number): Координата y.
+
+        Returns:
+            bool: Свободно ли место.
+        """
+        for tile_x in range(floor(x + EPSILON), ceil(x + self.size.x - EPSILON)):
+            for tile_y in range(floor(y + EPSILON), ceil(y + self.size.y - EPSILON)):
+                if self.is_solid(tile_x, tile_y):
+                    return False
+        return True
+
+    def is_standable(self, x: int, y: int) -> bool:
+        """Может ли сущность стоять на клетке.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y (строка, в которой стоят ноги).
+
+        Returns:
+            bool: Является ли клетка узлом графа.
+        """
+        column = self.standable_column(x)
+        return 0 <= y < len(column) and column[y]
+
+    def standable_column(self, x: int) -> List[bool]:
+        """Получить, можно ли стоять на клетках столбца.
+
+        Args:
+            x (int): Координата x.
+
+        Returns:
+            List[bool]: Можно ли стоять на клетке по строке.
+        """
+        column = self.standable_columns.get(x)
+        if column is None:
+            column = [row + 1 < self.terrain.height and self.is_solid(x, row + 1) and
+                      self.is_free(*self.standing_position((x, row))) for row in range(self.terrain.height)]
+            self.standable_columns[x] = column
+        return column
+
+    def standing_position(self, node: Node) -> Tuple[float, float]:
+        """Получить координаты сущности, стоящей посередине клетки.
+
+        Args:
+            node (Node): Узел.
+
+        Returns:
+            Tuple[float, float]: Координаты x и y.
+        """
+        return node[0] + (1 - self.size.x) / 2, node[1] + 1 - self.size.y
+
+    def node_at(self, position: Vector, max_drop: int = 2) -> Optional[Node]:
+        """Получить узел под сущностью.
+
+        В каждой строке сначала проверяется столбец под серединой сущности, затем столбцы под её краями.
+
+        Args:
+            position (Vector): Позиция сущности.
+            max_drop (int, optional): На сколько строк ниже ног искать узел. По умолчанию 2.
+
+        Returns:
+            Optional[Node]: Узел или None, если под сущностью нет узла.
+        """
+        y = floor(position.y + self.size.y - 0.5)
+        for row in range(y, y + max_drop + 1):
+            for x in (floor(position.x + self.size.x / 2), floor(position.x), ceil(position.x + self.size.x) - 1):
+                if self.is_standable(x, row):
+                    return x, row
+        return None
+
+    def edges(self, node: Node) -> List[Edge]:
+        """Получить рёбра узла.
+
+        Args:
+            node (Node): Узел.
+
+        Returns:
+            List[Edge]: Соседние узлы с ценой перехода в тактах и видом перехода ("walk", "fall", "jump", "climb").
+        """
+        x, y = node
+        column = self.columns.setdefault(x, {})
+        edges = column.get(y)
+        if edges is None:
+            edges = self.compute_edges(node)
+            column[y] = edges
+        return edges
+
+    def compute_edges(self, node: Node) -> List[Edge]:
+        """Посчитать рёбра узла.
+
+        Args:
+            node (Node): Узел.
+
+        Returns:
+            List[Edge]: Рёбра узла.
+        """
+        x, y = node
+        edges = []
+        for direction in (-1, 1):
+            neighbour = x + direction
+            if self.is_standable(neighbour, y):
+                edges.append(((neighbour, y), 1 / WALK_SPEED, "walk"))
+            elif self.is_free(*self.standing_position((neighbour, y))):
+                row = y + 1
+                while row + 1 < self.terrain.height and not self.is_solid(neighbour, row + 1):
+                    row += 1
+                if row + 1 < self.terrain.height and self.is_standable(neighbour, row):
+                    edges.append(((neighbour, row), max(self.falls[row - y], 1 / WALK_SPEED), "fall"))
+
+            reached = {edge[0] for edge in edges}
+            for dx, jumps in self.jumps[direction].items():
+                target_x = x + direction * dx
+                column = self.standable_column(target_x)
+                for dy, options in jumps.items():
+                    target = (target_x, y + dy)
+                    if not 0 <= y + dy < len(column) or not column[y + dy] or target in reached:
+                        continue
+                    for kind, cost, cells in options:
+                        if not any(self.is_solid(x + cell_x, y + cell_y) for cell_x, cell_y in cells):
+                            edges.append((target, cost, kind))
+                            reached.add(target)
+                            break
+        return edges
+
+    def arc_cells(self, arc: List[Tuple[float, float]], direction: int, dx: int) -> List[Tuple[int, int]]:
+        """Получить клетки, которые задевает прыжок.
+
+        Сущность прыгает с середины клетки и перестаёт идти над целевым столбцом.
+        Последний такт траектории не учитывается: в нём сущность приземляется на целевую плитку.
+
+        Args:
+            arc (List[Tuple[float, float]]): Траектория прыжка.
+            direction (int): Направление (-1 - влево, 1 - вправо).
+            dx (int): Смещение целевого столбца.
+
+        Returns:
+            List[Tuple[int, int]]: Координаты клеток относительно узла, с которого прыгает сущность.
+        """
+        x, y = self.standing_position((0, 0))
+        cells = set()
+        for arc_x, arc_y in arc[:-1]:
+            left = x + direction * min(arc_x, dx)
+            top = y + arc_y
+            for cell_x in range(floor(left + EPSILON), ceil(left + self.size.x - EPSILON)):
+                for cell_y in range(floor(top + EPSILON), ceil(top + self.size.y - EPSILON)):
+                    cells.add((cell_x, cell_y))
+        return sorted(cells)
+
+    def nearest_node(self, x: int, y: int, radius: int = 4) -> Optional[Node]:
+        """Найти ближайший к клетке узел.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            radius (int, optional): Радиус поиска. По умолчанию 4.
+
+        Returns:
+            Optional[Node]: Узел или None, если рядом нет узлов.
+        """
+        for distance in range(radius + 1):
+            for column in sorted(range(x - distance, x + distance + 1), key=lambda c: abs(c - x)):
+                for row in range(y - distance, y + distance + 1):
+                    if max(abs(column - x), abs(row - y)) == distance and self.is_standable(column, row):
+                        return column, row
+        return None
+
+
+class Route:
+    """Найденные пути к одной цели.
+
+    Каждый узел пути хранит следующий за ним узел, поэтому путь из любого узла уже найденного пути берётся без поиска.
+
+    Attributes:
+        next_hops (Dict[Node, Tuple[Node, str]]): Следующий узел и вид перехода по узлу.
+        unreachable (set): Узлы, из которых цель недостижима.
+        x_min (int): Первый столбец узлов маршрута.
+        x_max (int): Последний столбец узлов маршрута.
+    """
+
+    def __init__(self):
+        """Найденные пути к одной цели."""
+        self.next_hops = {}
+        self.unreachable = set()
+        self.x_min = None
+        self.x_max = None
+
+    def cover(self, x: int):
+        """Расширить столбцы маршрута до столбца.
+
+        Args:
+            x (int): Столбец.
+        """
+        self.x_min = x if self.x_min is None else min(self.x_min, x)
+        self.x_max = x if self.x_max is None else max(self.x_max, x)
+
+
+class Search:
+    """Поиск пути A*, который можно продолжать по частям.
+
+    Attributes:
+        start (Node): Начальный узел.
+        goal (Node): Целевой узел.
+        open (list): Куча открытых узлов (оценка, счётчик, узел).
+        costs (dict): Лучшая известная цена пути до узла.
+        parents (dict): Предыдущий узел и вид перехода по узлу.
+        closed (set): Раскрытые узлы.
+        counter (int): Счётчик, сохраняющий порядок узлов с одинаковой оценкой.
+    """
+
+    def __init__(self, start: Node, goal: Node):
+        """Поиск пути A*.
+
+        Args:
+            start (Node): Начальный узел.
+            goal (Node): Целевой узел.
+        """
+        self.start = start
+        self.goal = goal
+        self.open = [(self.heuristic(start), 0, start)]
+        self.costs = {start: 0}
+        self.parents = {}
+        self.closed = set()
+        self.counter = 1
+
+    def heuristic(self, node: Node) -> float:
+        """Оценить цену пути от узла до цели.
+
+        Никакой переход не быстрее ходьбы на максимальной скорости, поэтому оценка не завышена.
+
+        Args:
+            node (Node): Узел.
+
+        Returns:
+            float: Оценка в тактах.
+        """
+        return abs(node[0] - self.goal[0]) / WALK_SPEED
+
+    def step(self, graph: NavigationGraph, route: Route, budget: int) -> Tuple[Optional[Node], int]:
+        """Продолжить поиск.
+
+        Поиск останавливается на цели или на узле с уже известным путём к цели.
+
+        Args:
+            graph (NavigationGraph): Граф навигации.
+            route (Route): Найденные пути к цели.
+            budget (int): Сколько узлов можно раскрыть.
+
+        Returns:
+            Tuple[Optional[Node], int]: Узел, до которого найден путь (None, если поиск не закончен или путь не найден),
+                и количество раскрытых узлов.
+        """
+        expanded = 0
+        while self.open and expanded < budget:
+            node = heapq.heappop(self.open)[2]
+            if node in self.closed:
+                continue
+            if node == self.goal or node in route.next_hops:
+                return node, expanded
+            self.closed.add(node)
+            expanded += 1
+
+            cost = self.costs[node]
+            for neighbour, edge_cost, kind in graph.edges(node):
+                new_cost = cost + edge_cost
+                if new_cost < self.costs.get(neighbour, float("inf")):
+                    self.costs[neighbour] = new_cost
+                    self.parents[neighbour] = (node, kind)
+                    heapq.heappush(self.open, (new_cost + self.heuristic(neighbour), self.counter, neighbour))
+                    self.counter += 1
+        return None, expanded
+
+
+class PathFinder:
+    """Поиск путей по графу навигации.
+
+    Запросы копятся и обрабатываются пачкой раз в такт в пределах бюджета раскрытых узлов, поиск продолжается
+    в следующих тактах. Одинаковые запросы объединяются, найденные пути к цели кешируются (см. Route),
+    так что сотни ботов с общей целью ищут путь почти бесплатно. Маршруты сбрасываются, когда меняются рёбра
+    в их столбцах.
+
+    Attributes:
+        graph (NavigationGraph): Граф навигации.
+        budget (int): Сколько узлов можно раскрыть за такт.
+        max_routes (int): Сколько целей хранить в кеше.
+        max_expansions (int): Сколько узлов можно раскрыть в одном поиске.
+        routes (OrderedDict): Маршруты по цели в порядке использования.
+        pending (OrderedDict): Незаконченные поиски по началу и цели.
+    """
+
+    def __init__(self, graph: NavigationGraph, budget: int = 200, max_routes: int = 256,
+                 max_expansions: int = 50000):
+        """Поиск путей по графу навигации.
+
+        Args:
+            graph (NavigationGraph): Граф навигации.
+            budget (int, optional): Сколько узлов можно раскрыть за такт. По умолчанию 200.
+            max_routes (int, optional): Сколько целей хранить в кеше. По умолчанию 256.
+            max_expansions (int, optional): Сколько узлов можно раскрыть в одном поиске. По умолчанию 50000.
+
+        Raises:
+            ValueError: Бюджет - положительное целое число.
+        """
+        if type(budget) != int or budget <= 0:
+            raise ValueError('budget should be a positive integer')
+
+        self.graph = graph
+        self.budget = budget
+        self.max_routes = max_routes
+        self.max_expansions = max_expansions
+        self.routes = OrderedDict()
+        self.pending = OrderedDict()
+        graph.add_listener(self.on_graph_changed)
+
+    def route(self, goal: Node) -> Route:
+        """Получить маршруты к цели.
+
+        Args:
+            goal (Node): Цель.
+
+        Returns:
+            Route: Маршруты к цели.
+        """
+        route = self.routes.get(goal)
+        if route is None:
+            route = Route()
+            route.cover(goal[0])
+            self.routes[goal] = route
+            if len(self.routes) > self.max_routes:
+                self.routes.popitem(last=False)
+        else:
+            self.routes.move_to_end(goal)
+        return route
+
+    def next_hop(self, start: Node, goal: Node) -> Optional[Tuple[Node, str]]:
+        """Получить следующий узел пути.
+
+        Если путь ещё не найден, ставит запрос в очередь.
+
+        Args:
+            start (Node): Начальный узел.
+            goal (Node): Цель.
+
+        Returns:
+            Optional[Tuple[Node, str]]: Следующий узел и вид перехода или None, если путь ещё не найден
+                или его нет (start == goal тоже даёт None).
+        """
+        route = self.route(goal)
+        hop = route.next_hops.get(start)
+        if hop is None and start != goal and start not in route.unreachable:
+            self.pending.setdefault((start, goal), None)
+        return hop
+
+    def path(self, start: Node, goal: Node) -> Optional[List[Node]]:
+        """Получить найденный путь.
+
+        Args:
+            start (Node): Начальный узел.
+            goal (Node): Цель.
+
+        Returns:
+            Optional[List[Node]]: Узлы пути от начала до цели или None, если путь ещё не найден.
+        """
+        if start == goal:
+            return [start]
+        route = self.route(goal)
+        if start not in route.next_hops:
+            self.next_hop(start, goal)
+            return None
+        path = [start]
+        while path[-1] != goal:
+            path.append(route.next_hops[path[-1]][0])
+        return path
+
+    def update(self):
+        """Продолжить поиски в пределах бюджета."""
+        budget = self.budget
+        while self.pending and budget > 0:
+            (start, goal), search = next(iter(self.pending.items()))
+            route = self.route(goal)
+            if start in route.next_hops or start in route.unreachable:
+                del self.pending[(start, goal)]
+                continue
+
+            if search is None:
+                search = Search(start, goal)
+                self.pending[(start, goal)] = search
+            found, expanded = search.step(self.graph, route, min(budget, self.max_expansions - len(search.closed)))
+            budget -= expanded
+
+            if found is not None:
+                self.store_path(route, search, found)
+            elif not search.open or len(search.closed) >= self.max_expansions:
+                unreachable = search.closed if not search.open else {start}
+                route.unreachable |= unreachable
+                for node in unreachable:
+                    route.cover(node[0])
+            else:
+                break
+            del self.pending[(start, goal)]
+
+    @staticmethod
+    def store_path(route: Route, search: Search, found: Node):
+        """Запомнить найденный путь в маршруте.
+
+        Args:
+            route (Route): Маршруты к цели.
+            search (Search): Законченный поиск.
+            found (Node): Узел, до которого найден путь.
+        """
+        node = found
+        while node != search.start:
+            parent, kind = search.parents[node]
+            route.next_hops.setdefault(parent, (node, kind))
+            route.cover(parent[0])
+            node = parent
+
+    def on_graph_changed(self, x_min: int, x_max: int):
+        """Сбросить маршруты и поиски, задевающие столбцы со сброшенными рёбрами.
+
+        Args:
+            x_min (int): Первый столбец.
+            x_max (int): Последний столбец.
+        """
+        for goal in [goal for goal, route in self.routes.items() if route.x_min <= x_max and route.x_max >= x_min]:
+            del self.routes[goal]
+        for key in self.pending:
+            self.pending[key] = None
+
+
+class Bot:
+    """Бот.
+
+    Производит ввод для сущности (как с клиента, см. apply_input), ведя её к цели по графу навигации.
+
+    Attributes:
+        entity (Entity): Сущность.
+        pathfinder (PathFinder): Поиск путей.
+        goal (Vector): Цель.
+        goal_node (Optional[Node]): Узел графа у цели.
+        target (Optional[Node]): Узел, к которому бот идёт сейчас.
+        kind (Optional[str]): Вид перехода к этому узлу.
+    """
+
+    def __init__(self, entity: Entity, pathfinder: PathFinder, goal: Vector):
+        """Бот.
+
+        Args:
+            entity (Entity): Сущность.
+            pathfinder (PathFinder): Поиск путей.
+            goal (Vector): Цель.
+        """
+        self.entity = entity
+        self.pathfinder = pathfinder
+        self.goal = goal
+        self.goal_node = None
+        self.target = None
+        self.kind = None
+
+    def next_input(self) -> dict:
+        """Получить ввод на этот такт.
+
+        Returns:
+            dict: Данные ввода ("walking", "jumping").
+        """
+        graph = self.pathfinder.graph
+        center = self.entity.position.x + self.entity.type.size.x / 2
+        jumping = False
+
+        if self.entity.is_on_ground:
+            self.target = None
+            node = graph.node_at(self.entity.position)
+            if self.goal_node is None or not graph.is_standable(*self.goal_node):
+                self.goal_node = graph.nearest_node(floor(self.goal.x), floor(self.goal.y) + 1)
+            hop = None
+            if node is not None and self.goal_node is not None:
+                hop = self.pathfinder.next_hop(node, self.goal_node)
+            if hop is None:
+                return {"walking": False, "jumping": False}
+
+            self.target, self.kind = hop
+            if self.kind in ("jump", "climb"):
+                if abs(center - (node[0] + 0.5)) > TAKEOFF_TOLERANCE:
+                    return {"walking": self.direction(node[0] + 0.5), "jumping": False}
+                jumping = True
+            elif self.kind == "fall":
+                return {"walking": "right" if self.target[0] > node[0] else "left", "jumping": False}
+
+        if self.target is None:
+            return {"walking": False, "jumping": False}
+        if self.kind == "climb" and self.entity.position.y + self.entity.type.size.y > self.target[1] + 1:
+            return {"walking": False, "jumping": jumping}
+        return {"walking": self.direction(self.target[0] + 0.5), "jumping": jumping}
+
+    def direction(self, x: float):
+        """Получить направление ходьбы к точке.
+
+        Учитывает тормозной путь: сущность перестаёт идти, когда трение остановит её над точкой.
+
+        Args:
+            x (float): Координата x точки.
+
+        Returns:
+            Union[str, bool]: "left", "right" или False, если сущность остановится над точкой.
+        """
+        velocity = self.entity.velocity.x
+        stop = self.entity.position.x + self.entity.type.size.x / 2
+        while velocity != 0:
+            velocity = accelerate(velocity, 0, WALK_SPEED)[0]
+            stop += velocity
+        if x - stop > ARRIVAL_TOLERANCE:
+            return "right"
+        if stop - x > ARRIVAL_TOLERANCE:
+            return "left"
+        return False
+
+    def update(self):
+        """Применить ввод бота к сущности."""
+        apply_input(self.entity, self.next_input())
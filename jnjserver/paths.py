@@ -0,0 +1,32 @@
+import os
+
+# Переменная окружения и путь по умолчанию от домашней папки для каждого вида пользовательских файлов
+USER_DIRS = {
+    "cache": ("XDG_CACHE_HOME", (".cache",)),
+    "data": ("XDG_DATA_HOME", (".local", "share"))
+}
+
+
+def user_dir(kind: str, app: str) -> str:
+    """Получить папку пользовательских файлов приложения.
+
+    На Windows это папка из LOCALAPPDATA, на остальных системах - папка XDG для этого вида файлов
+    (~/.cache для кэша, ~/.local/share для данных). Папка не создаётся.
+
+    Args:
+        kind (str): Вид файлов (см. USER_DIRS).
+        app (str): Название приложения (папка внутри папки вида).
+
+    Raises:
+        ValueError: Неизвестный вид файлов.
+
+    Returns:
+        str: Путь к папке.
+    """
+    if kind not in USER_DIRS:
+        raise ValueError(f'unknown kind {kind}')
+
+    variable, default = USER_DIRS[kind]
+    base = (os.environ.get("LOCALAPPDATA") or os.environ.get(variable)
+            or os.path.join(os.path.expanduser("~"), *default))
+    return os.path.join(base, app)
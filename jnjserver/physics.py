@@ -0,0 +1,190 @@
+from math import floor
+from typing import Callable, List, Tuple, Union
+
+Number = Union[int, float]
+Rect = Tuple[int, int, int, int]
+
+
+def accelerate(velocity_x: Number, velocity_y: Number, max_speed: Number) -> Tuple[Number, Number]:
+    """Применить гравитацию и трение к скорости.
+
+    Args:
+        velocity_x (Number): Скорость по горизонтали.
+        velocity_y (Number): Скорость по вертикали.
+        max_speed (Number): Максимальная скорость по горизонтали.
+
+    Returns:
+        Tuple[Number, Number]: Новые скорости по горизонтали и вертикали.
+    """
+    velocity_y = min(velocity_y + 0.12, 1)
+    if velocity_x > 0:
+        velocity_x = max(0.0, velocity_x - 0.15)
+    elif velocity_x < 0:
+        velocity_x = min(0.0, velocity_x + 0.15)
+
+    return max(-max_speed, min(velocity_x, max_speed)), velocity_y
+
+
+def collision_window(x: Number, y: Number, size_x: Number, size_y: Number, width: int,
+                     height: int) -> Tuple[int, int, int, int]:
+    """Получить окно плиток, с которыми может столкнуться сущность за такт.
+
+    Args:
+        x (Number): Координата x.
+        y (Number): Координата y.
+        size_x (Number): Ширина.
+        size_y (Number): Высота.
+        width (int): Ширина ландшафта.
+        height (int): Высота ландшафта.
+
+    Returns:
+        Tuple[int, int, int, int]: Левая, верхняя, правая и нижняя границы окна (правая и нижняя не включаются).
+    """
+    x_tiles_min = max(0, min(floor(x) - 1, width))
+    x_tiles_max = max(0, min(floor(x + size_x) + 2, width))
+    y_tiles_min = max(0, min(floor(y) - 1, height))
+    y_tiles_max = max(0, min(floor(y + size_y) + 2, height))
+    return x_tiles_min, y_tiles_min, x_tiles_max, y_tiles_max
+
+
+def move(x: Number, y: Number, size_x: Number, size_y: Number, velocity_x: Number, velocity_y: Number,
+         max_speed: Number, is_solid: Callable[[int, int], bool], width: int, height: int) -> tuple:
+    """Сдвинуть прямоугольник сущности на один такт.
+
+    Применяет гравитацию и трение к скорости и сдвигает прямоугольник, останавливая его на твёрдых плитках.
+    Не меняет состояние мира, результат применяет Entity.apply_movement.
+
+    Args:
+        x (Number): Координата x.
+        y (Number): Координата y.
+        size_x (Number): Ширина.
+        size_y (Number): Высота.
+        velocity_x (Number): Скорость по горизонтали.
+        velocity_y (Number): Скорость по вертикали.
+        max_speed (Number): Максимальная скорость по горизонтали.
+        is_solid (Callable[[int, int], bool]): Твёрдая ли плитка на координатах.
+        width (int): Ширина ландшафта.
+        height (int): Высота ландшафта.
+
+    Returns:
+        tuple: Новые координаты x и y, скорости по горизонтали и вертикали, стоит ли на земле
+            и список координат плиток, об которые ударился головой.
+    """
+    velocity_x, velocity_y = accelerate(velocity_x, velocity_y, max_speed)
+    colliding_tiles = []
+    x_tiles_min, y_tiles_min, x_tiles_max, y_tiles_max = collision_window(x, y, size_x, size_y, width, height)
+
+    for tile_x in range(x_tiles_min, x_tiles_max):
+        for tile_y in range(y_tiles_min, y_tiles_max):
+            if is_solid(tile_x, tile_y):
+                colliding_tiles.append((tile_x, tile_y))
+
+    is_on_ground = False
+    ceil_tiles: List[Tuple[int, int]] = []
+
+    x_min = velocity_x
+    y_min = velocity_y
+
+    for tile_x, tile_y in colliding_tiles:
+        if x + size_x + x_min > tile_x and x + x_min < tile_x + 1 and y + size_y > tile_y and y < tile_y + 1:
+            if x_min > 0:
+                x_min = min(x_min, tile_x - (x + size_x))
+            elif x_min < 0:
+                x_min = max(x_min, tile_x + 1 - x)
+            velocity_x = 0
+
+        elif x + size_x > tile_x and x < tile_x + 1 and y + size_y + y_min > tile_y and y + y_min < tile_y + 1:
+            if y_min > 0:
+                y_min = min(y_min, tile_y - (y + size_y))
+                is_on_ground = True
+            elif y_min < 0:
+                y_min = max(y_min, tile_y + 1 - y)
+                ceil_tiles.append((tile_x, tile_y))
+            velocity_y = 0
+
+    return x + x_min, y + y_min, velocity_x, velocity_y, is_on_ground, ceil_tiles
+
+
+def move_rects(x: Number, y: Number, size_x: Number, size_y: Number, velocity_x: Number, velocity_y: Number,
+               max_speed: Number, query: Callable[[int, int, int, int], List[Rect]], width: int,
+               height: int) -> tuple:
+    """Сдвинуть прямоугольник сущности на один такт, сталкивая его с прямоугольниками ландшафта.
+
+    То же, что move, но проверяет объединённые прямоугольники твёрдых плиток (см. CollisionRects) вместо
+    отдельных плиток. Прямоугольники проверяются в том же порядке, что и плитки в move (по столбцам слева направо).
+    Если сущность пересекается с прямоугольником (застряла) или ударяется головой, такт считается по плиткам
+    этих же прямоугольников функцией move: так и движение, и список плиток потолка совпадают с move.
+
+    Args:
+        x (Number): Координата x.
+        y (Number): Координата y.
+        size_x (Number): Ширина.
+        size_y (Number): Высота.
+        velocity_x (Number): Скорость по горизонтали.
+        velocity_y (Number): Скорость по вертикали.
+        max_speed (Number): Максимальная скорость по горизонтали.
+        query (Callable[[int, int, int, int], List[Rect]]): Прямоугольники в окне, обрезанные по окну.
+        width (int): Ширина ландшафта.
+        height (int): Высота ландшафта.
+
+    Returns:
+        tuple: Новые координаты x и y, скорости по горизонтали и вертикали, стоит ли на земле
+            и список координат плиток, об которые ударился головой.
+    """
+    boxes = sorted(query(*collision_window(x, y, size_x, size_y, width, height)))
+    for x0, y0, x1, y1 in boxes:
+        if x + size_x > x0 and x < x1 and y + size_y > y0 and y < y1:
+            return move_boxes(x, y, size_x, size_y, velocity_x, velocity_y, max_speed, boxes, width, height)
+
+    start_velocity_x, start_velocity_y = velocity_x, velocity_y
+    velocity_x, velocity_y = accelerate(velocity_x, velocity_y, max_speed)
+    is_on_ground = False
+
+    x_min = velocity_x
+    y_min = velocity_y
+
+    for x0, y0, x1, y1 in boxes:
+        if x + size_x + x_min > x0 and x + x_min < x1 and y + size_y > y0 and y < y1:
+            if x_min > 0:
+                x_min = min(x_min, x0 - (x + size_x))
+            elif x_min < 0:
+                x_min = max(x_min, x1 - x)
+            velocity_x = 0
+
+        elif x + size_x > x0 and x < x1 and y + size_y + y_min > y0 and y + y_min < y1:
+            if y_min < 0:
+                return move_boxes(x, y, size_x, size_y, start_velocity_x, start_velocity_y, max_speed, boxes, width,
+                                  height)
+            if y_min > 0:
+                y_min = min(y_min, y0 - (y + size_y))
+                is_on_ground = True
+            velocity_y = 0
+
+    return x + x_min, y + y_min, velocity_x, velocity_y, is_on_ground, []
+
+
+def move_boxes(x: Number, y: Number, size_x: Number, size_y: Number, velocity_x: Number, velocity_y: Number,
+               max_speed: Number, boxes: List[Rect], width: int, height: int) -> tuple:
+    """Сдвинуть прямоугольник сущности на один такт по отдельным плиткам прямоугольников.
+
+    Args:
+        x (Number): Координата x.
+        y (Number): Координата y.
+        size_x (Number): Ширина.
+        size_y (Number): Высота.
+        velocity_x (Number): Скорость по горизонтали.
+        velocity_y (Number): Скорость по вертикали.
+        max_speed (Number): Максимальная скорость по горизонтали.
+        boxes (List[Rect]): Прямоугольники твёрдых плиток в окне столкновений.
+        width (int): Ширина ландшафта.
+        height (int): Высота ландшафта.
+
+    Returns:
+        tuple: То же, что move.
+    """
+    solid = {(tile_x, tile_y) for x0, y0, x1, y1 in boxes for tile_x in range(x0, x1) for tile_y in range(y0, y1)}
+
+    def is_solid(tile_x: int, tile_y: int) -> bool:
+        return (tile_x, tile_y) in solid
+
+    return move(x, y, size_x, size_y, velocity_x, velocity_y, max_speed, is_solid, width, height)
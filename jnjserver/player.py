@@ -1,5 +1,21 @@
 from jnjserver.entity import Entity
 
+WALK_VELOCITY = 0.24
+JUMP_VELOCITY = 1.1
+
+
+def apply_input(entity: Entity, player_input: dict):
+    """Применить данные ввода к сущности.
+
+    Args:
+        entity (Entity): Сущность.
+        player_input (dict): Данные ввода ("walking" - направление или False, "jumping" - прыгать ли).
+    """
+    if player_input["walking"]:
+        entity.walk(player_input["walking"], WALK_VELOCITY)
+    if player_input["jumping"]:
+        entity.jump(JUMP_VELOCITY)
+
 
 class Player:
     """Игрок.
@@ -11,6 +27,9 @@ class Player:
         sock (socket): сокет.
         address (Any): адрес.
         entity: (Entity): сущность.
+        input (dict): Последние данные ввода. Клиент присылает ввод только при изменении и изредка для
+            подтверждения, поэтому ввод применяется каждый такт до прихода нового.
+        resync_tick (Optional[int]): Такт последнего ответа на запрос догоняния (None - не отвечали).
     """
 
     def __init__(self, player_id: str, sock, address, entity: Entity):
@@ -26,19 +45,27 @@ class Player:
         self.sock = sock
         self.address = address
         self.entity = entity
+        self.input = {"walking": False, "jumping": False}
+        self.resync_tick = None
 
     def process_input(self, player_input: dict):
         """Обработать данные ввода
 
-        Обрабатывает данные присланные с клиента. Отвечает за команды движения сущности игрока.
+        Запоминает данные присланные с клиента до следующего такта. Прыжок запоминается до применения,
+        даже если следующие данные ввода пришли раньше такта.
 
         Args:
             player_input (dict): Данные ввода
         """
-        if player_input["walking"]:
-            self.entity.walk(player_input["walking"], 0.24)
-        if player_input["jumping"]:
-            self.entity.jump(1.1)
+        self.input = {"walking": player_input["walking"], "jumping": player_input["jumping"] or self.input["jumping"]}
+
+    def update(self):
+        """Применить последние данные ввода.
+
+        Отвечает за команды движения сущности игрока. Прыжок применяется один раз.
+        """
+        apply_input(self.entity, self.input)
+        self.input["jumping"] = False
 
     def send_data(self, data: dict):
         """Отправить данные клиенту
@@ -0,0 +1,6 @@
+# Константы протокола, общие для сервера и клиента
+
+# Сколько столбцов вокруг игрока клиент запрашивает и сервер присылает при догонянии
+STREAM_RADIUS = 24
+# Не чаще скольких тактов клиент повторяет запрос догоняния и сервер на него отвечает
+RESYNC_RETRY_TICKS = 30
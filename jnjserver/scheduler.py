@@ -0,0 +1,225 @@
+from math import hypot, inf
+from typing import List, Optional, Tuple
+from jnjserver.entity import Entity
+
+
+class UpdateTier:
+    """Уровень детализации обновления.
+
+    Описывает, как часто обновляются сущности на определённом расстоянии от ближайшего игрока.
+
+    Attributes:
+        max_distance (float): Максимальное расстояние до ближайшего игрока в плитках.
+        interval (int): Раз во сколько тактов обновляются сущности уровня (0 - сущности заморожены).
+        max_catch_up (int): Сколько пропущенных тактов физики можно догнать за одно обновление (1 - не догонять).
+        budget (Optional[int]): Сколько сущностей уровня можно обновить за такт (None - без ограничения).
+    """
+
+    def __init__(self, max_distance: float, interval: int, max_catch_up: int = 1, budget: Optional[int] = None):
+        """Уровень детализации обновления.
+
+        Args:
+            max_distance (float): Максимальное расстояние до ближайшего игрока в плитках.
+            interval (int): Раз во сколько тактов обновляются сущности уровня (0 - сущности заморожены).
+            max_catch_up (int, optional): Сколько пропущенных тактов можно догнать за обновление. По умолчанию 1.
+            budget (Optional[int], optional): Сколько сущностей можно обновить за такт. По умолчанию без ограничения.
+
+        Raises:
+            ValueError: Интервал - неотрицательное целое число.
+            ValueError: Максимум догоняемых тактов - положительное целое число.
+            ValueError: Бюджет - положительное целое число.
+        """
+        if type(interval) != int or interval < 0:
+            raise ValueError('interval should be a non-negative int')
+        if type(max_catch_up) != int or max_catch_up < 1:
+            raise ValueError('max_catch_up should be a positive int')
+        if budget is not None and (type(budget) != int or budget < 1):
+            raise ValueError('budget should be a positive int')
+
+        self.max_distance = max_distance
+        self.interval = interval
+        self.max_catch_up = max_catch_up
+        self.budget = budget
+
+
+def default_tiers() -> List[UpdateTier]:
+    """Уровни детализации по умолчанию.
+
+    Сущности в пределах экрана обновляются каждый такт, за экраном - раз в 4 такта с догоняющей физикой,
+    дальше 96 плиток от игроков - заморожены.
+
+    Returns:
+        List[UpdateTier]: Уровни детализации по возрастанию расстояния.
+    """
+    return [
+        UpdateTier(32, 1),
+        UpdateTier(96, 4, max_catch_up=4),
+        UpdateTier(inf, 0)
+    ]
+
+
+class UpdateScheduler:
+    """Планировщик обновлений сущностей.
+
+    Распределяет бодрствующие сущности по уровням детализации в зависимости от расстояния до ближайшего игрока.
+    Сущности уровня с интервалом N разложены по N корзинам, за такт обходится только одна корзина,
+    поэтому стоимость такта зависит от количества сущностей рядом с игроками, а не от размера уровня.
+    Расстояния пересчитываются раз в retier_interval тактов.
+
+    Attributes:
+        tiers (List[UpdateTier]): Уровни детализации по возрастанию расстояния.
+        retier_interval (int): Раз во сколько тактов сущности перераспределяются по уровням.
+        next_retier (int): Такт следующего перераспределения.
+        buckets (List[List[dict]]): Корзины сущностей каждого уровня (словари сущностей по ID).
+        placements (dict): Сущность, уровень и корзина по ID сущности.
+        deferred (List[dict]): Сущности каждого уровня, не уложившиеся в бюджет такта.
+    """
+
+    def __init__(self, tiers: List[UpdateTier] = None, retier_interval: int = 15):
+        """Планировщик обновлений сущностей.
+
+        Args:
+            tiers (List[UpdateTier], optional): Уровни детализации по возрастанию расстояния.
+                По умолчанию default_tiers().
+            retier_interval (int, optional): Раз во сколько тактов сущности перераспределяются. По умолчанию 15.
+
+        Raises:
+            ValueError: Нет уровней детализации.
+        """
+        if tiers is None:
+            tiers = default_tiers()
+        if not tiers:
+            raise ValueError('tiers should not be empty')
+
+        self.tiers = tiers
+        self.retier_interval = retier_interval
+        self.next_retier = 0
+        self.buckets = [[{} for _ in range(max(tier.interval, 1))] for tier in tiers]
+        self.placements = {}
+        self.deferred = [{} for _ in tiers]
+
+    def tier_index(self, entity: Entity, players: List[Entity]) -> int:
+        """Получить уровень детализации сущности.
+
+        Args:
+            entity (Entity): Сущность.
+            players (List[Entity]): Сущности игроков.
+
+        Returns:
+            int: Индекс уровня детализации.
+        """
+        if not players:
+            return 0
+
+        distance = min(hypot(entity.position.x - player.position.x, entity.position.y - player.position.y)
+                       for player in players)
+        for index, tier in enumerate(self.tiers):
+            if distance <= tier.max_distance:
+                return index
+        return len(self.tiers) - 1
+
+    def place(self, entity: Entity, tier_index: int):
+        """Положить сущность в корзину уровня.
+
+        Args:
+            entity (Entity): Сущность.
+            tier_index (int): Индекс уровня детализации.
+        """
+        interval = self.tiers[tier_index].interval
+        phase = entity.id % interval if interval else 0
+        self.buckets[tier_index][phase][entity.id] = entity
+        self.placements[entity.id] = (entity, tier_index, phase)
+
+    def add(self, entity: Entity, players: List[Entity], tick: int):
+        """Добавить сущность.
+
+        Вызывается, когда сущность появляется в мире или просыпается.
+
+        Args:
+            entity (Entity): Сущность.
+            players (List[Entity]): Сущности игроков.
+            tick (int): Текущий такт.
+        """
+        self.remove(entity)
+        entity.last_update_tick = tick
+        self.place(entity, self.tier_index(entity, players))
+
+    def remove(self, entity: Entity):
+        """Убрать сущность.
+
+        Вызывается, когда сущность засыпает или удаляется из мира.
+
+        Args:
+            entity (Entity): Сущность.
+        """
+        placement = self.placements.pop(entity.id, None)
+        if placement is None:
+            return
+        _, tier_index, phase = placement
+        del self.buckets[tier_index][phase][entity.id]
+        self.deferred[tier_index].pop(entity.id, None)
+
+    def retier(self, players: List[Entity], tick: int):
+        """Перераспределить сущности по уровням детализации.
+
+        Размороженные сущности не догоняют пропущенные такты.
+
+        Args:
+            players (List[Entity]): Сущности игроков.
+            tick (int): Текущий такт.
+        """
+        for entity, tier_index, phase in list(self.placements.values()):
+            new_tier_index = self.tier_index(entity, players)
+            if new_tier_index == tier_index:
+                continue
+            self.remove(entity)
+            if not self.tiers[tier_index].interval:
+                entity.last_update_tick = tick - 1
+            self.place(entity, new_tier_index)
+        self.next_retier = tick + self.retier_interval
+
+    def schedule(self, players: List[Entity], tick: int) -> List[Tuple[Entity, int]]:
+        """Получить сущности, которые нужно обновить на такте.
+
+        Такт запоминается как такт последнего обновления выбранных сущностей.
+        Игроки не входят в бюджет уровня и обновляются на каждом такте своего уровня.
+
+        Args:
+            players (List[Entity]): Сущности игроков.
+            tick (int): Текущий такт.
+
+        Returns:
+            List[Tuple[Entity, int]]: Сущности и количество тактов физики, которое нужно для них посчитать.
+        """
+        if tick >= self.next_retier:
+            self.retier(players, tick)
+
+        scheduled = []
+        for tier_index, tier in enumerate(self.tiers):
+            if not tier.interval:
+                continue
+
+            due = self.deferred[tier_index]
+            due.update(self.buckets[tier_index][tick % tier.interval])
+            due_entities = list(due.values())
+            self.deferred[tier_index] = {}
+            if tier.budget is not None and len(due) > tier.budget:
+                # Игроки не входят в бюджет: их физика и ввод не откладываются
+                player_ids = {player.id for player in players}
+                budget = tier.budget
+                kept = []
+                for entity in due_entities:
+                    if entity.id in player_ids:
+                        kept.append(entity)
+                    elif budget:
+                        kept.append(entity)
+                        budget -= 1
+                    else:
+                        self.deferred[tier_index][entity.id] = entity
+                due_entities = kept
+
+            for entity in due_entities:
+                steps = max(1, min(tick - entity.last_update_tick, tier.max_catch_up))
+                entity.last_update_tick = tick
+                scheduled.append((entity, steps))
+        return scheduled
@@ -1,13 +1,20 @@
 import msgpack
 import socket
 import time
+from math import floor
 import pygame
+from multiprocessing.synchronize import Event
 
 from jnjserver.additional_data import *
 from jnjserver.terrain import *
 from jnjserver.entity import *
 from jnjserver.world import *
 from jnjserver.player import *
+from jnjserver.level import LevelLoader
+from jnjserver.generator import LevelGenerator, ProceduralTerrain
+from jnjserver.protocol import RESYNC_RETRY_TICKS, STREAM_RADIUS
+
+MAX_DATAGRAMS_PER_TICK = 64
 
 
 class Server:
@@ -25,11 +32,13 @@ class Server:
         john (Player): Джон (игрок).
         josh (Player): Джош (игрок).
         players (List(Player)): Список игроков.
+        stop_event (Optional[Event]): Событие остановки сервера извне.
 
 
     """
 
-    def __init__(self, ip: str, port: int):
+    def __init__(self, ip: str, port: int, seed: Optional[int] = None, level_width: int = 1024,
+                 bots: int = 0):
         """Сервер.
 
         Класс реализующий общение с клиентами.
@@ -38,16 +47,33 @@ class Server:
         Args:
             ip (str): IP сервера.
             port (int): Порт сервера.
+            seed (Optional[int], optional): Зерно генерируемого уровня. По умолчанию None (уровень из файлов).
+            level_width (int, optional): Ширина генерируемого уровня. По умолчанию 1024.
+            bots (int, optional): Количество ботов для нагрузочного тестирования. Боты бегут от первого чекпоинта
+                одного игрока к первому чекпоинту другого. По умолчанию 0.
         """
-        tileset = TileSetLoader.load("jnjserver/tiles.json")
-        entityset = EntitySetLoader.load("jnjserver/entities_types.json")
-        terrain = TerrainLoader.load("jnjserver/terrain.csv")
-        additional_data = AdditionalDataLoader.load("jnjserver/additional_data.json")
+        if seed is None:
+            level = LevelLoader.load_cached()
+            tileset, entityset = level.tileset, level.entityset
+            terrain, additional_data = level.terrain, level.additional_data
+        else:
+            # Уровень из файлов не нужен, поэтому не проверяется и не компилируется
+            tileset, entityset = LevelLoader.load_sets()
+            generator = LevelGenerator(seed, level_width)
+            terrain = ProceduralTerrain(generator)
+            additional_data = generator.additional_data()
         self.world = World(tileset, entityset, terrain, additional_data)
+        for index in range(bots):
+            player_id, rival_id = ("john", "josh") if index % 2 == 0 else ("josh", "john")
+            bot_entity = Entity(self.world.entityset.get("player"), self.world.checkpoints[player_id][0].clone(), 6)
+            bot_entity.checkpoints = self.world.checkpoints[player_id]
+            bot_entity.current_checkpoint = bot_entity.checkpoints[0]
+            self.world.add_entity(bot_entity)
+            self.world.add_bot(bot_entity, self.world.checkpoints[rival_id][0])
         self.running = True
         self.main_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.main_socket.bind((ip, port))
-        self.main_socket.setblocking(True)
+        self.main_socket.setblocking(False)
 
         self.clock = pygame.time.Clock()
 
@@ -57,36 +83,47 @@ class Server:
         self.john = None
         self.josh = None
         self.players = []
+        self.stop_event = None
+
+    def stopped(self) -> bool:
+        """Остановлен ли сервер извне.
+
+        Returns:
+            bool: Установлено ли событие остановки.
+        """
+        return self.stop_event is not None and self.stop_event.is_set()
 
     def connect_players(self):
         """Подключить игроков.
 
         Принимает попытки подключения игроками.
-        Ожидает присоединения двух игроков.
+        Ожидает присоединения двух игроков или остановки сервера.
         """
         player_ids = ['john', 'josh']
 
-        while not (self.josh and self.john):
+        print("Ожидание игроков")
+        while not (self.josh and self.john) and not self.stopped():
             try:
                 message, address = self.main_socket.recvfrom(1024)
+            except BlockingIOError:
+                time.sleep(0.1)
+                continue
+            except OSError:
+                continue
 
-                player_id = player_ids[0]
-                player_entity = Entity(self.world.entityset.get("player"), self.world.checkpoints[player_id][0].clone(),
-                                       6)
-                player_entity.player_id = player_id
-                player_entity.checkpoints = self.world.checkpoints[player_id]
-                player_entity.current_checkpoint = player_entity.checkpoints[0]
-                self.world.add_entity(player_entity)
-                player = Player(player_id, self.main_socket, address, player_entity)
-                if player_id == "john":
-                    self.john = player
-                else:
-                    self.josh = player
-                print(f'Подключился ', address)
-                player_ids = player_ids[1:]
-            except:
-                print("Ожидание игроков")
-            time.sleep(1)
+            player_id = player_ids[0]
+            player_entity = Entity(self.world.entityset.get("player"), self.world.checkpoints[player_id][0].clone(), 6)
+            player_entity.player_id = player_id
+            player_entity.checkpoints = self.world.checkpoints[player_id]
+            player_entity.current_checkpoint = player_entity.checkpoints[0]
+            self.world.add_entity(player_entity)
+            player = Player(player_id, self.main_socket, address, player_entity)
+            if player_id == "john":
+                self.john = player
+            else:
+                self.josh = player
+            print(f'Подключился ', address)
+            player_ids = player_ids[1:]
         self.players = [self.john, self.josh]
 
     def send_startup_data(self):
@@ -141,46 +178,99 @@ class Server:
     def send_update_data(self):
         """Отправить обновления.
 
-        Отправляет обновления клиентам. 
+        Отправляет обновления клиентам.
+        Обновления одинаковы для всех клиентов, поэтому упаковываются один раз.
         """
-        data_base = self.world.extract_updates()
+        data = msgpack.packb(self.world.extract_updates())
 
         for player in self.players:
             try:
-                data = data_base
-                data["player_entity"] = player.entity.dict()
-                player.send_data(msgpack.packb(data))
+                player.send_data(data)
             except:
                 pass
 
     def receive_players_input(self):
         """Получить данные о вводе с клиентов.
 
-        Принимает данные о вводе с клиентов и передаёт игрокам для обработки.
+        Принимает пришедшие с прошлого такта данные о вводе с клиентов и передаёт игрокам для обработки,
+        не ожидая новых. За такт принимается не больше MAX_DATAGRAMS_PER_TICK датаграмм, остальные ждут
+        следующего такта, поэтому частые датаграммы не останавливают такты. На пинг отвечает сразу,
+        возвращая присланное время клиента, на запросы догоняния - см. answer_resync.
+        Некорректные датаграммы и ошибки отправки пропускаются.
         """
-        for _ in range(len(self.players)):
+        for _ in range(MAX_DATAGRAMS_PER_TICK):
             try:
                 player_input = self.main_socket.recv(1024)
+            except BlockingIOError:
+                break
+            except OSError:
+                continue
+
+            try:
                 player_input = msgpack.unpackb(player_input)
-                if player_input["player"] == "john":
-                    self.john.process_input(player_input)
+                player = self.john if player_input["player"] == "john" else self.josh
+                if player_input.get("type") == "ping":
+                    player.send_data(msgpack.packb({"type": "pong", "time": player_input["time"]}))
+                elif player_input.get("type") == "resync":
+                    self.answer_resync(player, player_input)
                 else:
-                    self.josh.process_input(player_input)
-            except:
+                    player.process_input(player_input)
+            except (ValueError, KeyError, TypeError, OSError):
                 pass
 
-    def start(self):
+    def answer_resync(self, player: Player, resync_request: dict):
+        """Ответить на запрос догоняния ландшафта и сущностей.
+
+        Игроку отвечают не чаще раза в RESYNC_RETRY_TICKS тактов (так же часто клиент повторяет запрос).
+        Запрошенные столбцы ограничиваются STREAM_RADIUS столбцами вокруг сущности игрока.
+        Полное состояние сущностей отправляется, только если клиент пропустил их изменения.
+
+        Args:
+            player (Player): Игрок.
+            resync_request (dict): Запрос догоняния (версия ландшафта клиента, отсутствующие столбцы
+                и нужно ли состояние сущностей).
+
+        Raises:
+            ValueError, TypeError: Некорректный запрос.
+        """
+        if player.resync_tick is not None and self.world.tick - player.resync_tick < RESYNC_RETRY_TICKS:
+            return
+
+        version = int(resync_request["terrain_version"])
+        columns = resync_request.get("columns")
+        if columns:
+            player_x = floor(player.entity.position.x)
+            columns = [max(int(columns[0]), player_x - STREAM_RADIUS), min(int(columns[1]), player_x + STREAM_RADIUS)]
+            if columns[0] > columns[1]:
+                columns = None
+        player.resync_tick = self.world.tick
+        for part in self.world.terrain_resync(version, columns):
+            player.send_data(msgpack.packb(part))
+        if resync_request.get("entities"):
+            for part in self.world.entities_resync():
+                player.send_data(msgpack.packb(part))
+
+    def start(self, stop_event: Optional[Event] = None):
         """Запустить.
 
-        Запускает сервер.
+        Запускает сервер. Сервер работает до конца игры или до установки события остановки.
+
+        Args:
+            stop_event (Optional[Event], optional): Событие остановки сервера извне. По умолчанию None.
         """
+        self.stop_event = stop_event
         print(f"Запуск сервера, IP:{self.ip}, PORT:{self.port}")
         self.connect_players()
-        self.send_startup_data()
-        time.sleep(1)
-        while self.running:
+        if not self.stopped():
+            self.send_startup_data()
+            time.sleep(1)
+        while self.running and not self.stopped():
             self.receive_players_input()
+            for player in self.players:
+                player.update()
             self.world.update()
             self.check_game_over()
             self.send_update_data()
             self.clock.tick(30)
+
+        self.world.terrain.close()
@@ -0,0 +1,80 @@
+import multiprocessing
+import time
+from typing import Optional
+
+from jnjserver.server import Server
+
+STARTUP_TIMEOUT = 30.0
+STOP_TIMEOUT = 3.0
+
+context = multiprocessing.get_context("spawn")
+
+
+class ServerProcess(context.Process):
+    """Процесс сервера.
+
+    Запускает сервер в отдельном процессе, чтобы такты сервера и отрисовка клиента на одном компьютере
+    не делили GIL. Процесс создаётся методом spawn: так же, как на Windows, он не наследует pygame и tkinter
+    запускающего процесса.
+
+    Attributes:
+        ip (str): IP сервера.
+        port (int): Порт сервера.
+        ready_event (Event): Устанавливается, когда сервер занял порт.
+        stop_event (Event): Устанавливается для остановки сервера.
+    """
+
+    def __init__(self, ip: str, port: int):
+        """Процесс сервера.
+
+        Args:
+            ip (str): IP сервера.
+            port (int): Порт сервера.
+        """
+        super().__init__(name="jnjserver")
+        self.ip = ip
+        self.port = port
+        self.ready_event = context.Event()
+        self.stop_event = context.Event()
+
+    def run(self):
+        """Создать и запустить сервер (выполняется в дочернем процессе)."""
+        server = Server(self.ip, self.port)
+        self.ready_event.set()
+        server.start(self.stop_event)
+
+    def wait_ready(self, timeout: float = STARTUP_TIMEOUT):
+        """Дождаться, пока сервер займёт порт.
+
+        Args:
+            timeout (float, optional): Наибольшее время ожидания, с. По умолчанию STARTUP_TIMEOUT.
+
+        Raises:
+            RuntimeError: Процесс завершился, не заняв порт (например, порт занят), или время ожидания вышло.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.ready_event.wait(0.1):
+            if not self.is_alive():
+                raise RuntimeError(f"server process exited with code {self.exitcode} before binding port {self.port}")
+            if time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError(f"server did not bind port {self.port} in {timeout} s")
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> Optional[int]:
+        """Остановить сервер.
+
+        Сервер завершает такт и закрывает ресурсы сам, процесс завершается принудительно,
+        только если не успел за timeout секунд.
+
+        Args:
+            timeout (float, optional): Время на завершение, с. По умолчанию STOP_TIMEOUT.
+
+        Returns:
+            Optional[int]: Код завершения процесса.
+        """
+        self.stop_event.set()
+        self.join(timeout)
+        if self.is_alive():
+            self.terminate()
+            self.join()
+        return self.exitcode
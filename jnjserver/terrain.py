@@ -1,5 +1,10 @@
 import json
-from typing import List
+from bisect import bisect_right
+from math import ceil
+from typing import List, Callable, Optional, Tuple
+
+CHUNK_SIZE = 32
+STREAM_CHUNKS_PER_UPDATE = 4
 
 
 class Tile:
@@ -17,8 +22,28 @@ class Tile:
 class TileSetLoader:
     @staticmethod
     def load(json_path: str):
-        json_data = open(json_path)
-        data = json.load(json_data)
+        """Загрузить сет плиток из JSON файла.
+
+        Args:
+            json_path (str): Путь к JSON файлу.
+
+        Returns:
+            TileSet: Сет плиток.
+        """
+        with open(json_path) as json_data:
+            data = json.load(json_data)
+        return TileSetLoader.parse(data)
+
+    @staticmethod
+    def parse(data: List[dict]):
+        """Создать сет плиток из разобранного JSON.
+
+        Args:
+            data (List[dict]): Список словарей плиток.
+
+        Returns:
+            TileSet: Сет плиток.
+        """
         tiles = {}
         for tile_data in data:
             name = tile_data["name"]
@@ -49,6 +74,120 @@ class TileSet:
         return self.tiles[tile]
 
 
+class TerrainLog:
+    """Журнал изменений ландшафта с версиями.
+
+    Изменения одной плитки за такт схлопываются в одно. Каждый такт с изменениями получает новую версию.
+    Журнал хранит не больше max_entries последних изменений и отвечает, какие плитки изменились
+    после версии V. Для слишком старых версий журнал знает только изменённые с тех пор чанки.
+
+    Attributes:
+        version (int): Текущая версия ландшафта.
+        base_version (int): Наименьшая версия, изменения после которой есть в журнале.
+        max_entries (int): Сколько последних изменений хранить.
+        pending (dict): Изменения текущего такта (названия плиток по координатам).
+        versions (List[int]): Версии изменений журнала (по возрастанию).
+        entries (List[dict]): Изменения журнала.
+        start (int): Индекс первого действительного изменения в списках журнала.
+        chunk_versions (dict): Версия последнего изменения по координатам чанка.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """Журнал изменений ландшафта с версиями.
+
+        Args:
+            max_entries (int, optional): Сколько последних изменений хранить. По умолчанию 4096.
+
+        Raises:
+            ValueError: Размер журнала - положительное целое число.
+        """
+        if type(max_entries) != int or max_entries < 1:
+            raise ValueError('max_entries should be a positive int')
+
+        self.version = 0
+        self.base_version = 0
+        self.max_entries = max_entries
+        self.pending = {}
+        self.versions = []
+        self.entries = []
+        self.start = 0
+        self.chunk_versions = {}
+
+    def record(self, x: int, y: int, tile: str):
+        """Записать изменение плитки в текущем такте.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            tile (str): Новое название плитки.
+        """
+        self.pending[(x, y)] = tile
+
+    def commit(self) -> List[dict]:
+        """Завершить такт.
+
+        Returns:
+            List[dict]: Изменения такта (по одному на плитку).
+        """
+        if not self.pending:
+            return []
+
+        self.version += 1
+        updates = []
+        for (x, y), tile in self.pending.items():
+            terrain_update = {
+                "x": x,
+                "y": y,
+                "tile": tile
+            }
+            updates.append(terrain_update)
+            self.versions.append(self.version)
+            self.entries.append(terrain_update)
+            self.chunk_versions[(x // CHUNK_SIZE, y // CHUNK_SIZE)] = self.version
+        self.pending = {}
+
+        # Старые версии выбрасываются целиком, чтобы версия либо была в журнале полностью, либо не была вовсе
+        while len(self.entries) - self.start > self.max_entries:
+            dropped_version = self.versions[self.start]
+            while self.start < len(self.versions) and self.versions[self.start] == dropped_version:
+                self.start += 1
+            self.base_version = dropped_version
+        if self.start > self.max_entries:
+            del self.versions[:self.start]
+            del self.entries[:self.start]
+            self.start = 0
+        return updates
+
+    def diff_since(self, version: int) -> Optional[List[dict]]:
+        """Получить изменения после версии.
+
+        Args:
+            version (int): Версия.
+
+        Returns:
+            Optional[List[dict]]: Последние изменения каждой изменённой плитки или None,
+                если журнал уже не хранит изменения после этой версии.
+        """
+        if version < self.base_version or version > self.version:
+            return None
+
+        cells = {}
+        for terrain_update in self.entries[bisect_right(self.versions, version, self.start):]:
+            cells[(terrain_update["x"], terrain_update["y"])] = terrain_update
+        return list(cells.values())
+
+    def chunks_since(self, version: int) -> List[Tuple[int, int]]:
+        """Получить чанки, изменённые после версии.
+
+        Args:
+            version (int): Версия.
+
+        Returns:
+            List[Tuple[int, int]]: Координаты чанков.
+        """
+        return [chunk for chunk, chunk_version in self.chunk_versions.items() if chunk_version > version]
+
+
 class Terrain:
     def __init__(self, grid: List[List[str]]):
         """Ландшафт.
@@ -59,7 +198,29 @@ class Terrain:
         self.grid = grid
         self.width = len(grid)
         self.height = len(grid[0])
-        self.updates = []
+        self.log = TerrainLog()
+        self.listeners = []
+
+    def add_listener(self, listener: Callable[[int, int, str], None]):
+        """Добавить слушателя изменений ландшафта.
+
+        Слушатель вызывается при каждом изменении плитки с координатами и новым названием плитки.
+
+        Args:
+            listener (Callable[[int, int, str], None]): Слушатель.
+        """
+        self.listeners.append(listener)
+
+    def notify_listeners(self, x: int, y: int, tile: str):
+        """Оповестить слушателей об изменении плитки.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            tile (str): Новое название плитки.
+        """
+        for listener in self.listeners:
+            listener(x, y, tile)
 
     def get_tile(self, x: int, y: int) -> str:
         """Получить название плитки на координатах.
@@ -87,6 +248,42 @@ class Terrain:
 
         return self.grid[x][y]
 
+    def columns(self, chunk_x: int) -> List[List[str]]:
+        """Получить столбцы полосы шириной CHUNK_SIZE плиток.
+
+        Столбцы только читаются: это строки двумерного массива ландшафта, а не их копии.
+
+        Args:
+            chunk_x (int): Координата x полосы.
+
+        Returns:
+            List[List[str]]: Столбцы полосы.
+        """
+        return self.grid[chunk_x * CHUNK_SIZE:(chunk_x + 1) * CHUNK_SIZE]
+
+    def store_tile(self, x: int, y: int, tile: str):
+        """Записать название плитки на координатах.
+
+        Не проверяет аргументы и не создаёт обновлений ландшафта.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            tile (str): Название плитки.
+        """
+        self.grid[x][y] = tile
+
+    def prefetch(self, x: float, y: float, radius: int):
+        """Загрузить плитки вокруг точки.
+
+        Весь ландшафт уже в памяти, поэтому ничего не делает.
+
+        Args:
+            x (float): Координата x.
+            y (float): Координата y.
+            radius (int): Радиус в плитках.
+        """
+
     def set_tile(self, x: int, y: int, tile: str):
         """Задать название плитки на координатах.
 
@@ -113,13 +310,9 @@ class Terrain:
         if x > self.width or y > self.height:
             raise ValueError(f'There is no tile with x: {x}, y: {y}')
 
-        self.grid[x][y] = tile
-        terrain_update = {
-            "x": x,
-            "y": y,
-            "tile": tile
-        }
-        self.updates.append(terrain_update)
+        self.store_tile(x, y, tile)
+        self.log.record(x, y, tile)
+        self.notify_listeners(x, y, tile)
 
     def remove_tile(self, x: int, y: int):
         """Назначить пустую плитку на координатах.
@@ -142,23 +335,93 @@ class Terrain:
         if x > self.width or y > self.height:
             raise ValueError(f'There is no tile with x: {x}, y: {y}')
 
-        self.grid[x][y] = ""
-        terrain_update = {
-            "x": x,
-            "y": y,
-            "tile": ""
-        }
-        self.updates.append(terrain_update)
+        self.store_tile(x, y, "")
+        self.log.record(x, y, "")
+        self.notify_listeners(x, y, "")
 
     def extract_updates(self) -> List[dict]:
         """Извлечь обновления ландшафта.
 
+        Повторные изменения одной плитки схлопываются, ландшафт переходит на следующую версию.
+
         Returns:
             List[dict]: Список обновлений ландшафта.
         """
-        updates_to_extract = self.updates
-        self.updates = []
-        return updates_to_extract
+        return self.log.commit()
+
+    def chunk_data(self, chunk_x: int, chunk_y: int) -> dict:
+        """Получить данные о чанке ландшафта.
+
+        Args:
+            chunk_x (int): Координата x чанка.
+            chunk_y (int): Координата y чанка.
+
+        Returns:
+            dict: Координаты левой верхней плитки чанка и столбцы названий плиток.
+        """
+        x_min = chunk_x * CHUNK_SIZE
+        y_min = chunk_y * CHUNK_SIZE
+        return {
+            "x": x_min,
+            "y": y_min,
+            "columns": [column[y_min:y_min + CHUNK_SIZE] for column in self.grid[x_min:x_min + CHUNK_SIZE]]
+        }
+
+    def columns_data(self, x_min: int, x_max: int) -> List[dict]:
+        """Получить данные о всех чанках, покрывающих столбцы.
+
+        Args:
+            x_min (int): Координата x первого столбца.
+            x_max (int): Координата x последнего столбца.
+
+        Returns:
+            List[dict]: Данные чанков.
+        """
+        x_min = max(0, x_min)
+        x_max = min(x_max, self.width - 1)
+        return [self.chunk_data(chunk_x, chunk_y) for chunk_x in range(x_min // CHUNK_SIZE, x_max // CHUNK_SIZE + 1)
+                for chunk_y in range(ceil(self.height / CHUNK_SIZE))]
+
+    def extract_chunks(self) -> List[dict]:
+        """Извлечь чанки, которые нужно отправить клиентам.
+
+        Весь ландшафт отправляется в начальных данных, поэтому чанков для отправки нет.
+
+        Returns:
+            List[dict]: Данные чанков.
+        """
+        return []
+
+    def close(self):
+        """Освободить ресурсы ландшафта.
+
+        Ландшафт в памяти ничего не держит, поэтому ничего не делает.
+        """
+
+    def resync_data(self, version: int) -> dict:
+        """Получить данные для догоняния ландшафта с версии.
+
+        Если журнал хранит изменения после версии, возвращаются только они, иначе - изменённые чанки целиком.
+        Клиенту с версией новее сервера (например, после перезапуска сервера) изменённых чанков нет:
+        ему присылаются только запрошенные столбцы (см. World.terrain_resync), а не весь ландшафт.
+
+        Args:
+            version (int): Версия ландшафта клиента.
+
+        Returns:
+            dict: Текущая версия, изменения плиток и данные чанков.
+        """
+        updates = self.log.diff_since(version)
+        if updates is not None:
+            chunks = []
+        else:
+            updates = []
+            chunks = self.log.chunks_since(version)
+        return {
+            "version": self.log.version,
+            "updates": updates,
+            "chunks": [self.chunk_data(chunk_x, chunk_y) for chunk_x, chunk_y in chunks]
+        }
 
     def startup_data(self) -> dict:
         """Получить данные о всём ландшафте.
@@ -184,24 +447,9 @@ class TerrainLoader:
         Returns:
             Terrain: Ландшафт.
         """
-        grid_temp = []
-
-        for row in open(csv_path):
-            grid_temp.append(row[:-1].split(';'))
-
-        grid = []
-
-        for y in range(len(grid_temp)):
-            for x in range(len(grid_temp[y])):
-                # Поменять столбцы и строки
-                if y == 0:
-                    if grid_temp[y][x] != 'air':
-                        grid.append([grid_temp[y][x]])
-                    else:
-                        grid.append([''])
-                else:
-                    if grid_temp[y][x] != 'air':
-                        grid[x].append(grid_temp[y][x])
-                    else:
-                        grid[x].append('')
+        with open(csv_path) as csv_file:
+            rows = [row[:-1].split(';') for row in csv_file]
+
+        # Поменять столбцы и строки
+        grid = [['' if tile == 'air' else tile for tile in column] for column in zip(*rows)]
         return Terrain(grid)
@@ -0,0 +1,115 @@
+import heapq
+from typing import Callable
+
+
+class Timer:
+    """Таймер.
+
+    Отложенный вызов функции на определённом такте мира.
+
+    Attributes:
+        expiry_tick (int): Такт срабатывания.
+        callback (Callable): Вызываемая функция.
+        args (tuple): Аргументы функции.
+        cancelled (bool): Отменён ли таймер.
+    """
+
+    def __init__(self, expiry_tick: int, callback: Callable, args: tuple):
+        """Таймер.
+
+        Args:
+            expiry_tick (int): Такт срабатывания.
+            callback (Callable): Вызываемая функция.
+            args (tuple): Аргументы функции.
+        """
+        self.expiry_tick = expiry_tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class TimerService:
+    """Служба таймеров.
+
+    Хранит таймеры в куче по абсолютному такту срабатывания.
+    За такт обрабатываются только сработавшие таймеры, а не все запущенные.
+
+    Attributes:
+        tick (int): Текущий такт.
+        heap (List[Tuple[int, int, Timer]]): Куча таймеров (такт срабатывания, порядковый номер, таймер).
+        counter (int): Счётчик, сохраняющий порядок запуска таймеров с одинаковым тактом срабатывания.
+    """
+
+    def __init__(self):
+        """Служба таймеров."""
+        self.tick = 0
+        self.heap = []
+        self.counter = 0
+
+    def schedule(self, expiry_tick: int, callback: Callable, *args) -> Timer:
+        """Запустить таймер до такта.
+
+        Args:
+            expiry_tick (int): Такт срабатывания.
+            callback (Callable): Вызываемая функция.
+            *args: Аргументы функции.
+
+        Raises:
+            ValueError: Такт срабатывания - целое число.
+
+        Returns:
+            Timer: Таймер.
+        """
+        if type(expiry_tick) != int:
+            raise ValueError('expiry_tick should be a int')
+
+        timer = Timer(expiry_tick, callback, args)
+        heapq.heappush(self.heap, (expiry_tick, self.counter, timer))
+        self.counter += 1
+        return timer
+
+    def schedule_in(self, delay: int, callback: Callable, *args) -> Timer:
+        """Запустить таймер на количество тактов.
+
+        Args:
+            delay (int): Через сколько тактов сработает таймер.
+            callback (Callable): Вызываемая функция.
+            *args: Аргументы функции.
+
+        Returns:
+            Timer: Таймер.
+        """
+        return self.schedule(self.tick + delay, callback, *args)
+
+    @staticmethod
+    def cancel(timer: Timer):
+        """Отменить таймер.
+
+        Отменённый таймер остаётся в куче и отбрасывается при наступлении его такта.
+
+        Args:
+            timer (Timer): Таймер.
+        """
+        timer.cancelled = True
+
+    def update(self, tick: int):
+        """Обновить таймеры.
+
+        Переходит на предоставленный такт и вызывает все таймеры, такт срабатывания которых наступил.
+
+        Args:
+            tick (int): Текущий такт.
+        """
+        self.tick = tick
+        while self.heap and self.heap[0][0] <= tick:
+            timer = heapq.heappop(self.heap)[2]
+            if not timer.cancelled:
+                timer.callback(*timer.args)
+
+    def __len__(self) -> int:
+        """Количество таймеров в куче.
+
+        Returns:
+            int: Количество таймеров.
+        """
+        return len(self.heap)
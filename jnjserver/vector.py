@@ -11,6 +11,8 @@ class Vector:
         y (Union[int, float]): Координата y
     """
 
+    __slots__ = ("x", "y")
+
     def __init__(self, x: Union[int, float], y: Union[int, float]):
         """Новый вектор из двух координат.
 
@@ -1,6 +1,19 @@
+from math import floor
+from typing import List, Tuple, Optional
 from jnjserver.entity import EntitySet, Entity
+from jnjserver.entity_pool import EntityTable, EntityPool
+from jnjserver.vector import Vector
 from jnjserver.additional_data import AdditionalData
 from jnjserver.terrain import TileSet, Terrain
+from jnjserver.timers import TimerService
+from jnjserver.scheduler import UpdateScheduler
+from jnjserver.collision import CollisionRects
+from jnjserver.navigation import NavigationGraph, PathFinder, Bot
+
+PREFETCH_RADIUS = 48
+RESYNC_UPDATES_PER_PART = 1024
+RESYNC_CHUNKS_PER_PART = 4
+RESYNC_ENTITIES_PER_PART = 64
 
 
 class World:
@@ -13,16 +26,29 @@ class World:
         tileset (TileSet): Сет плиток.
         entityset (EntitySet): Сет типов сущностей.
         terrain (Terrain): Ландшафт.
-        entities (List[Entity]): Список сущностей.
-        current_entity_id (int): ID, присваивающийся добавленной сущности (после добавления обновляется).
+        entities (EntityTable): Таблица сущностей по ID.
+        pool (EntityPool): Пул сущностей для повторного использования.
+        removed_entities (List[int]): ID сущностей, удалённых с предыдущего получения обновлений.
         john_entity (Entity): Сущность Джона.
         josh_entity (Entity): Сущность Джоша.
         princess (Vector): Координаты принцессы.
         checkpoints (dict): Словарь чекпоинтов.
+        active_entities (dict): Словарь бодрствующих (обновляемых) сущностей по ID.
+        sleeping_cells (dict): Словарь спящих сущностей по координатам клеток вокруг них.
+        spawned_entities (List[Entity]): Сущности, добавленные с предыдущего получения обновлений.
+        dirty_entities (List[Entity]): Сущности, изменившиеся с предыдущего получения обновлений.
+        tick (int): Текущий такт мира.
+        timers (TimerService): Служба таймеров (усиления и другие эффекты, ограниченные по времени).
+        scheduler (UpdateScheduler): Планировщик обновлений сущностей по удалённости от игроков.
+        collision (CollisionRects): Прямоугольники столкновений ландшафта (None - физика проверяет отдельные плитки).
+        navigation (NavigationGraph): Граф навигации по ландшафту.
+        pathfinder (PathFinder): Поиск путей для ботов.
+        bots (List[Bot]): Боты, управляющие сущностями мира.
 
     """
 
-    def __init__(self, tileset: TileSet, entityset: EntitySet, terrain: Terrain, additional_data: AdditionalData):
+    def __init__(self, tileset: TileSet, entityset: EntitySet, terrain: Terrain, additional_data: AdditionalData,
+                 scheduler: UpdateScheduler = None, collision_rects: bool = True):
         """Мир (интерфейс взаимодействия сервера с игровой логикой).
 
         Args:
@@ -30,14 +56,33 @@ class World:
             entityset (EntitySet): Сет типов сущностей.
             terrain (Terrain): Ландшафт.
             additional_data (AdditionalData): Дополнительные данные.
+            scheduler (UpdateScheduler, optional): Планировщик обновлений сущностей.
+                По умолчанию планировщик с уровнями детализации default_tiers().
+            collision_rects (bool, optional): Сталкивать ли сущности с объединёнными прямоугольниками
+                плиток вместо отдельных плиток. По умолчанию True.
         """
         self.tileset = tileset
         self.entityset = entityset
         self.terrain = terrain
-        self.entities = []
-        self.current_entity_id = 0
+        self.entities = EntityTable()
+        self.pool = EntityPool()
+        self.removed_entities = []
         self.john_entity = None
         self.josh_entity = None
+        self.active_entities = {}
+        self.sleeping_cells = {}
+        self.spawned_entities = []
+        self.dirty_entities = []
+        self.tick = 0
+        self.timers = TimerService()
+        self.scheduler = scheduler if scheduler is not None else UpdateScheduler()
+        self.collision = CollisionRects(terrain, tileset) if collision_rects else None
+        player_type = entityset.entities_types.get("player")
+        self.navigation = NavigationGraph(terrain, tileset) if player_type is None else \
+            NavigationGraph(terrain, tileset, player_type.size)
+        self.pathfinder = PathFinder(self.navigation)
+        self.bots = []
+        self.terrain.add_listener(self.on_tile_changed)
 
         self.princess = additional_data.princess
         self.checkpoints = additional_data.checkpoints
@@ -52,30 +97,248 @@ class World:
         Args:
             entity (Entity): Сущность.
         """
-        entity.id = self.current_entity_id
+        entity.id = self.entities.add(entity)
+        entity.key = str(entity.id)
         entity.world = self
+        self.spawned_entities.append(entity)
 
         if entity.player_id == "john":
             self.john_entity = entity
         elif entity.player_id == "josh":
             self.josh_entity = entity
 
-        self.current_entity_id += 1
-        self.entities.append(entity)
+        self.active_entities[entity.id] = entity
+        self.scheduler.add(entity, self.players(), self.tick)
+
+    def add_bot(self, entity: Entity, goal: Vector) -> Bot:
+        """Добавить бота.
+
+        Args:
+            entity (Entity): Сущность мира, которой управляет бот.
+            goal (Vector): Цель бота.
+
+        Returns:
+            Bot: Бот.
+        """
+        bot = Bot(entity, self.pathfinder, goal)
+        self.bots.append(bot)
+        return bot
+
+    def update_bots(self):
+        """Обновить ботов.
+
+        Продолжает поиски путей и применяет ввод ботов. Боты удалённых сущностей убираются.
+        """
+        self.bots = [bot for bot in self.bots if self.entities.get(bot.entity.id) is bot.entity]
+        self.pathfinder.update()
+        for bot in self.bots:
+            bot.update()
+
+    def is_solid(self, x: int, y: int) -> bool:
+        """Твёрдая ли плитка на координатах.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+
+        Returns:
+            bool: Твёрдая ли плитка.
+        """
+        return self.tileset.get(self.terrain.get_tile(x, y)).solid
+
+    def players(self) -> List[Entity]:
+        """Получить сущности игроков.
+
+        Returns:
+            List[Entity]: Список сущностей игроков, добавленных в мир.
+        """
+        return [entity for entity in (self.john_entity, self.josh_entity) if entity is not None]
+
+    def spawn_entity(self, entity_type: str, position: Vector, health: int) -> Entity:
+        """Создать сущность.
+
+        Берёт сущность из пула и добавляет её в мир.
+
+        Args:
+            entity_type (str): Название типа сущности.
+            position (Vector): Позиция.
+            health (int): Здоровье.
+
+        Returns:
+            Entity: Сущность.
+        """
+        entity = self.pool.acquire(self.entityset.get(entity_type), position, health)
+        self.add_entity(entity)
+        return entity
+
+    def get_entity(self, entity_id: int) -> Optional[Entity]:
+        """Получить сущность по ID.
+
+        Args:
+            entity_id (int): ID сущности.
+
+        Returns:
+            Optional[Entity]: Сущность или None, если сущности с таким ID нет.
+        """
+        return self.entities.get(entity_id)
+
+    def remove_entity(self, entity_id: int):
+        """Удалить сущность.
+
+        Убирает сущность из мира и возвращает её в пул.
+
+        Args:
+            entity_id (int): ID сущности.
+
+        Raises:
+            ValueError: Нет сущности с таким ID.
+        """
+        entity = self.entities.remove(entity_id)
+        if entity.is_sleeping:
+            self.unregister_sleeping(entity)
+        else:
+            del self.active_entities[entity_id]
+            self.scheduler.remove(entity)
+
+        if entity is self.john_entity:
+            self.john_entity = None
+        elif entity is self.josh_entity:
+            self.josh_entity = None
+
+        self.removed_entities.append(entity_id)
+        self.pool.release(entity)
+
+    @staticmethod
+    def entity_cells(entity: Entity, margin: int) -> List[Tuple[int, int]]:
+        """Получить клетки, занимаемые сущностью.
+
+        Args:
+            entity (Entity): Сущность.
+            margin (int): Сколько клеток добавить вокруг сущности с каждой стороны.
+
+        Returns:
+            List[Tuple[int, int]]: Список координат клеток.
+        """
+        x_min = floor(entity.position.x) - margin
+        x_max = floor(entity.position.x + entity.type.size.x) + margin
+        y_min = floor(entity.position.y) - margin
+        y_max = floor(entity.position.y + entity.type.size.y) + margin
+        return [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+
+    def sleep_entity(self, entity: Entity):
+        """Усыпить сущность.
+
+        Убирает сущность из обновляемых и запоминает её в клетках вокруг неё,
+        чтобы разбудить при изменении ландшафта рядом или касании.
+        Спящая сущность не присылает изменений, клиент, пропустивший последние из них,
+        получит её состояние при догонянии сущностей (см. entities_resync).
+
+        Args:
+            entity (Entity): Сущность.
+        """
+        entity.is_sleeping = True
+        del self.active_entities[entity.id]
+        self.scheduler.remove(entity)
+        for cell in self.entity_cells(entity, 1):
+            self.sleeping_cells.setdefault(cell, []).append(entity)
+
+    def wake_entity(self, entity: Entity):
+        """Разбудить сущность.
+
+        Возвращает спящую сущность в обновляемые.
+
+        Args:
+            entity (Entity): Сущность.
+        """
+        if not entity.is_sleeping:
+            return
+        self.unregister_sleeping(entity)
+        self.active_entities[entity.id] = entity
+        self.scheduler.add(entity, self.players(), self.tick)
+
+    def unregister_sleeping(self, entity: Entity):
+        """Убрать спящую сущность из клеток вокруг неё.
+
+        Args:
+            entity (Entity): Сущность.
+        """
+        entity.is_sleeping = False
+        for cell in self.entity_cells(entity, 1):
+            sleeping = self.sleeping_cells[cell]
+            sleeping.remove(entity)
+            if not sleeping:
+                del self.sleeping_cells[cell]
+
+    def wake_touching(self, entity: Entity):
+        """Разбудить сущности, которых касается предоставленная сущность.
+
+        Args:
+            entity (Entity): Сущность.
+        """
+        for cell in self.entity_cells(entity, 0):
+            for sleeping in self.sleeping_cells.get(cell, [])[:]:
+                if sleeping.check_collision(entity.position, entity.type.size):
+                    self.wake_entity(sleeping)
+
+    def on_tile_changed(self, x: int, y: int, tile: str):
+        """Обработать изменение плитки.
+
+        Будит сущности, спящие на изменённой плитке или рядом с ней.
+
+        Args:
+            x (int): Координата x.
+            y (int): Координата y.
+            tile (str): Новое название плитки.
+        """
+        for entity in self.sleeping_cells.get((x, y), [])[:]:
+            self.wake_entity(entity)
 
     def update_entities(self):
         """Обновить сущности.
 
-        Обновляет состояние всех сущностей этого мира. 
+        Обновляет состояние бодрствующих сущностей этого мира, которые планировщик выбрал на этот такт.
+        Сущности, обновляемые реже раза в такт, догоняют пропущенные такты физики.
+        """
+        for entity, steps in self.scheduler.schedule(self.players(), self.tick):
+            if self.active_entities.get(entity.id) is entity:
+                self.update_entity(entity, steps)
+
+    def update_entity(self, entity: Entity, steps: int):
+        """Обновить сущность.
+
+        Считает предоставленное количество тактов физики сущности.
+        Неподвижная сущность без команд движения засыпает и не обновляется, пока её не разбудят.
+
+        Args:
+            entity (Entity): Сущность.
+            steps (int): Количество тактов физики.
         """
-        for entity in self.entities:
+        for _ in range(steps):
             entity.update()
+            if entity.can_sleep():
+                break
+
+        if entity.can_sleep():
+            self.sleep_entity(entity)
+        else:
+            self.wake_touching(entity)
+        entity.has_input = False
+
+    def prefetch_terrain(self):
+        """Подгрузить ландшафт вокруг игроков."""
+        for player in self.players():
+            self.terrain.prefetch(player.position.x, player.position.y, PREFETCH_RADIUS)
 
     def update(self):
         """Обновить всё.
         
-        Обновляет состояние мира.
+        Переходит на следующий такт, подгружает ландшафт вокруг игроков, вызывает сработавшие таймеры,
+        применяет ввод ботов и обновляет состояние мира.
         """
+        self.tick += 1
+        self.prefetch_terrain()
+        self.timers.update(self.tick)
+        self.update_bots()
         self.update_entities()
 
     def startup_data(self) -> dict:
@@ -86,25 +349,62 @@ class World:
         Returns:
             dict: Словарь с начальными данные.
         """
+        self.prefetch_terrain()
         startup_data = {
             "type": "startup",
+            "tick": self.tick,
             "terrain": self.terrain.startup_data(),
-            "entities": self.extract_entities_updates()
+            "terrain_version": self.terrain.log.version,
+            "entities": self.entities_dicts(self.entities)
         }
         startup_data.update(self.additional_startup_data())
         return startup_data
 
+    @staticmethod
+    def entities_dicts(entities: List[Entity]) -> dict:
+        """Создать словарь сущностей.
+
+        Args:
+            entities (List[Entity]): Список сущностей.
+
+        Returns:
+            dict: Словарь словарей сущностей по ID.
+        """
+        entities_dicts = {}
+        for entity in entities:
+            entities_dicts[entity.key] = entity.dict()
+        return entities_dicts
+
+    def extract_spawned_entities(self) -> dict:
+        """Извлечь появившиеся сущности.
+
+        Возвращает полные записи о сущностях, добавленных с предыдущего получения обновлений.
+        Неизменяемые свойства сущности (тип, чекпоинты) передаются только в этой записи.
+
+        Returns:
+            dict: Словарь записей о появлении сущностей по ID.
+        """
+        spawned_entities = {}
+        for entity in self.spawned_entities:
+            if self.entities.get(entity.id) is entity:
+                spawned_entities[entity.key] = entity.spawn_dict()
+        self.spawned_entities = []
+        return spawned_entities
+
     def extract_entities_updates(self) -> dict:
         """Извлечь обновления сущностей
 
-        Возвращает обновлённые данные о сущностях мира в виде словаря.
+        Возвращает изменённые с предыдущего получения обновлений поля сущностей в виде словаря.
+        Неизменившиеся сущности и поля не передаются.
 
         Returns:
             dict: Словарь обновлейний сущностей.
         """
         entities_updates = {}
-        for entity in self.entities:
-            entities_updates[str(entity.id)] = entity.dict()
+        for entity in self.dirty_entities:
+            if entity.dirty and self.entities.get(entity.id) is entity:
+                entities_updates[entity.key] = entity.extract_changes()
+        self.dirty_entities = []
         return entities_updates
 
     def additional_startup_data(self) -> dict:
@@ -131,13 +431,78 @@ class World:
         Returns:
             dict: Обновления.
         """
+        terrain_base_version = self.terrain.log.version
         terrain_updates = self.terrain.extract_updates()
+        spawned_entities = self.extract_spawned_entities()
         entities_updates = self.extract_entities_updates()
+        removed_entities = self.removed_entities
+        self.removed_entities = []
 
         return {
             "type": "update",
+            "tick": self.tick,
             "actions": {
                 "terrain": terrain_updates
             },
-            "entities": entities_updates
+            "terrain_base_version": terrain_base_version,
+            "terrain_version": self.terrain.log.version,
+            "chunks": self.terrain.extract_chunks(),
+            "spawned_entities": spawned_entities,
+            "entities": entities_updates,
+            "removed_entities": removed_entities
         }
+
+    def terrain_resync(self, version: int, columns: Optional[List[int]] = None) -> List[dict]:
+        """Получить сообщения для догоняния ландшафта.
+
+        Данные догоняния делятся на части, чтобы каждая поместилась в одну UDP датаграмму.
+
+        Args:
+            version (int): Версия ландшафта клиента.
+            columns (Optional[List[int]], optional): Первый и последний столбцы, которых нет у клиента.
+
+        Returns:
+            List[dict]: Части данных догоняния.
+        """
+        resync_data = self.terrain.resync_data(version)
+        updates = resync_data["updates"]
+        chunks = resync_data["chunks"]
+        if columns:
+            chunks = chunks + self.terrain.columns_data(columns[0], columns[1])
+        parts = []
+        for start in range(0, len(updates), RESYNC_UPDATES_PER_PART):
+            parts.append((updates[start:start + RESYNC_UPDATES_PER_PART], []))
+        for start in range(0, len(chunks), RESYNC_CHUNKS_PER_PART):
+            parts.append(([], chunks[start:start + RESYNC_CHUNKS_PER_PART]))
+        if not parts:
+            parts.append(([], []))
+
+        return [{
+            "type": "terrain_resync",
+            "version": resync_data["version"],
+            "part": index,
+            "parts": len(parts),
+            "updates": part_updates,
+            "chunks": part_chunks
+        } for index, (part_updates, part_chunks) in enumerate(parts)]
+
+    def entities_resync(self) -> List[dict]:
+        """Получить сообщения для догоняния сущностей.
+
+        Изменения сущностей присылаются один раз без подтверждений, поэтому клиент, пропустивший обновление,
+        запрашивает полное состояние всех сущностей на текущий такт. Сущности, которых нет ни в одной части,
+        клиент удаляет. Данные делятся на части, чтобы каждая поместилась в одну UDP датаграмму.
+
+        Returns:
+            List[dict]: Части данных догоняния.
+        """
+        entities = list(self.entities)
+        parts = [entities[start:start + RESYNC_ENTITIES_PER_PART]
+                 for start in range(0, len(entities), RESYNC_ENTITIES_PER_PART)] or [[]]
+        return [{
+            "type": "entities_resync",
+            "tick": self.tick,
+            "part": index,
+            "parts": len(parts),
+            "entities": self.entities_dicts(part_entities)
+        } for index, part_entities in enumerate(parts)]
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+import pygame
+
+from jnjclient.atlas import CELL, VERSION, build_atlas, load_atlas, read_index
+
+
+class TestAtlas(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.textures_path = os.path.join(self.directory.name, "textures")
+        os.makedirs(os.path.join(self.textures_path, "tiles"))
+        self.save_texture("tiles/dirt.png", (16, 16))
+        self.save_texture("player.png", (12, 24))
+        self.atlas_path = os.path.join(self.directory.name, "cache", "atlas.png")
+        self.index_path = os.path.join(self.directory.name, "cache", "atlas.json")
+
+    def save_texture(self, name: str, size: tuple):
+        pygame.image.save(pygame.Surface(size), os.path.join(self.textures_path, name))
+
+    def load(self) -> dict:
+        _, rects = load_atlas(self.textures_path, self.atlas_path, self.index_path)
+        return rects
+
+    def test_build(self):
+        index = build_atlas(self.textures_path, self.atlas_path, self.index_path)
+        self.assertEqual(read_index(self.index_path), index)
+        self.assertEqual(index["version"], VERSION)
+        self.assertEqual(sorted(index["textures"]), ["player", "tiles/dirt"])
+        for x, y, _, _ in index["textures"].values():
+            self.assertEqual((x % CELL, y % CELL), (0, 0))
+
+    def test_read_index(self):
+        self.assertIsNone(read_index(self.index_path))
+        os.makedirs(os.path.dirname(self.index_path))
+        with open(self.index_path, "w") as file:
+            file.write('{"version": 0}')
+        self.assertIsNone(read_index(self.index_path))
+
+    def test_stale(self):
+        self.assertEqual(sorted(self.load()), ["player", "tiles/dirt"])
+        built = os.stat(self.atlas_path).st_mtime_ns
+        self.load()
+        self.assertEqual(os.stat(self.atlas_path).st_mtime_ns, built)
+
+        self.save_texture("tiles/crate.png", (16, 16))
+        self.assertEqual(sorted(self.load()), ["player", "tiles/crate", "tiles/dirt"])
+        self.assertEqual(sorted(read_index(self.index_path)["textures"]), ["player", "tiles/crate", "tiles/dirt"])
+
+    def test_read_only_cache(self):
+        blocker = os.path.join(self.directory.name, "blocker")
+        open(blocker, "w").close()
+        atlas, rects = load_atlas(self.textures_path, os.path.join(blocker, "atlas.png"),
+                                  os.path.join(blocker, "atlas.json"))
+        self.assertEqual(sorted(rects), ["player", "tiles/dirt"])
+        self.assertGreaterEqual(atlas.get_height(), 24)
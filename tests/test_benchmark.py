@@ -0,0 +1,12 @@
+import unittest
+
+from jnjclient.benchmark import PHASES, SCENARIOS, run
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run(self):
+        results = run(SCENARIOS, 5)
+        self.assertEqual([result["name"] for result in results], [scenario["name"] for scenario in SCENARIOS])
+        for result in results:
+            self.assertGreater(result["fps"], 0)
+            self.assertGreaterEqual(result["frame_ms"], sum(result[phase] for phase in PHASES))
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from jnjserver.chunked_terrain import ChunkedTerrainLoader
+from jnjserver.terrain import CHUNK_SIZE, TerrainLoader
+
+
+class TestChunkedTerrain(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "terrain.chunks")
+        ChunkedTerrainLoader.convert("jnjserver/terrain.csv", self.path)
+        self.expected = TerrainLoader.load("jnjserver/terrain.csv")
+        self.terrain = ChunkedTerrainLoader.load(self.path, max_chunks=2)
+
+    def tearDown(self):
+        self.terrain.close()
+        self.directory.cleanup()
+
+    def test_get_tile(self):
+        self.assertEqual((self.terrain.width, self.terrain.height), (self.expected.width, self.expected.height))
+        for x in range(self.expected.width):
+            for y in range(self.expected.height):
+                self.assertEqual(self.terrain.get_tile(x, y), self.expected.get_tile(x, y))
+        self.assertLessEqual(len(self.terrain.chunks), 2)
+
+        with self.assertRaises(ValueError):
+            self.terrain.get_tile(self.terrain.width, 0)
+
+    def test_columns(self):
+        self.assertEqual(self.expected.columns(0), self.expected.grid[:CHUNK_SIZE])
+        for chunk_x in [0, (self.expected.width - 1) // CHUNK_SIZE]:
+            self.assertEqual(self.terrain.columns(chunk_x), self.expected.columns(chunk_x))
+        self.assertLessEqual(len(self.terrain.chunks), 2)
+
+    def test_chunk_data(self):
+        last_x = (self.expected.width - 1) // CHUNK_SIZE
+        last_y = (self.expected.height - 1) // CHUNK_SIZE
+        for chunk_x, chunk_y in [(0, 0), (last_x, 0), (last_x, last_y)]:
+            self.assertEqual(self.terrain.chunk_data(chunk_x, chunk_y), self.expected.chunk_data(chunk_x, chunk_y))
+
+    def test_set_tile(self):
+        self.terrain.set_tile(150, 50, "crate")
+        self.terrain.remove_tile(0, 59)
+        self.terrain.prefetch(10, 10, 48)
+        self.assertNotIn((4, 1), self.terrain.chunks)
+
+        self.assertEqual(self.terrain.get_tile(150, 50), "crate")
+        self.assertEqual(self.terrain.get_tile(0, 59), "")
+        self.assertEqual(self.terrain.extract_updates(), [
+            {"x": 150, "y": 50, "tile": "crate"},
+            {"x": 0, "y": 59, "tile": ""}
+        ])
+
+        level = ChunkedTerrainLoader.load(self.path)
+        self.assertEqual(level.get_tile(150, 50), self.expected.get_tile(150, 50))
+        level.close()
+
+    def test_startup_data(self):
+        startup_data = self.terrain.startup_data()
+        self.assertEqual(startup_data["grid"], [])
+        self.assertEqual((startup_data["width"], startup_data["height"]), (self.expected.width, self.expected.height))
+        self.assertEqual(startup_data["palette"], self.terrain.palette)
+        self.assertEqual(startup_data["chunks"], [])
+
+    def test_stream(self):
+        self.terrain.prefetch(10, 10, 24)
+        chunks = self.terrain.extract_chunks()
+        self.assertEqual([(chunk["x"], chunk["y"]) for chunk in chunks], [(0, 0), (0, 32), (32, 0), (32, 32)])
+        self.assertEqual(chunks[1]["columns"][5], self.expected.grid[5][32:])
+        self.assertEqual(self.terrain.extract_chunks(), [])
+        self.terrain.prefetch(10, 10, 24)
+        self.assertEqual(self.terrain.extract_chunks(), [])
@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+import msgpack
+
+from jnjclient.client import Client, HEARTBEAT_INTERVAL, INPUT_RATE
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data: bytes, address: tuple):
+        self.sent.append(msgpack.unpackb(data))
+
+
+class TestSendInput(unittest.TestCase):
+    def setUp(self):
+        self.client = Client.__new__(Client)
+        self.client.ip = "127.0.0.1"
+        self.client.port = 5656
+        self.client.sock = FakeSocket()
+        self.client.sent_input = None
+        self.client.input_sent_time = 0.0
+        self.now = 100.0
+        patcher = mock.patch("jnjclient.client.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send(self, walking, jumping: bool = False) -> bool:
+        return self.client.send_input({"player": "john", "walking": walking, "jumping": jumping})
+
+    def test_changed_input_rate(self):
+        self.assertTrue(self.send("left"))
+        self.now += 0.6 / INPUT_RATE
+        self.assertFalse(self.send("right"))
+        self.now += 0.6 / INPUT_RATE
+        self.assertTrue(self.send("right"))
+        self.assertEqual([message["walking"] for message in self.client.sock.sent], ["left", "right"])
+
+    def test_heartbeat(self):
+        self.assertTrue(self.send("left"))
+        self.now += 2 / INPUT_RATE
+        self.assertFalse(self.send("left"))
+        self.now += HEARTBEAT_INTERVAL
+        self.assertTrue(self.send("left"))
+        self.assertEqual(len(self.client.sock.sent), 2)
+
+    def test_jump_survives_throttle(self):
+        # Цикл клиента держит прыжок, пока send_input не вернёт True
+        self.assertTrue(self.send(False))
+        jumping = True
+        self.now += 0.6 / INPUT_RATE
+        if self.send(False, jumping):
+            jumping = False
+        self.assertTrue(jumping)
+        self.now += 0.6 / INPUT_RATE
+        if self.send(False, jumping):
+            jumping = False
+        self.assertFalse(jumping)
+        self.assertEqual([message["jumping"] for message in self.client.sock.sent], [False, True])
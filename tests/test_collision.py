@@ -0,0 +1,62 @@
+import random
+from math import ceil, floor
+import unittest
+
+from jnjserver.collision import CollisionRects, merge_rects
+from jnjserver.physics import move, move_rects
+from jnjserver.terrain import Tile, TileSet, Terrain
+
+
+class TestCollisionRects(unittest.TestCase):
+    def setUp(self):
+        self.tileset = TileSet({"": Tile("", False), "bricks": Tile("bricks", True)})
+        grid = [['' for _ in range(40)] for _ in range(40)]
+        for x in range(40):
+            for y in range(30, 40):
+                grid[x][y] = 'bricks'
+        self.terrain = Terrain(grid)
+        self.collision = CollisionRects(self.terrain, self.tileset)
+
+    def test_merge_rects(self):
+        solid = [[True, True, False], [True, True, True], [False, False, True]]
+        self.assertEqual(merge_rects(solid, 10, 20), [(10, 20, 12, 22), (11, 22, 13, 23)])
+
+    def test_query(self):
+        self.assertEqual(self.collision.query(0, 0, 40, 40), [(0, 30, 32, 32), (0, 32, 32, 40), (32, 30, 40, 32),
+                                                              (32, 32, 40, 40)])
+        self.assertEqual(self.collision.query(5, 28, 8, 31), [(5, 30, 8, 31)])
+        self.assertEqual(self.collision.query(5, 5, 5, 8), [])
+
+    def test_repair(self):
+        self.collision.query(0, 0, 40, 40)
+        self.terrain.set_tile(3, 10, "bricks")
+        self.assertNotIn((0, 0), self.collision.regions)
+        self.assertIn((1, 0), self.collision.regions)
+        self.assertEqual(self.collision.query(0, 9, 8, 12), [(3, 10, 4, 11)])
+        self.terrain.remove_tile(3, 10)
+        self.assertEqual(self.collision.query(0, 9, 8, 12), [])
+
+    def test_matches_tiles(self):
+        rng = random.Random(3)
+        grid = [['bricks' if rng.random() < 0.3 else '' for _ in range(40)] for _ in range(40)]
+        terrain = Terrain(grid)
+        collision = CollisionRects(terrain, self.tileset)
+
+        def is_solid(x, y):
+            return self.tileset.get(terrain.get_tile(x, y)).solid
+
+        stuck = 0
+        for _ in range(4000):
+            state = (rng.uniform(0, 39), rng.uniform(0, 38), 0.75, 1.5, rng.uniform(-1, 1), rng.uniform(-2.5, 1), 0.4)
+            if collision.query(floor(state[0]), floor(state[1]), ceil(state[0] + 0.75), ceil(state[1] + 1.5)):
+                stuck += 1
+            self.assertEqual(move_rects(*state, collision.query, 40, 40), move(*state, is_solid, 40, 40))
+        self.assertGreater(stuck, 0)
+
+    def test_two_ceiling_rows(self):
+        grid = [['' for _ in range(10)] for _ in range(4)]
+        grid[1][4] = grid[2][4] = grid[2][5] = 'bricks'
+        collision = CollisionRects(Terrain(grid), self.tileset)
+        movement = move_rects(1.5, 5.2, 0.75, 1.5, -0.55, -1.5, 0.4, collision.query, 4, 10)
+        self.assertEqual(movement[5], [(1, 4), (2, 5)])
+        self.assertEqual(movement[1], 6)
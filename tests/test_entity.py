@@ -22,6 +22,14 @@ class TestEntity(unittest.TestCase):
             self.entity.walk("right", "right")
             self.entity.walk(123, 123)
 
+    def test_walk_changes(self):
+        self.entity.extract_changes()
+        self.entity.walk("right", 0)
+        self.entity.walk("up", 0.24)
+        self.assertEqual(self.entity.extract_changes(), {})
+        self.entity.walk("left", 0.24)
+        self.assertEqual(self.entity.extract_changes(), {"velocity": {"x": -0.24, "y": 0}})
+
     def test_jump(self):
         with self.assertRaises(ValueError):
             self.entity.jump(Vector(0, 12))
@@ -41,3 +49,14 @@ class TestEntity(unittest.TestCase):
         }
 
         self.assertEqual(self.entity.dict(), expected_dict)
+
+    def test_extract_changes(self):
+        self.assertEqual(self.entity.spawn_dict(), self.entity.dict())
+        self.assertEqual(self.entity.extract_changes(), {})
+
+        self.entity.walk("right", 0.24)
+        self.assertEqual(self.entity.extract_changes(), {"velocity": {"x": 0.24, "y": 0}})
+        self.assertEqual(self.entity.extract_changes(), {})
+
+        self.entity.die()
+        self.assertEqual(set(self.entity.extract_changes()), {"position", "health", "boosts"})
@@ -0,0 +1,46 @@
+import unittest
+
+from jnjserver.entity import EntityType
+from jnjserver.entity_pool import EntityTable, EntityPool, SLOT_BITS
+from jnjserver.vector import Vector
+
+
+class TestEntityTable(unittest.TestCase):
+    def setUp(self):
+        self.entity_type = EntityType("test", Vector(1, 1), 1)
+        self.pool = EntityPool()
+        self.table = EntityTable()
+
+    def add(self):
+        entity = self.pool.acquire(self.entity_type, Vector(0, 0), 1)
+        entity.id = self.table.add(entity)
+        return entity
+
+    def test_add_get(self):
+        entities = [self.add() for _ in range(5)]
+        self.assertEqual([entity.id for entity in entities], [0, 1, 2, 3, 4])
+        for entity in entities:
+            self.assertIs(self.table.get(entity.id), entity)
+        self.assertIsNone(self.table.get(5))
+        self.assertEqual(len(self.table), 5)
+
+    def test_remove(self):
+        entities = [self.add() for _ in range(5)]
+        self.assertIs(self.table.remove(1), entities[1])
+        self.assertNotIn(1, self.table)
+        self.assertEqual(set(self.table), {entities[0], entities[2], entities[3], entities[4]})
+        for entity in entities[2:]:
+            self.assertIs(self.table.get(entity.id), entity)
+        with self.assertRaises(ValueError):
+            self.table.remove(1)
+
+    def test_slot_reuse(self):
+        first = self.add()
+        self.table.remove(first.id)
+        self.pool.release(first)
+
+        second = self.add()
+        self.assertIs(second, first)
+        self.assertEqual(second.id, 1 << SLOT_BITS)
+        self.assertIsNone(self.table.get(0))
+        self.assertIs(self.table.get(second.id), second)
@@ -0,0 +1,61 @@
+import unittest
+
+from jnjserver.generator import LevelGenerator, ProceduralTerrain, generate_chunk
+from jnjserver.terrain import CHUNK_SIZE, STREAM_CHUNKS_PER_UPDATE
+
+
+class TestLevelGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = LevelGenerator(7, width=400)
+
+    def test_deterministic(self):
+        self.assertEqual(self.generator.chunk_columns(3), LevelGenerator(7, width=400).chunk_columns(3))
+        self.assertNotEqual(self.generator.chunk_columns(3), LevelGenerator(8, width=400).chunk_columns(3))
+        self.assertEqual(generate_chunk(7, 400, 60, 3), self.generator.chunk_columns(3))
+        self.assertEqual(len(self.generator.chunk_columns(12)), 400 - 12 * CHUNK_SIZE)
+
+    def test_additional_data(self):
+        additional_data = self.generator.additional_data()
+        points = additional_data.checkpoints["john"] + additional_data.checkpoints["josh"]
+        self.assertEqual(len(additional_data.checkpoints["john"]), self.generator.checkpoints_count)
+        for point in points + [additional_data.princess]:
+            column = self.generator.column(point.x)
+            ground = self.generator.ground(point.x)
+            self.assertEqual(column[point.y:ground], [""] * (ground - point.y))
+            self.assertEqual(column[ground], "grass")
+        self.assertLess(additional_data.checkpoints["john"][0].x, additional_data.princess.x)
+        self.assertGreater(additional_data.checkpoints["josh"][0].x, additional_data.princess.x)
+
+
+class TestProceduralTerrain(unittest.TestCase):
+    def setUp(self):
+        self.generator = LevelGenerator(7, width=400)
+        self.terrain = ProceduralTerrain(self.generator, workers=1, max_chunks=2, lookahead=64)
+
+    def tearDown(self):
+        self.terrain.close()
+
+    def test_get_tile(self):
+        self.terrain.prefetch(100, 30, 16)
+        for x in range(0, 400, 7):
+            for y in range(60):
+                self.assertEqual(self.terrain.get_tile(x, y), self.generator.column(x)[y])
+        self.assertLessEqual(len(self.terrain.chunks), 2)
+
+    def test_edit_and_stream(self):
+        self.terrain.prefetch(10, 30, 16)
+        self.assertEqual(self.terrain.startup_data()["chunks"], [])
+        chunks = self.terrain.extract_chunks()
+        self.assertEqual([(chunk["x"], chunk["y"]) for chunk in chunks], [(0, 0), (0, 32)])
+        self.assertEqual(chunks[1]["columns"][3], self.generator.column(3)[32:])
+        self.assertEqual(self.terrain.extract_chunks(), [])
+
+        self.terrain.prefetch(100, 30, 64)
+        self.assertEqual([len(self.terrain.extract_chunks()) for _ in range(3)],
+                         [STREAM_CHUNKS_PER_UPDATE, STREAM_CHUNKS_PER_UPDATE, 2])
+
+        self.terrain.set_tile(5, 0, "crate")
+        for x in range(0, 400, CHUNK_SIZE):
+            self.terrain.get_tile(x, 0)
+        self.assertEqual(self.terrain.get_tile(5, 0), "crate")
+        self.assertEqual(self.terrain.chunk_data(0, 0)["columns"][5][0], "crate")
@@ -0,0 +1,29 @@
+import copy
+import unittest
+
+from jnjserver.golden import GOLDEN_SEED, GOLDEN_TICKS, EXTRA_PLAYERS, MAPS, compare, golden_file, input_script, \
+    load_trajectory, run_backend
+
+
+class TestGolden(unittest.TestCase):
+    def setUp(self):
+        self.script = input_script(GOLDEN_SEED, 2 + EXTRA_PLAYERS, GOLDEN_TICKS)
+
+    def test_serial_backends(self):
+        for map_name in MAPS:
+            expected = load_trajectory(golden_file(map_name))
+            for backend in ["tiles", "rects"]:
+                with self.subTest(map=map_name, backend=backend):
+                    trajectory, _ = run_backend(map_name, backend, self.script, GOLDEN_SEED)
+                    self.assertIsNone(compare(expected, trajectory))
+
+    def test_compare(self):
+        expected = load_trajectory(golden_file("crates"))
+        actual = copy.deepcopy(expected)
+        actual[10]["entities"][0][1] += 1e-9
+        self.assertEqual(compare(expected, actual)[:8], "tick 11:")
+        self.assertIsNone(compare(expected, actual, 1e-6))
+
+        actual[20]["terrain"].append([0, 0, ""])
+        self.assertEqual(compare(expected, actual, 1e-6)[:8], "tick 21:")
+        self.assertIsNotNone(compare(expected, actual[:-1]))
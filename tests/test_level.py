@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from jnjserver.chunked_terrain import ChunkedTerrain
+from jnjserver.level import DEFAULT_SOURCES, LevelCompiler, LevelLoader
+from jnjserver.terrain import TerrainLoader
+
+
+class TestLevel(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sources = {}
+        for role, path in DEFAULT_SOURCES.items():
+            self.sources[role] = os.path.join(self.directory.name, os.path.basename(path))
+            shutil.copy(path, self.sources[role])
+        self.bundle_path = os.path.join(self.directory.name, "level.jnjl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load(self):
+        level = LevelLoader.load_cached(self.sources, self.bundle_path)
+        expected = TerrainLoader.load(self.sources["terrain"])
+        columns = [column for chunk_x in range(level.terrain.chunks_x) for column in level.terrain.columns(chunk_x)]
+        self.assertEqual(columns, expected.grid)
+        self.assertTrue(level.tileset.get("crate").solid)
+        self.assertEqual(level.entityset.get("player").max_health, 6)
+        self.assertEqual(level.additional_data.princess.dict(), {"x": 90, "y": 2})
+        self.assertEqual(len(level.additional_data.checkpoints["josh"]), 5)
+        level.terrain.close()
+
+    def test_cache(self):
+        LevelCompiler.compile(self.sources, self.bundle_path)
+        metadata = LevelLoader.read_metadata(self.bundle_path)
+        self.assertTrue(LevelLoader.is_fresh(metadata, self.sources))
+
+        os.utime(self.sources["tiles"], ns=(0, 0))
+        self.assertTrue(LevelLoader.is_fresh(metadata, self.sources))
+
+        with open(self.sources["additional_data"]) as json_file:
+            data = json.load(json_file)
+        data["princess"]["x"] = 91
+        with open(self.sources["additional_data"], "w") as json_file:
+            json.dump(data, json_file)
+        self.assertFalse(LevelLoader.is_fresh(metadata, self.sources))
+
+        level = LevelLoader.load_cached(self.sources, self.bundle_path)
+        self.assertEqual(level.additional_data.princess.x, 91)
+        level.terrain.close()
+
+    def test_corrupt_bundle(self):
+        LevelCompiler.compile(self.sources, self.bundle_path)
+        with open(self.bundle_path, "r+b") as file:
+            file.seek(20)
+            file.write(b"\xff\xfe{")
+        self.assertIsNone(LevelLoader.read_metadata(self.bundle_path))
+        level = LevelLoader.load_cached(self.sources, self.bundle_path)
+        self.assertEqual(level.additional_data.princess.dict(), {"x": 90, "y": 2})
+        level.terrain.close()
+
+        with open(self.bundle_path, "r+b") as file:
+            file.truncate(os.path.getsize(self.bundle_path) - 1)
+        self.assertIsNone(LevelLoader.read_metadata(self.bundle_path))
+        level = LevelLoader.load_cached(self.sources, self.bundle_path)
+        self.assertIsNotNone(LevelLoader.read_metadata(self.bundle_path))
+        level.terrain.close()
+
+    def test_write_failure(self):
+        with mock.patch("jnjserver.level.os.replace", side_effect=PermissionError):
+            level = LevelLoader.load_cached(self.sources, self.bundle_path)
+        self.assertNotIsInstance(level.terrain, ChunkedTerrain)
+        self.assertEqual(level.terrain.grid, TerrainLoader.load(self.sources["terrain"]).grid)
+        self.assertEqual(len(level.additional_data.checkpoints["josh"]), 5)
+        self.assertFalse(os.path.exists(self.bundle_path))
+
+    def test_load_sets(self):
+        tileset, entityset = LevelLoader.load_sets(self.sources)
+        self.assertTrue(tileset.get("crate").solid)
+        self.assertEqual(entityset.get("player").max_health, 6)
+        self.assertFalse(os.path.exists(self.bundle_path))
+
+    def test_validation(self):
+        with open(self.sources["additional_data"]) as json_file:
+            data = json.load(json_file)
+        data["princess"]["y"] = 1000
+        with open(self.sources["additional_data"], "w") as json_file:
+            json.dump(data, json_file)
+        with self.assertRaises(ValueError):
+            LevelCompiler.compile(self.sources, self.bundle_path)
+        self.assertEqual(os.listdir(self.directory.name).count("level.jnjl.tmp"), 0)
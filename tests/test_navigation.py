@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from jnjserver.additional_data import AdditionalData
+from jnjserver.entity import Entity, EntityType, EntitySet
+from jnjserver.navigation import NavigationGraph, PathFinder, jump_arc
+from jnjserver.terrain import Tile, TileSet, Terrain
+from jnjserver.vector import Vector
+from jnjserver.world import World
+
+
+class TestNavigation(unittest.TestCase):
+    def setUp(self):
+        self.tileset = TileSet({"": Tile("", False), "bricks": Tile("bricks", True)})
+        grid = [['' for _ in range(19)] + ['bricks'] for _ in range(60)]
+        for x in range(10, 14):
+            grid[x][17] = grid[x][18] = 'bricks'
+        for x in range(20, 24):
+            grid[x][19] = ''
+        for y in range(10, 19):
+            grid[40][y] = 'bricks'
+        self.terrain = Terrain(grid)
+        self.graph = NavigationGraph(self.terrain, self.tileset)
+        self.pathfinder = PathFinder(self.graph)
+
+    def find_path(self, start, goal):
+        for _ in range(100):
+            path = self.pathfinder.path(start, goal)
+            if path is not None:
+                return path
+            self.pathfinder.update()
+        return None
+
+    def test_jump_arc(self):
+        self.assertGreaterEqual(jump_arc(0, False)[-1][0], 6)
+        self.assertIsNotNone(jump_arc(-4, True))
+        self.assertIsNone(jump_arc(-5, True))
+
+    def test_edges(self):
+        self.assertTrue(self.graph.is_standable(5, 18))
+        self.assertFalse(self.graph.is_standable(5, 17))
+        self.assertTrue(self.graph.is_standable(11, 16))
+        targets = {target: kind for target, _, kind in self.graph.edges((9, 18))}
+        self.assertEqual(targets[(8, 18)], "walk")
+        self.assertIn((10, 16), targets)
+        self.assertNotIn((41, 18), {target for target, _, _ in self.graph.edges((39, 18))})
+
+    def test_path(self):
+        path = self.find_path((2, 18), (30, 18))
+        self.assertEqual(path[0], (2, 18))
+        self.assertEqual(path[-1], (30, 18))
+        self.assertFalse(any(20 <= x < 24 for x, _ in path))
+
+        self.assertEqual(self.pathfinder.path(path[3], (30, 18)), path[3:])
+        self.assertEqual(len(self.pathfinder.pending), 0)
+
+        self.assertIsNone(self.find_path((2, 18), (50, 18)))
+        self.assertIn((2, 18), self.pathfinder.route((50, 18)).unreachable)
+
+    def test_invalidation(self):
+        self.find_path((2, 18), (30, 18))
+        self.terrain.set_tile(25, 18, "bricks")
+        self.assertNotIn((30, 18), self.pathfinder.routes)
+        self.assertNotIn((25, 18), {target for target, _, _ in self.graph.edges((24, 18))})
+        self.assertIn((25, 17), {target for target, _, _ in self.graph.edges((24, 18))})
+
+        self.assertIsNone(self.find_path((30, 18), (50, 18)))
+        for y in range(10, 15):
+            self.terrain.remove_tile(40, y)
+        self.assertEqual(self.find_path((30, 18), (50, 18))[-1], (50, 18))
+
+    def test_bot(self):
+        random.seed(0)
+        entity_type = EntityType("player", Vector(0.75, 1.5), 6)
+        additional_data = AdditionalData({"john": [], "josh": []}, Vector(1000, 1000), [])
+        world = World(self.tileset, EntitySet({"player": entity_type}), self.terrain, additional_data)
+        entity = Entity(entity_type, Vector(2.125, 17.5), 6)
+        entity.current_checkpoint = Vector(2, 17)
+        world.add_entity(entity)
+        bot = world.add_bot(entity, Vector(35, 17))
+
+        for _ in range(600):
+            world.update()
+        self.assertTrue(entity.is_on_ground)
+        self.assertEqual(world.navigation.node_at(entity.position), bot.goal_node)
+        self.assertEqual(entity.health, 6)
@@ -0,0 +1,58 @@
+import socket
+import time
+import unittest
+
+import msgpack
+
+from jnjclient.network import NetworkThread, RECEIVE_TIMEOUT
+
+
+class TestNetworkThread(unittest.TestCase):
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(("127.0.0.1", 0))
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.network = NetworkThread(self.receiver)
+        self.network.start()
+
+    def tearDown(self):
+        self.network.stop()
+        self.network.join()
+        self.sender.close()
+        self.receiver.close()
+
+    def send(self, data: bytes):
+        self.sender.sendto(data, self.receiver.getsockname())
+
+    def receive(self, count: int) -> list:
+        messages = []
+        deadline = time.monotonic() + 2
+        while len(messages) < count and time.monotonic() < deadline:
+            messages += self.network.drain()
+            time.sleep(0.01)
+        return messages
+
+    def test_drain_in_order(self):
+        for tick in range(1, 6):
+            self.send(msgpack.packb({"type": "update", "tick": tick}))
+        messages = self.receive(5)
+        self.assertEqual([message["tick"] for message in messages], [1, 2, 3, 4, 5])
+        self.assertEqual(self.network.updates_received, 5)
+        self.assertEqual((self.network.first_tick, self.network.last_tick), (1, 5))
+        self.assertEqual(self.network.drain(), [])
+
+    def test_malformed_datagram(self):
+        self.send(b"\xc1")
+        self.send(b"\x01")
+        self.send(msgpack.packb({"type": "pong"}))
+        self.send(msgpack.packb({"type": "update"}))
+        self.send(msgpack.packb({"type": "update", "tick": "1"}))
+        self.send(msgpack.packb({"type": "game_over"}))
+        self.assertEqual(self.receive(1), [{"type": "game_over"}])
+        self.assertEqual((self.network.updates_received, self.network.last_tick), (0, None))
+        self.assertTrue(self.network.is_alive())
+
+    def test_stop(self):
+        self.network.stop()
+        self.network.join(RECEIVE_TIMEOUT + 0.5)
+        self.assertFalse(self.network.is_alive())
@@ -0,0 +1,19 @@
+import os
+import unittest
+from unittest import mock
+
+from jnjserver.paths import user_dir
+
+
+class TestUserDir(unittest.TestCase):
+    def test_kinds(self):
+        with mock.patch.dict(os.environ, {"HOME": "/home/john"}, clear=True):
+            self.assertEqual(user_dir("cache", "jnjserver"), os.path.join("/home/john", ".cache", "jnjserver"))
+            self.assertEqual(user_dir("data", "jnjclient"), os.path.join("/home/john", ".local", "share", "jnjclient"))
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": "/tmp/cache"}, clear=True):
+            self.assertEqual(user_dir("cache", "jnjclient"), os.path.join("/tmp/cache", "jnjclient"))
+        with mock.patch.dict(os.environ, {"LOCALAPPDATA": "C:/Local", "XDG_DATA_HOME": "/tmp/data"}, clear=True):
+            self.assertEqual(user_dir("data", "jnjclient"), os.path.join("C:/Local", "jnjclient"))
+
+    def test_unknown_kind(self):
+        self.assertRaises(ValueError, user_dir, "logs", "jnjclient")
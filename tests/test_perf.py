@@ -0,0 +1,44 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from jnjclient.perf import FIELDS, PerfOverlay
+
+
+class TestPerfOverlay(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.csv_path = os.path.join(directory.name, "data", "perf.csv")
+        self.overlay = PerfOverlay(self.csv_path)
+        self.addCleanup(self.overlay.close)
+
+    def test_csv(self):
+        self.overlay.record({"fps": 1.0})
+        self.assertFalse(os.path.exists(self.csv_path))
+
+        self.overlay.toggle()
+        self.overlay.record({"fps": 60.0, "frame_ms": 2.5})
+        self.overlay.record({"fps": 59.0, "rtt_ms": None})
+        self.overlay.toggle()
+        self.overlay.record({"fps": 1.0})
+        self.overlay.toggle()
+        self.overlay.record({"fps": 58.0})
+        self.overlay.toggle()
+
+        with open(self.csv_path, newline="") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], FIELDS)
+        self.assertEqual(len(rows), 4)
+        records = [dict(zip(FIELDS, row)) for row in rows[1:]]
+        self.assertEqual([record["fps"] for record in records], ["60.0", "59.0", "58.0"])
+        self.assertEqual(records[0]["frame_ms"], "2.5")
+        self.assertEqual(records[1]["rtt_ms"], "")
+
+    def test_history(self):
+        self.overlay.toggle()
+        for frame in range(3):
+            self.overlay.record({"frame_ms": float(frame)})
+        self.assertEqual(list(self.overlay.history["frame_ms"]), [0.0, 1.0, 2.0])
+        self.assertEqual(self.overlay.format()[0], "FPS -  кадр 2.0 мс")
@@ -0,0 +1,24 @@
+import unittest
+
+from jnjserver.entity import EntityType, Entity
+from jnjserver.player import Player, WALK_VELOCITY, JUMP_VELOCITY
+from jnjserver.vector import Vector
+
+
+class TestPlayer(unittest.TestCase):
+    def setUp(self):
+        entity_type = EntityType("player", Vector(0.75, 1.5), 6)
+        self.entity = Entity(entity_type, Vector(0, 0), 6)
+        self.entity.is_on_ground = True
+        self.player = Player("john", None, None, self.entity)
+
+    def test_input_persists(self):
+        self.player.process_input({"player": "john", "walking": "right", "jumping": True})
+        self.player.process_input({"player": "john", "walking": "right", "jumping": False})
+        self.player.update()
+        self.assertAlmostEqual(self.entity.velocity.x, WALK_VELOCITY)
+        self.assertAlmostEqual(self.entity.velocity.y, -JUMP_VELOCITY)
+
+        self.player.update()
+        self.assertAlmostEqual(self.entity.velocity.x, 2 * WALK_VELOCITY)
+        self.assertAlmostEqual(self.entity.velocity.y, -JUMP_VELOCITY)
@@ -0,0 +1,77 @@
+import socket
+import time
+import unittest
+from unittest import mock
+
+import msgpack
+
+from jnjserver.entity import Entity
+from jnjserver.player import Player
+from jnjserver.protocol import RESYNC_RETRY_TICKS, STREAM_RADIUS
+from jnjserver.server import MAX_DATAGRAMS_PER_TICK, Server
+from jnjserver.vector import Vector
+
+
+class TestServerInput(unittest.TestCase):
+    def setUp(self):
+        self.server = Server("127.0.0.1", 0)
+        self.address = self.server.main_socket.getsockname()
+        self.client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.client.bind(("127.0.0.1", 0))
+        self.client.settimeout(1)
+        entity = Entity(self.server.world.entityset.get("player"), Vector(50, 10), 6)
+        self.server.john = Player("john", self.server.main_socket, self.client.getsockname(), entity)
+        self.server.josh = self.server.john
+        self.server.players = [self.server.john, self.server.josh]
+
+    def tearDown(self):
+        self.client.close()
+        self.server.main_socket.close()
+        self.server.world.terrain.close()
+
+    def send(self, data: dict, count: int = 1):
+        for _ in range(count):
+            self.client.sendto(msgpack.packb(data), self.address)
+        time.sleep(0.05)
+
+    def received(self) -> list:
+        messages = []
+        self.client.setblocking(False)
+        try:
+            while True:
+                messages.append(msgpack.unpackb(self.client.recv(65536)))
+        except BlockingIOError:
+            pass
+        self.client.settimeout(1)
+        return messages
+
+    def test_datagrams_per_tick(self):
+        self.client.sendto(b"\xc1", self.address)
+        self.send({"type": "ping", "player": "john", "time": 1}, MAX_DATAGRAMS_PER_TICK + 10)
+        self.server.receive_players_input()
+        time.sleep(0.05)
+        self.assertEqual(len(self.received()), MAX_DATAGRAMS_PER_TICK - 1)
+        self.server.receive_players_input()
+        time.sleep(0.05)
+        self.assertEqual(len(self.received()), 11)
+
+    def test_resync_limits(self):
+        world = self.server.world
+        with mock.patch.object(world, "terrain_resync", return_value=[{"type": "terrain_resync"}]) as resync:
+            self.send({"type": "resync", "player": "john", "terrain_version": 0, "columns": [0, 100000]}, 2)
+            self.server.receive_players_input()
+            resync.assert_called_once_with(0, [50 - STREAM_RADIUS, 50 + STREAM_RADIUS])
+
+            world.tick += RESYNC_RETRY_TICKS
+            self.send({"type": "resync", "player": "john", "terrain_version": 0, "columns": [500, 600]})
+            self.server.receive_players_input()
+            self.assertEqual(resync.call_args, mock.call(0, None))
+        self.assertEqual(len(self.received()), 2)
+
+    def test_entities_resync(self):
+        self.send({"type": "resync", "player": "john", "terrain_version": 0, "columns": None, "entities": True})
+        self.server.receive_players_input()
+        time.sleep(0.05)
+        messages = self.received()
+        self.assertEqual([message["type"] for message in messages], ["terrain_resync", "entities_resync"])
+        self.assertEqual(messages[1]["tick"], self.server.world.tick)
@@ -0,0 +1,25 @@
+import socket
+import unittest
+
+from jnjserver.server_process import ServerProcess
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestServerProcess(unittest.TestCase):
+    def test_lifecycle(self):
+        port = free_port()
+        server = ServerProcess("127.0.0.1", port)
+        server.start()
+        try:
+            server.wait_ready()
+            busy = ServerProcess("127.0.0.1", port)
+            busy.start()
+            self.assertRaises(RuntimeError, busy.wait_ready)
+        finally:
+            self.assertEqual(server.stop(), 0)
+        self.assertFalse(server.is_alive())
@@ -0,0 +1,147 @@
+import random
+import unittest
+
+from jnjclient.benchmark import synthetic_entity, synthetic_state
+from jnjclient.server_updates_handler import ENTITY_MOVED, ENTITY_REMOVED, ENTITY_SPAWNED, STATS_CHANGED, \
+    TILES_CHANGED, ServerUpdatesHandler
+from jnjclient.tile_grid import TileGrid
+from jnjserver.protocol import RESYNC_RETRY_TICKS
+
+
+class TestTileGrid(unittest.TestCase):
+    def test_columns(self):
+        grid = TileGrid.from_columns([["", "dirt"], [], ["grass", "dirt"]], 2)
+        self.assertEqual(grid.column(0), ["", "dirt"])
+        self.assertEqual(grid.column(1), [])
+        self.assertEqual(grid.get(2, 0), "grass")
+        self.assertEqual(len(grid.names), 3)
+
+        grid.set_column(1, 1, ["crate"])
+        self.assertEqual(grid.column(1), ["", "crate"])
+        grid.set(0, 1, "")
+        self.assertEqual(grid.column(0), ["", ""])
+
+    def test_chunk_rows(self):
+        grid = TileGrid(2, 60)
+        grid.set_column(0, 0, ["dirt"] * 32)
+        self.assertTrue(grid.is_loaded(0, 31))
+        self.assertFalse(grid.is_loaded(0, 32))
+        self.assertFalse(grid.is_column_loaded(0))
+        self.assertEqual(grid.column(0), [])
+
+        grid.set_column(0, 32, ["grass"] * 28)
+        self.assertTrue(grid.is_column_loaded(0))
+        self.assertEqual(grid.column(0), ["dirt"] * 32 + ["grass"] * 28)
+        self.assertFalse(grid.is_column_loaded(1))
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, TileGrid, -1, 2)
+        self.assertRaises(ValueError, TileGrid, 2, 2.0)
+
+
+class TestServerUpdatesHandler(unittest.TestCase):
+    def setUp(self):
+        self.state = synthetic_state(32, 2, random.Random(0))
+        self.events = []
+        for event in [TILES_CHANGED, ENTITY_SPAWNED, ENTITY_MOVED, ENTITY_REMOVED, STATS_CHANGED]:
+            self.state.add_listener(event, lambda *args, event=event: self.events.append((event, args)))
+
+    def update(self, **fields) -> dict:
+        update = {
+            "type": "update",
+            "tick": self.state.tick + 1,
+            "spawned_entities": {},
+            "entities": {},
+            "removed_entities": [],
+            "chunks": [],
+            "actions": {"terrain": []},
+            "terrain_version": self.state.terrain_version,
+            "terrain_base_version": self.state.terrain_version
+        }
+        update.update(fields)
+        return update
+
+    def test_events(self):
+        player = self.state.player_entity
+        position = player["position"]
+        self.state.process_update(self.update(
+            spawned_entities={"5": synthetic_entity(5, 1, 1)},
+            entities={"0": {"position": {"x": 3, "y": 4}}, "1": {"health": 2}},
+            removed_entities=[1],
+            actions={"terrain": [{"x": 2, "y": 3, "tile": "crate"}]},
+            terrain_version=1
+        ))
+        self.assertIs(self.state.player_entity["position"], position)
+        self.assertEqual(position, {"x": 3, "y": 4})
+        self.assertEqual(self.state.grid.get(2, 3), "crate")
+        self.assertEqual(self.state.terrain_version, 1)
+        self.assertEqual([event for event, _ in self.events],
+                         [ENTITY_SPAWNED, ENTITY_MOVED, ENTITY_REMOVED, TILES_CHANGED])
+        self.assertEqual(self.events[-1][1], (2, 3, 3, 4))
+
+        self.events = []
+        self.state.process_update(self.update(entities={"0": {"health": 5}}))
+        self.assertEqual(self.events, [(STATS_CHANGED, (player,))])
+
+    def test_entities_resync(self):
+        self.state.process_update(self.update(tick=self.state.tick + 2, entities={"7": {"health": 1}}))
+        self.assertTrue(self.state.resync_request()["entities"])
+
+        player = synthetic_entity(0, 8, 9)
+        resync = {"type": "entities_resync", "tick": self.state.tick, "parts": 2}
+        self.state.process_entities_resync(dict(resync, part=1, entities={"0": player}))
+        self.assertIs(self.state.player_entity, player)
+        self.assertTrue(self.state.entities_resync_needed)
+
+        self.events = []
+        self.state.process_entities_resync(dict(resync, part=0, entities={"7": synthetic_entity(7, 1, 1)}))
+        self.assertEqual(set(self.state.entities), {"0", "7"})
+        self.assertIn((ENTITY_REMOVED, ("1",)), self.events)
+        self.assertFalse(self.state.entities_resync_needed)
+        self.assertIsNone(self.state.resync_request())
+
+    def test_stale_entities_resync(self):
+        self.state.process_update(self.update(tick=self.state.tick + 2))
+        resync = {"type": "entities_resync", "tick": self.state.tick, "parts": 2}
+        self.state.process_entities_resync(dict(resync, part=0, entities={"0": synthetic_entity(0, 8, 9)}))
+        self.state.process_update(self.update())
+        self.state.process_entities_resync(dict(resync, part=1, entities={}))
+        self.assertIn("1", self.state.entities)
+        self.assertTrue(self.state.entities_resync_needed)
+
+    def test_stale_update(self):
+        self.state.process_update(self.update(tick=self.state.tick + 2))
+        self.state.process_update(self.update(tick=self.state.tick - 1, entities={"0": {"health": 1}},
+                                              removed_entities=[1]))
+        self.assertNotEqual(self.state.player_entity["health"], 1)
+        self.assertIn("1", self.state.entities)
+        self.assertEqual(self.state.tick, 2)
+
+    def test_invalid_event(self):
+        self.assertRaises(ValueError, self.state.add_listener, "unknown", print)
+
+    def test_partial_column_requested_again(self):
+        player = synthetic_entity(0, 5, 10)
+        state = ServerUpdatesHandler({
+            "terrain": {"grid": [], "width": 32, "height": 60, "chunks": []},
+            "entities": {"0": player},
+            "checkpoints": {"john": player["checkpoints"], "josh": []},
+            "princess": {"x": 30, "y": 10},
+            "player_entity": player,
+            "player_id": "john",
+            "tick": 0,
+            "terrain_version": 0
+        })
+        self.assertEqual(state.resync_request()["columns"], [0, 28])
+
+        top = {"x": 0, "y": 0, "columns": [["dirt"] * 32 for _ in range(32)]}
+        state.process_resync({"type": "terrain_resync", "version": 0, "part": 0, "parts": 2,
+                              "updates": [], "chunks": [top]})
+        for _ in range(RESYNC_RETRY_TICKS):
+            state.process_update(self.update(tick=state.tick + 1))
+        self.assertEqual(state.resync_request()["columns"], [0, 28])
+
+        bottom = {"x": 0, "y": 32, "columns": [["grass"] * 28 for _ in range(32)]}
+        state.process_resync({"type": "terrain_resync", "version": 0, "part": 1, "parts": 2,
+                              "updates": [], "chunks": [bottom]})
+        self.assertIsNone(state.resync_request())
@@ -1,6 +1,6 @@
 import unittest
 
-from jnjserver.terrain import Terrain
+from jnjserver.terrain import Terrain, TerrainLog
 from jnjserver.vector import Vector
 
 
@@ -51,3 +51,51 @@ class TestTerrain(unittest.TestCase):
             "height": self.terrain.height
         }
         self.assertEqual(self.terrain.startup_data(), excpected_startup_data)
+
+
+class TestTerrainLog(unittest.TestCase):
+    def setUp(self):
+        self.log = TerrainLog(max_entries=4)
+
+    def test_coalesce(self):
+        self.log.record(1, 2, "crate")
+        self.log.record(1, 2, "")
+        self.log.record(3, 4, "dirt")
+        self.assertEqual(self.log.commit(), [{"x": 1, "y": 2, "tile": ""}, {"x": 3, "y": 4, "tile": "dirt"}])
+        self.assertEqual(self.log.version, 1)
+        self.assertEqual(self.log.commit(), [])
+        self.assertEqual(self.log.version, 1)
+
+    def test_diff_since(self):
+        for version in range(1, 4):
+            self.log.record(0, 0, str(version))
+            self.log.record(version, 0, "crate")
+            self.log.commit()
+
+        self.assertEqual(self.log.diff_since(3), [])
+        self.assertEqual(self.log.diff_since(2), [{"x": 0, "y": 0, "tile": "3"}, {"x": 3, "y": 0, "tile": "crate"}])
+        self.assertIsNone(self.log.diff_since(0))
+        self.assertIsNone(self.log.diff_since(4))
+        self.assertEqual(self.log.base_version, 1)
+        self.assertEqual(self.log.chunks_since(0), [(0, 0)])
+
+    def test_resync_data(self):
+        terrain = Terrain([[""] * 40 for _ in range(40)])
+        terrain.log = self.log
+        for x in range(6):
+            terrain.set_tile(x, 35, "crate")
+            terrain.extract_updates()
+
+        resync_data = terrain.resync_data(5)
+        self.assertEqual(resync_data["updates"], [{"x": 5, "y": 35, "tile": "crate"}])
+        self.assertEqual(resync_data["chunks"], [])
+
+        resync_data = terrain.resync_data(0)
+        self.assertEqual(resync_data["version"], 6)
+        self.assertEqual([(chunk["x"], chunk["y"]) for chunk in resync_data["chunks"]], [(0, 32)])
+        self.assertEqual(resync_data["chunks"][0]["columns"][5][3], "crate")
+        self.assertEqual(len(resync_data["chunks"][0]["columns"]), 32)
+        self.assertEqual(len(resync_data["chunks"][0]["columns"][0]), 8)
+
+        resync_data = terrain.resync_data(9)
+        self.assertEqual((resync_data["version"], resync_data["updates"], resync_data["chunks"]), (6, [], []))
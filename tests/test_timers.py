@@ -0,0 +1,35 @@
+import unittest
+
+from jnjserver.timers import TimerService
+
+
+class TestTimerService(unittest.TestCase):
+    def setUp(self):
+        self.timers = TimerService()
+        self.fired = []
+
+    def test_fires_in_order(self):
+        self.timers.schedule(5, self.fired.append, "b")
+        self.timers.schedule(3, self.fired.append, "a")
+        self.timers.schedule(5, self.fired.append, "c")
+        self.timers.update(4)
+        self.assertEqual(self.fired, ["a"])
+        self.timers.update(5)
+        self.assertEqual(self.fired, ["a", "b", "c"])
+        self.assertEqual(len(self.timers), 0)
+
+    def test_schedule_in(self):
+        self.timers.update(10)
+        self.timers.schedule_in(2, self.fired.append, "a")
+        self.timers.update(11)
+        self.assertEqual(self.fired, [])
+        self.timers.update(12)
+        self.assertEqual(self.fired, ["a"])
+
+    def test_cancel(self):
+        timer = self.timers.schedule(1, self.fired.append, "a")
+        self.timers.cancel(timer)
+        self.timers.update(1)
+        self.assertEqual(self.fired, [])
+        with self.assertRaises(ValueError):
+            self.timers.schedule(1.5, self.fired.append, "a")
@@ -0,0 +1,133 @@
+import unittest
+
+from jnjserver.additional_data import AdditionalData
+from jnjserver.entity import EntityType, Entity, EntitySet
+from jnjserver.terrain import Tile, TileSet, Terrain
+from jnjserver.vector import Vector
+from jnjserver.world import RESYNC_ENTITIES_PER_PART, World
+
+
+class TestWorld(unittest.TestCase):
+    def setUp(self):
+        tileset = TileSet({"": Tile("", False), "bricks": Tile("bricks", True), "crate": Tile("crate", True)})
+        entity_type = EntityType("player", Vector(0.75, 1.5), 6)
+        entityset = EntitySet({"player": entity_type})
+        grid = [['' for _ in range(9)] + ['bricks'] for _ in range(10)]
+        grid[3][9] = 'crate'
+        terrain = Terrain(grid)
+        additional_data = AdditionalData({"john": [], "josh": []}, Vector(100, 100), [])
+        self.world = World(tileset, entityset, terrain, additional_data)
+        self.entity = Entity(entity_type, Vector(3, 6), 6)
+        self.world.add_entity(self.entity)
+
+    def settle(self):
+        for _ in range(30):
+            self.world.update()
+
+    def test_resting_entity_sleeps(self):
+        self.settle()
+        self.assertTrue(self.entity.is_sleeping)
+        self.assertNotIn(self.entity.id, self.world.active_entities)
+
+        self.world.extract_entities_updates()
+        self.world.update()
+        self.assertEqual(self.world.extract_entities_updates(), {})
+        self.assertIn(str(self.entity.id), self.world.startup_data()["entities"])
+        self.assertEqual(self.world.entities_resync()[0]["entities"][self.entity.key], self.entity.dict())
+
+    def test_entities_resync(self):
+        for x in range(RESYNC_ENTITIES_PER_PART):
+            self.world.add_entity(Entity(self.entity.type, Vector(x % 8 + 0.5, 2), 6))
+        self.world.update()
+        parts = self.world.entities_resync()
+        self.assertEqual([(part["part"], part["parts"], part["tick"]) for part in parts],
+                         [(0, 2, self.world.tick), (1, 2, self.world.tick)])
+        keys = set()
+        for part in parts:
+            keys.update(part["entities"])
+        self.assertEqual(keys, {entity.key for entity in self.world.entities})
+        self.assertEqual(parts[0]["entities"][self.entity.key], self.entity.dict())
+
+    def test_input_wakes(self):
+        self.settle()
+        self.entity.walk("right", 0.24)
+        self.assertFalse(self.entity.is_sleeping)
+        self.world.update()
+        self.assertGreater(self.entity.position.x, 3)
+
+    def test_tile_change_wakes(self):
+        self.settle()
+        self.world.terrain.remove_tile(3, 9)
+        self.assertFalse(self.entity.is_sleeping)
+        self.world.update()
+        self.assertFalse(self.entity.is_on_ground)
+
+    def test_contact_wakes(self):
+        self.settle()
+        other = Entity(self.entity.type, Vector(3.5, 6), 6)
+        self.world.add_entity(other)
+        woken = False
+        for _ in range(10):
+            self.world.update()
+            woken = woken or not self.entity.is_sleeping
+        self.assertTrue(woken)
+        self.settle()
+        self.assertTrue(self.entity.is_sleeping)
+        self.assertTrue(other.is_sleeping)
+
+    def test_boost_expires(self):
+        self.settle()
+        self.world.terrain.set_tile(3, 5, 'upgrade')
+        self.world.tileset.tiles['upgrade'] = self.world.tileset.get('crate')
+        self.entity.jump(1.1)
+        for _ in range(5):
+            self.world.update()
+        boosts = [boost for boost in self.entity.boosts if self.entity.boosts[boost]]
+        self.assertEqual(len(boosts), 1)
+        expiry_tick = self.entity.boosts[boosts[0]]
+        self.assertGreater(expiry_tick, self.world.tick)
+
+        while self.world.tick < expiry_tick:
+            self.world.update()
+        self.assertEqual(self.entity.boosts[boosts[0]], 0)
+
+
+class TestWorldScheduler(unittest.TestCase):
+    def setUp(self):
+        tileset = TileSet({"": Tile("", False), "bricks": Tile("bricks", True)})
+        self.entity_type = EntityType("player", Vector(0.75, 1.5), 6)
+        entityset = EntitySet({"player": self.entity_type})
+        grid = [['' for _ in range(39)] + ['bricks'] for _ in range(200)]
+        additional_data = AdditionalData({"john": [], "josh": []}, Vector(1000, 1000), [])
+        self.world = World(tileset, entityset, Terrain(grid), additional_data)
+
+        self.player = Entity(self.entity_type, Vector(0, 30), 6)
+        self.player.player_id = "john"
+        self.world.add_entity(self.player)
+
+    def test_tiers(self):
+        near = self.world.spawn_entity("player", Vector(10, 0), 6)
+        far = self.world.spawn_entity("player", Vector(60, 0), 6)
+        frozen = self.world.spawn_entity("player", Vector(150, 0), 6)
+
+        far_updates = 0
+        for _ in range(12):
+            far_height = far.position.y
+            self.world.update()
+            self.assertNotEqual(near.position.y, 0)
+            if far.position.y != far_height:
+                far_updates += 1
+                self.assertEqual(far.last_update_tick, self.world.tick)
+                self.assertAlmostEqual(far.position.y, near.position.y)
+        self.assertEqual(far_updates, 3)
+        self.assertEqual(frozen.position.y, 0)
+
+    def test_budget(self):
+        self.world.scheduler.tiers[0].budget = 2
+        entities = [self.world.spawn_entity("player", Vector(x, 0), 6) for x in range(2, 6)]
+        for updated in [2, 4, 4]:
+            player_height = self.player.position.y
+            self.world.update()
+            self.assertGreater(self.player.position.y, player_height)
+            self.assertEqual(self.player.last_update_tick, self.world.tick)
+            self.assertEqual(sum(entity.position.y > 0 for entity in entities), updated)